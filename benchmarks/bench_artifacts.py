@@ -0,0 +1,100 @@
+"""
+Memory, write count and timings of a multi-year, multi-ticker batch run.
+
+Runs batch_aggregate plus the CLI's report rendering over synthetic daily
+histories (network fetches are replaced with generated data) and reports
+the files written per ticker and peak Python memory against the size of the
+price frames. The regression checks (each artifact written once, peak memory
+bound) live in test_artifacts.py.
+
+Run with: python benchmarks/bench_artifacts.py [num_tickers] [years]
+"""
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from src import batch, ui, utils
+from src.catalog import ReportCatalog
+from src.storage import result_store
+from src.sentiment_analyzer import warm_up
+from src.utils import get_company_dir
+
+
+def make_history(ticker: str, years: int) -> pd.DataFrame:
+    rng = np.random.default_rng(abs(hash(ticker)) % 2**32)
+    days = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=252 * years)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(days))))
+    return pd.DataFrame({
+        'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+        'Volume': rng.integers(1e5, 1e7, len(days)), 'Dividends': 0.0, 'Stock Splits': 0.0
+    }, index=days)
+
+
+def make_news(ticker: str, num_articles: int):
+    now = pd.Timestamp.now()
+    return [{'title': f"{ticker} story {i}: shares {'surge' if i % 2 else 'slump'} after update {i * 7919}",
+             'link': f"https://example.com/{ticker}/{i}", 'date': now - pd.Timedelta(days=i), 'source': 'Example'}
+            for i in range(num_articles)]
+
+
+def artifact_kind(path: Path, ticker: str) -> str:
+    """'ZZA_price_data_20240101_120000.csv' -> 'price_data.csv'."""
+    stem = path.stem.replace(f"{ticker}_", '')
+    return '_'.join(p for p in stem.split('_') if not p.isdigit()) + path.suffix
+
+
+def main(num_tickers: int = 8, years: int = 20) -> None:
+    tickers = [f"ZZBENCH{i}" for i in range(num_tickers)]
+    histories = {t: make_history(t, years) for t in tickers}
+    data_bytes = sum(int(h.memory_usage(deep=True).sum()) for h in histories.values())
+
+    for t in tickers:
+        shutil.rmtree(get_company_dir(t), ignore_errors=True)
+
+    fake_bulk = lambda symbols, period, chunk_size: {t: histories[t] for t in symbols}
+    with mock.patch.object(batch, 'fetch_stock_history_bulk', fake_bulk), \
+            mock.patch.object(batch, 'fetch_news_rss', make_news), \
+            mock.patch.object(batch, 'NEWS_INGEST_ENABLED', False), \
+            mock.patch.object(batch, 'RUN_CACHE_ENABLED', False), \
+            tempfile.TemporaryDirectory() as scratch, \
+            mock.patch.object(result_store, 'root', Path(scratch) / 'dataset'), \
+            mock.patch.object(utils, 'report_catalog', ReportCatalog(Path(scratch) / 'catalog.sqlite3')):
+        warm_up()  # the analyzer's lexicons are loaded once per process, not per run
+        tracemalloc.start()
+        start = time.perf_counter()
+        results = batch.batch_aggregate(tickers, num_articles=20, full_text=False)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        records_bytes = sum(sys.getsizeof(r) + sum(sys.getsizeof(v) for v in r.values())
+                            for h in histories.values() for r in h.to_dict(orient='records'))
+        pending = [ui.submit_report(t, result) for t, result in results.items()]
+        render_start = time.perf_counter()
+        for report, futures in pending:
+            ui.finish_report(report, futures)
+        render_elapsed = time.perf_counter() - render_start
+
+        written = Counter()
+        for t in tickers:
+            written.update(artifact_kind(f, t) for f in get_company_dir(t).iterdir() if f.is_file())
+            shutil.rmtree(get_company_dir(t), ignore_errors=True)
+
+    ratio = peak / data_bytes
+    print(f"{num_tickers} tickers x {years} years ({data_bytes / 2**20:.1f} MB of price frames), "
+          f"batch run in {elapsed:.1f}s, charts rendered in {render_elapsed:.1f}s")
+    print(f"Files written per ticker: {({k: v / num_tickers for k, v in sorted(written.items())})}")
+    print(f"Peak traced memory during the batch: {peak / 2**20:.1f} MB ({ratio:.2f}x the price data; "
+          f"per-row record dicts alone would take {records_bytes / 2**20:.1f} MB)")
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,72 @@
+"""
+Latest-report lookup and pruning: directory glob + stat vs the SQLite catalog.
+
+Fills a temporary ticker directory with the files of N past runs (CSV, JSON
+and PNG per run), then times the old get_latest_report (three globs and a
+stat() per file) against src.catalog.ReportCatalog.latest(), and lists the
+files outside the newest runs for retention pruning.
+
+Run with: python benchmarks/bench_catalog.py [runs]
+"""
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.catalog import ReportCatalog
+
+TICKER = 'ZZCAT'
+KINDS = ('price_data.csv', 'news.json', 'summary.json', 'analysis.png', 'sentiment.png')
+
+
+def old_latest(company_dir: Path):
+    report_files = {}
+    for ext in ['.csv', '.png', '.json']:
+        files = list(company_dir.glob(f'*{ext}'))
+        if files:
+            report_files[ext[1:]] = max(files, key=lambda f: f.stat().st_mtime)
+    return report_files
+
+
+def timed(fn, *args, repeat: int = 5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main(runs: int = 2000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        company_dir = Path(tmp) / TICKER
+        company_dir.mkdir()
+        catalog = ReportCatalog(Path(tmp) / 'catalog.sqlite3')
+        first = datetime(2020, 1, 1)
+        start = time.perf_counter()
+        for i in range(runs):
+            run_id = (first + timedelta(hours=i)).strftime("%Y%m%d_%H%M%S")
+            for kind in KINDS:
+                stem, ext = kind.split('.')
+                path = company_dir / f"{TICKER}_{stem}_{run_id}.{ext}"
+                path.write_bytes(b'x')
+                catalog.record(path, TICKER)
+        print(f"Wrote and cataloged {runs} runs ({runs * len(KINDS)} files) in {time.perf_counter() - start:.1f}s")
+
+        old, old_t = timed(old_latest, company_dir)
+        new, new_t = timed(catalog.latest, TICKER)
+        print(f"Latest report:   glob+stat {old_t * 1000:8.2f} ms   catalog {new_t * 1000:8.2f} ms")
+        print(f"  -> {sorted(p.name for p in new.values())}")
+
+        stale, prune_t = timed(catalog.files, TICKER, 10)
+        print(f"Files outside the newest 10 runs: {len(stale)} in {prune_t * 1000:.2f} ms")
+        recent, recent_t = timed(catalog.recent)
+        print(f"Recently analyzed listing: {recent} in {recent_t * 1000:.2f} ms")
+        catalog.close()
+
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,108 @@
+"""
+Article extraction: full-page parse vs. streamed, strained extraction.
+
+For every HTML page in a corpus directory (or a set of generated pages when
+none is given), compares the old approach (decode the whole page, lowercase
+it for the paywall check, build a full html.parser tree) with
+src.extract (chunked read with a byte cap and paywall scan on the bytes,
+SoupStrainer limited to the article region). Prints time and peak Python
+memory per page and checks that both extract the same text.
+
+Run with: python benchmarks/bench_extraction.py [corpus_dir] [--max-bytes N]
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup
+
+from src.extract import HTML_PARSER, PAYWALL_MARKERS, read_stream, extract_article_text
+from src.utils import clean_text
+from src.config import SCRAPE_MAX_BYTES, SCRAPE_CHUNK_BYTES
+
+WORDS = "market shares investors rally earnings quarter guidance analyst revenue growth outlook".split()
+
+
+def make_page(rng: random.Random, size: int) -> bytes:
+    """A news-like page: big nav/script chrome around a modest article."""
+    paragraphs = ''.join(f"<p>{' '.join(rng.choices(WORDS, k=60))}</p>" for _ in range(30))
+    chrome = []
+    while sum(len(c) for c in chrome) < size:
+        chrome.append(f"<div class='nav'><a href='/x{len(chrome)}'>{' '.join(rng.choices(WORDS, k=8))}</a></div>")
+        chrome.append(f"<script>var cfg{len(chrome)} = {{'k': '{'x' * 400}'}};</script>")
+    half = len(chrome) // 2
+    return (
+        "<html><head><title>t</title><style>p{margin:0}</style></head><body>"
+        + ''.join(chrome[:half])
+        + f"<article><h1>Headline</h1>{paragraphs}<script>track()</script></article>"
+        + ''.join(chrome[half:])
+        + "</body></html>"
+    ).encode('utf-8')
+
+
+def old_extract(content: bytes) -> str:
+    html = content.decode('utf-8', errors='replace')
+    low = html.lower()
+    if any(m.decode() in low for m in PAYWALL_MARKERS):
+        return ""
+    soup = BeautifulSoup(html, 'html.parser')
+    body = soup.find('article') or soup.find('div', class_='article-body') or soup.find('body')
+    if not body:
+        return ""
+    for tag in body(["script", "style", "noscript"]):
+        tag.decompose()
+    return clean_text(body.get_text(separator=" "))
+
+
+def new_extract(content: bytes, max_bytes: int) -> str:
+    chunks = (content[i:i + SCRAPE_CHUNK_BYTES] for i in range(0, len(content), SCRAPE_CHUNK_BYTES))
+    streamed = read_stream(chunks, max_bytes=max_bytes)
+    if streamed.paywalled:
+        return ""
+    return extract_article_text(streamed.content)
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('corpus', nargs='?', help="Directory of saved .html pages")
+    parser.add_argument('--max-bytes', type=int, default=SCRAPE_MAX_BYTES)
+    args = parser.parse_args()
+
+    if args.corpus:
+        pages = {p.name: p.read_bytes() for p in sorted(Path(args.corpus).glob('*.htm*'))}
+    else:
+        rng = random.Random(7)
+        pages = {f"generated_{kb}kb.html": make_page(rng, kb * 1024) for kb in (100, 500, 1000, 3000)}
+    if not pages:
+        sys.exit("No .html pages found")
+
+    print(f"Parser: {HTML_PARSER}, byte cap: {args.max_bytes}")
+    print(f"{'Page':<28}{'KB':>8}{'old ms':>10}{'new ms':>10}{'old MB':>9}{'new MB':>9}  same text")
+    totals = [0.0, 0.0, 0, 0]
+    for name, content in pages.items():
+        old_text, old_t, old_mem = measure(old_extract, content)
+        new_text, new_t, new_mem = measure(new_extract, content, args.max_bytes)
+        totals = [totals[0] + old_t, totals[1] + new_t, max(totals[2], old_mem), max(totals[3], new_mem)]
+        print(f"{name[:27]:<28}{len(content) / 1024:>8.0f}{old_t * 1000:>10.1f}{new_t * 1000:>10.1f}"
+              f"{old_mem / 2**20:>9.1f}{new_mem / 2**20:>9.1f}  {old_text == new_text}")
+    print(f"\nTotal time: {totals[0]:.2f}s -> {totals[1]:.2f}s, "
+          f"peak memory: {totals[2] / 2**20:.1f} MB -> {totals[3] / 2**20:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
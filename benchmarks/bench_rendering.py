@@ -0,0 +1,104 @@
+"""
+Report chart rendering time against history length.
+
+For synthetic daily histories of increasing length (with one article per
+five bars), renders the price and sentiment charts the old way (pyplot, one
+volume bar per row and one sentiment bar per article) and with src.render
+(data-side downsampling to at most PLOT_MAX_POINTS points, fixed set of
+artists). Prints render time and artist count per row count.
+
+Run with: python benchmarks/bench_rendering.py [--rows 500 5000 ...] [--profile preview|publication]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from src.render import RENDER_PROFILES, render_chart, price_chart_spec, sentiment_chart_spec, _templates
+
+
+def make_inputs(rows: int, seed: int = 3):
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range(end=pd.Timestamp('2025-01-03'), periods=rows)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    history = pd.DataFrame({'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+                            'Volume': rng.integers(1e5, 1e7, rows)}, index=days)
+    features = pd.DataFrame({'MA50': history['Close'].rolling(50).mean()}, index=days)
+    published = days[0] + pd.to_timedelta(rng.uniform(0, (days[-1] - days[0]).days, max(1, rows // 5)), unit='D')
+    sentiment = pd.DataFrame({'sentiment': rng.uniform(-1, 1, len(published))}, index=published.sort_values())
+    return history, features, sentiment
+
+
+def old_render(history, features, sentiment, out: Path, options) -> int:
+    """The previous generate_report drawing code; returns the number of artists drawn."""
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10), gridspec_kw={'height_ratios': [3, 1]})
+    history['Close'].plot(ax=ax1, label='Close Price', color='tab:blue')
+    features['MA50'].plot(ax=ax1, label='50-day MA', color='tab:orange', linestyle='--')
+    ax1.legend(loc='upper left')
+    ax2.bar(history.index, history['Volume'], color='tab:green', alpha=0.3)
+    plt.tight_layout()
+    fig.savefig(out / 'old_price.png', **options)
+    artists = len(ax1.get_children()) + len(ax2.get_children())
+    plt.close(fig)
+
+    fig, ax = plt.subplots(figsize=(12, 4))
+    sentiment['sentiment'].plot(ax=ax, kind='bar', color='tab:purple', alpha=0.7)
+    plt.tight_layout()
+    fig.savefig(out / 'old_sentiment.png', **options)
+    artists += len(ax.get_children())
+    plt.close(fig)
+    return artists
+
+
+def new_render(history, features, sentiment, out: Path, profile: str) -> int:
+    render_chart(price_chart_spec('BENCH', history, features), out / 'new_price.png', profile)
+    render_chart(sentiment_chart_spec('BENCH', sentiment), out / 'new_sentiment.png', profile)
+    price = _templates['price']
+    return (len(price.ax1.get_children()) + len(price.ax2.get_children())
+            + len(_templates['sentiment'].ax.get_children()))
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[250, 1250, 5000, 20000])
+    parser.add_argument('--profile', choices=sorted(RENDER_PROFILES), default='preview')
+    parser.add_argument('--old-max-rows', type=int, default=5000,
+                        help="Skip the old renderer above this many rows (it takes minutes)")
+    args = parser.parse_args()
+    options = RENDER_PROFILES[args.profile]
+
+    # Build the templates once, as a long-lived render worker would have
+    new_render(*make_inputs(100), Path(tempfile.mkdtemp()), args.profile)
+
+    print(f"Profile: {args.profile} ({options['dpi']} DPI)")
+    print(f"{'Rows':>8}{'Articles':>10}{'old s':>9}{'new s':>9}{'old artists':>13}{'new artists':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp)
+        for rows in args.rows:
+            inputs = make_inputs(rows)
+            new_artists, new_t = timed(new_render, *inputs, out, args.profile)
+            if rows <= args.old_max_rows:
+                old_artists, old_t = timed(old_render, *inputs, out, options)
+                old_cols = f"{old_t:>9.2f}"
+            else:
+                old_artists, old_cols = '-', f"{'-':>9}"
+            print(f"{rows:>8}{len(inputs[2]):>10}{old_cols}{new_t:>9.2f}{old_artists:>13}{new_artists:>13}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Re-polling unchanged tickers with the run cache.
+
+Runs the batch pipeline (plus the CLI's report rendering and retention
+cleanup) three times over synthetic prices and news (network fetches are
+replaced with generated data), using a scratch disk cache, dataset and
+report catalog:
+
+  1. cold: every ticker is scored, written and rendered;
+  2. unchanged inputs: every ticker must reuse its previous run, with no
+     article scored and no report file, dataset row or chart written;
+  3. one new headline for one ticker: only that article is scored and only
+     that ticker writes a new run.
+
+The single-ticker path (aggregate_analysis) is checked the same way.
+
+Run with: python benchmarks/bench_run_cache.py [num_tickers] [years]
+"""
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from src import aggregator, batch, ui, utils
+from src.cache import DiskCache
+from src.catalog import ReportCatalog
+from src.storage import result_store
+from src.sentiment_analyzer import batch_analyze, warm_up
+from src.utils import get_company_dir
+
+
+def make_history(ticker: str, years: int) -> pd.DataFrame:
+    rng = np.random.default_rng(abs(hash(ticker)) % 2**32)
+    days = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=252 * years)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(days))))
+    return pd.DataFrame({
+        'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+        'Volume': rng.integers(1e5, 1e7, len(days)), 'Dividends': 0.0, 'Stock Splits': 0.0
+    }, index=days)
+
+
+class FakeFeeds:
+    """Deterministic per-ticker headlines; extra[ticker] adds breaking stories."""
+
+    def __init__(self):
+        self.today = pd.Timestamp.today().normalize()
+        self.extra = {}
+
+    def __call__(self, ticker: str, num_articles: int):
+        news = [{'title': f"{ticker} story {i}: shares {'surge' if i % 2 else 'slump'} after update {i * 7919}",
+                 'link': f"https://example.com/{ticker}/{i}", 'date': self.today - pd.Timedelta(days=i),
+                 'source': 'Example'}
+                for i in range(num_articles)]
+        return self.extra.get(ticker, []) + news[:num_articles - len(self.extra.get(ticker, []))]
+
+
+class ScoreCounter:
+    """batch_analyze wrapper counting the articles actually scored per call."""
+
+    def __init__(self):
+        self.articles = 0
+
+    def __call__(self, articles):
+        self.articles += len(articles)
+        return batch_analyze(articles)
+
+
+def report_files(tickers):
+    return {t: sorted(f.name for f in get_company_dir(t).iterdir() if f.is_file()) for t in tickers}
+
+
+def dataset_files(root: Path):
+    return sorted(str(p.relative_to(root)) for p in root.rglob('*.parquet'))
+
+
+def cli_batch(tickers, scorer: ScoreCounter):
+    """batch_aggregate plus the report rendering and cleanup _run_batch does."""
+    scorer.articles = 0
+    start = time.perf_counter()
+    results = batch.batch_aggregate(tickers, num_articles=20, full_text=False)
+    for t in tickers:
+        utils.cleanup_company_reports(t, keep_runs=1, keep_run_ids=[results[t].get('run_id')])
+    reports = {t: ui.finish_report(*ui.submit_report(t, r)) for t, r in results.items()}
+    return results, reports, time.perf_counter() - start
+
+
+def main(num_tickers: int = 8, years: int = 5) -> None:
+    tickers = [f"ZZRUN{i}" for i in range(num_tickers)]
+    histories = {t: make_history(t, years) for t in tickers}
+    feeds = FakeFeeds()
+    scorer = ScoreCounter()
+    for t in tickers:
+        shutil.rmtree(get_company_dir(t), ignore_errors=True)
+
+    failures = []
+    fake_bulk = lambda symbols, period, chunk_size: {t: histories[t] for t in symbols}
+    fake_stock = lambda ticker, period: {'history': histories[ticker]}
+    with tempfile.TemporaryDirectory() as scratch, \
+            mock.patch.object(batch, 'fetch_stock_history_bulk', fake_bulk), \
+            mock.patch.object(batch, 'fetch_news_rss', feeds), \
+            mock.patch.object(batch, 'NEWS_INGEST_ENABLED', False), \
+            mock.patch.object(batch, 'batch_analyze', scorer), \
+            mock.patch.object(aggregator, 'fetch_stock_data', fake_stock), \
+            mock.patch.object(aggregator, 'fetch_news_rss', feeds), \
+            mock.patch.object(aggregator, 'NEWS_INGEST_ENABLED', False), \
+            mock.patch.object(aggregator, 'batch_analyze', scorer), \
+            mock.patch.object(utils, '_cache', DiskCache(Path(scratch) / 'cache', 64 * 2**20)), \
+            mock.patch.object(result_store, 'root', Path(scratch) / 'dataset'), \
+            mock.patch.object(utils, 'report_catalog', ReportCatalog(Path(scratch) / 'catalog.sqlite3')):
+        warm_up()
+        dataset_root = Path(scratch) / 'dataset'
+
+        _, _, cold = cli_batch(tickers, scorer)
+        cold_scored = scorer.articles
+        files, dataset = report_files(tickers), dataset_files(dataset_root)
+
+        results, reports, warm = cli_batch(tickers, scorer)
+        not_reused = [t for t, r in results.items() if not r.get('reused') or not reports[t].get('reused')]
+        if not_reused:
+            failures.append(f"unchanged tickers not reused: {not_reused}")
+        if scorer.articles:
+            failures.append(f"unchanged run scored {scorer.articles} articles")
+        if report_files(tickers) != files:
+            failures.append("unchanged run wrote or removed report files")
+        if dataset_files(dataset_root) != dataset:
+            failures.append("unchanged run appended to the result dataset")
+        if any(len(reports[t]['saved_files']) != 2 for t in tickers):
+            failures.append("reused reports do not list the previous run's charts")
+
+        changed = tickers[0]
+        feeds.extra[changed] = [{'title': f"{changed} beats estimates and raises guidance",
+                                 'link': f"https://example.com/{changed}/breaking",
+                                 'date': feeds.today, 'source': 'Example'}]
+        results, _, partial = cli_batch(tickers, scorer)
+        rerun = sorted(t for t, r in results.items() if not r.get('reused'))
+        if rerun != [changed]:
+            failures.append(f"one changed ticker re-ran {rerun}")
+        if scorer.articles != 1:
+            failures.append(f"one new headline scored {scorer.articles} articles")
+        if len(report_files([changed])[changed]) != 5:
+            failures.append(f"{changed}: expected one run's 5 files, found {report_files([changed])[changed]}")
+
+        scorer.articles = 0
+        single = aggregator.aggregate_analysis(tickers[1], num_articles=20, full_text=False)
+        if not single.get('reused') or scorer.articles:
+            failures.append("aggregate_analysis did not reuse the unchanged batch run")
+
+        for t in tickers:
+            shutil.rmtree(get_company_dir(t), ignore_errors=True)
+
+    print(f"{num_tickers} tickers x {years} years, 20 articles each")
+    print(f"  cold run:            {cold:.2f}s ({cold_scored} articles scored)")
+    print(f"  unchanged inputs:    {warm:.2f}s (0 articles scored, nothing written)")
+    print(f"  one changed ticker:  {partial:.2f}s (1 article scored)")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK: unchanged tickers reuse their previous run")
+
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:3]))
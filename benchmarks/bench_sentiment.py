@@ -0,0 +1,70 @@
+"""
+Throughput of scalar vs. batch sentiment scoring.
+
+Scores synthetic headlines with SentimentAnalyzer.analyze_sentiment (one at a
+time) and SentimentAnalyzer.analyze_batch (all at once), checks that both
+paths produce identical results and prints headlines per second and the
+time per stage of each path.
+
+Run with: python benchmarks/bench_sentiment.py [num_headlines]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.sentiment_analyzer import get_analyzer
+
+FILLER = (
+    "shares stock company market quarter investors analysts earnings revenue "
+    "guidance outlook report session trading index sector the a of on after "
+    "amid against with for as"
+).split()
+
+
+def make_headlines(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    analyzer = get_analyzer()
+    phrases = analyzer.matcher.phrases
+    headlines = []
+    for i in range(n):
+        words = rng.choices(FILLER, k=rng.randint(6, 14))
+        for _ in range(rng.randint(0, 3)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(phrases))
+        headlines.append(f"TICK{i % 500} " + ' '.join(words).capitalize() + rng.choice(['.', '!', ' - Reuters']))
+    return headlines
+
+
+def main(n: int = 10000) -> None:
+    analyzer = get_analyzer()
+    headlines = make_headlines(n)
+
+    analyzer.reset_timings()
+    start = time.perf_counter()
+    scalar = [analyzer.analyze_sentiment(h) for h in headlines]
+    scalar_sec = time.perf_counter() - start
+    scalar_timings = analyzer.get_timings()
+
+    analyzer.reset_timings()
+    start = time.perf_counter()
+    batch = analyzer.analyze_batch(headlines)
+    batch_sec = time.perf_counter() - start
+    batch_timings = analyzer.get_timings()
+
+    mismatches = sum(1 for a, b in zip(scalar, batch) if a != b)
+    print(f"headlines:  {n}")
+    print(f"scalar:     {scalar_sec:.2f}s ({n / scalar_sec:,.0f} headlines/s)")
+    print(f"batch:      {batch_sec:.2f}s ({n / batch_sec:,.0f} headlines/s)")
+    print(f"speedup:    {scalar_sec / batch_sec:.2f}x")
+    print(f"mismatches: {mismatches}")
+    print(f"  {'stage':<11} {'scalar':>8} {'batch':>8}  ms/document")
+    for stage, timing in scalar_timings.items():
+        print(f"  {stage:<11} {timing['ms_per_document']:>8.4f} {batch_timings[stage]['ms_per_document']:>8.4f}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
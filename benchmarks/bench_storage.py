@@ -0,0 +1,131 @@
+"""
+Loading past results: per-run JSON reports vs the partitioned Parquet dataset.
+
+Writes synthetic runs for a watchlist (one run per ticker per day) both as
+the aggregator's per-run summary/news JSON files and through
+src.storage.ResultStore, then times reading back one year of results for
+the whole watchlist, and the last month for a few tickers, each way.
+
+Run with: python benchmarks/bench_storage.py [num_tickers] [days]
+"""
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from src.storage import ResultStore
+
+
+def make_result(ticker: str, day: pd.Timestamp, rng: np.random.Generator, num_articles: int = 20):
+    scores = rng.uniform(-1, 1, num_articles)
+    history = pd.DataFrame({'Close': 100 + rng.normal(0, 1, 5)}, index=pd.bdate_range(end=day, periods=5))
+    news = [{'title': f"{ticker} story {i}", 'link': f"https://example.com/{ticker}/{day:%Y%m%d}/{i}",
+             'source': 'Example', 'date': (day - pd.Timedelta(hours=i)).isoformat(), 'sentiment': float(s),
+             'sentiment_label': 'positive' if s > 0 else 'negative', 'sentiment_confidence': 0.8,
+             'cluster_size': 1, 'full_text': False} for i, s in enumerate(scores)]
+    sentiment = {'average': float(scores.mean()), 'weighted_average': float(scores.mean()),
+                 'median': float(np.median(scores)), 'std': float(scores.std()), 'count': num_articles,
+                 'article_count': num_articles, 'keywords': ['growth']}
+    return {'ticker': ticker, 'timestamp': day.isoformat(), 'price_history': history,
+            'news': news, 'sentiment': sentiment, 'error': None}
+
+
+def write_json(root: Path, result, run_id: str) -> None:
+    ticker_dir = root / result['ticker']
+    ticker_dir.mkdir(parents=True, exist_ok=True)
+    summary = {'ticker': result['ticker'], 'timestamp': result['timestamp'],
+               'price_data_points': len(result['price_history']),
+               'news_articles_analyzed': len(result['news']), 'sentiment_summary': result['sentiment']}
+    with open(ticker_dir / f"{result['ticker']}_summary_{run_id}.json", 'w') as f:
+        json.dump(summary, f, indent=2)
+    with open(ticker_dir / f"{result['ticker']}_news_{run_id}.json", 'w') as f:
+        json.dump(result['news'], f, indent=2)
+
+
+def read_json(root: Path, tickers, start: pd.Timestamp):
+    """Glob every ticker's summary/news files and keep runs on or after start."""
+    runs, articles = [], []
+    for ticker in tickers:
+        for path in (root / ticker).glob(f"{ticker}_summary_*.json"):
+            with open(path) as f:
+                summary = json.load(f)
+            if pd.Timestamp(summary['timestamp']) < start:
+                continue
+            runs.append({'ticker': ticker, 'timestamp': summary['timestamp'], **summary['sentiment_summary']})
+            with open(path.with_name(path.name.replace('_summary_', '_news_'))) as f:
+                articles.extend(dict(a, ticker=ticker) for a in json.load(f))
+    return pd.DataFrame(runs), pd.DataFrame(articles)
+
+
+def read_dataset(store: ResultStore, tickers, start: pd.Timestamp):
+    return store.load('runs', tickers, start=start), store.load('articles', tickers, start=start)
+
+
+def timed(fn, *args, repeat: int = 3):
+    """Result and best wall time over repeat calls (the OS page cache is warm for both formats)."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def read_json_runs(root: Path, tickers, start: pd.Timestamp):
+    runs = []
+    for ticker in tickers:
+        for path in (root / ticker).glob(f"{ticker}_summary_*.json"):
+            with open(path) as f:
+                summary = json.load(f)
+            if pd.Timestamp(summary['timestamp']) >= start:
+                runs.append({'ticker': ticker, 'average': summary['sentiment_summary']['average']})
+    return pd.DataFrame(runs)
+
+
+def read_dataset_runs(store: ResultStore, tickers, start: pd.Timestamp):
+    return store.load('runs', tickers, start=start, columns=['ticker', 'date', 'sentiment_average'])
+
+
+def main(num_tickers: int = 20, days: int = 300) -> None:
+    rng = np.random.default_rng(11)
+    tickers = [f"T{i:03d}" for i in range(num_tickers)]
+    run_days = pd.bdate_range(end=pd.Timestamp('2025-01-03 16:00'), periods=days)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_root, store = Path(tmp) / 'reports', ResultStore(Path(tmp) / 'dataset')
+        start = time.perf_counter()
+        for day in run_days:
+            run_id = day.strftime("%Y%m%d_%H%M%S")
+            for ticker in tickers:
+                result = make_result(ticker, day, rng)
+                write_json(json_root, result, run_id)
+                store.append_run(result, run_id)
+        print(f"Wrote {num_tickers} tickers x {days} runs in {time.perf_counter() - start:.1f}s")
+
+        year = run_days[-1] - pd.DateOffset(years=1)
+        month = run_days[-1] - pd.DateOffset(months=1)
+        print(f"{'Query':<34}{'JSON s':>9}{'Parquet s':>11}{'runs':>8}{'articles':>10}")
+        for label, query_tickers, since in (("1 year, all tickers", tickers, year),
+                                            ("1 month, 3 tickers", tickers[:3], month)):
+            (json_runs, json_articles), json_t = timed(read_json, json_root, query_tickers, since)
+            (runs, articles), parquet_t = timed(read_dataset, store, query_tickers, since.normalize())
+            if len(runs) != len(json_runs) or len(articles) != len(json_articles):
+                sys.exit(f"FAIL: {label}: dataset returned {len(runs)}/{len(articles)} rows, "
+                         f"JSON {len(json_runs)}/{len(json_articles)}")
+            print(f"{label:<34}{json_t:>9.3f}{parquet_t:>11.3f}{len(runs):>8}{len(articles):>10}")
+        json_runs, json_t = timed(read_json_runs, json_root, tickers, year)
+        runs, parquet_t = timed(read_dataset_runs, store, tickers, year.normalize())
+        print(f"{'1 year, all tickers, avg only':<34}{json_t:>9.3f}{parquet_t:>11.3f}{len(runs):>8}{'-':>10}")
+
+        removed = store.compact('runs') + store.compact('articles')
+        (runs, articles), parquet_t = timed(read_dataset, store, tickers, year.normalize())
+        print(f"After compact() ({removed} files merged): 1 year, all tickers in {parquet_t:.3f}s")
+
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:3]))
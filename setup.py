@@ -12,6 +12,7 @@ setup(
     entry_points={
         'console_scripts': [
             'apex-analysis=src.ui:run_cli',
+            'apex-batch=src.batch:main',
         ],
     },
     python_requires='>=3.8',
@@ -2,13 +2,21 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Sequence, Iterable
+from collections import Counter
+from collections.abc import Sequence as SequenceABC
 import json
 
 from src.fetch_data import fetch_stock_data
-from src.news_processor import fetch_news_rss
-from src.sentiment_analyzer import batch_analyze
-from src.utils import logger, get_company_dir as utils_get_company_dir
+from src.news_processor import fetch_news_rss, enrich_articles
+from src.ingest import ingest_ticker_news
+from src.dedup import dedup_articles
+from src.features import compute_features, update_features
+from src.sentiment_analyzer import batch_analyze, sentiment_label_index, SENTIMENT_LABELS
+from src.utils import logger, record_artifact, get_company_dir as utils_get_company_dir
+from src.storage import result_store
+from src.run_cache import run_cache, RunFingerprints
+from src.config import ENRICH_FULL_TEXT, DEDUP_ENABLED, SAVE_DATASET, RUN_CACHE_ENABLED, NEWS_INGEST_ENABLED
 import pandas as pd
 
 def get_company_dir(ticker: str) -> Path:
@@ -19,6 +27,69 @@ def get_company_dir(ticker: str) -> Path:
     """
     return utils_get_company_dir(ticker)
 
+def _weighted_median(values: np.ndarray, weights: np.ndarray) -> float:
+    """Median of values where each counts weights[i] times (np.median for equal weights)."""
+    order = np.argsort(values, kind='stable')
+    values, cumulative = values[order], np.cumsum(weights[order])
+    half = cumulative[-1] / 2
+    i = int(np.searchsorted(cumulative, half))
+    if np.isclose(cumulative[i], half) and i + 1 < len(values):
+        return float((values[i] + values[i + 1]) / 2)
+    return float(values[i])
+
+def sentiment_metrics_from_arrays(scores: Sequence[float],
+                                  confidences: Optional[Sequence[float]] = None,
+                                  weights: Optional[Sequence[float]] = None,
+                                  keywords: Optional[Iterable[Iterable[str]]] = None) -> Dict[str, Any]:
+    """
+    Sentiment metrics from parallel arrays of per-article values.
+
+    Label counts use the same thresholds as analyze_sentiment and are computed
+    in one np.bincount pass; averages, median and dispersion are plain array
+    reductions, so recomputing metrics over many windows stays cheap.
+
+    Every article counts `weight` times (a de-duplicated story once per outlet
+    that ran it) in the label counts, weighted_average, median and std;
+    'average' and 'count' are per distinct story.
+
+    Args:
+        scores: Compound sentiment scores
+        confidences: Per-article confidence (defaults to 1)
+        weights: Per-article weight such as a de-duplicated cluster size (defaults to 1)
+        keywords: Per-article lists of matched sentiment keywords
+
+    Returns:
+        Dict containing sentiment metrics (empty if there are no scores)
+    """
+    scores = np.asarray(scores, dtype=float)
+    if scores.size == 0:
+        return {}
+    weights = np.ones_like(scores) if weights is None else np.asarray(weights, dtype=float)
+    confidences = np.ones_like(scores) if confidences is None else np.asarray(confidences, dtype=float)
+
+    if weights.sum() <= 0:
+        weights = np.ones_like(scores)
+
+    label_counts = np.bincount(sentiment_label_index(scores), weights=weights, minlength=len(SENTIMENT_LABELS))
+    confidence_weights = confidences * weights
+    keyword_counts = Counter(kw for article_keywords in (keywords or ()) for kw in article_keywords)
+    weighted_average = float(np.average(scores, weights=weights))
+
+    metrics = {
+        'average': float(scores.mean()),
+        'weighted_average': weighted_average,
+        'confidence_weighted_average': (float(np.average(scores, weights=confidence_weights))
+                                        if confidence_weights.sum() > 0 else weighted_average),
+        'median': _weighted_median(scores, weights),
+        'std': float(np.sqrt(np.average((scores - weighted_average) ** 2, weights=weights))),
+        'count': int(scores.size),
+        'article_count': int(round(weights.sum()))
+    }
+    metrics.update({label: int(round(n)) for label, n in zip(SENTIMENT_LABELS, label_counts)})
+    metrics['keywords'] = [kw for kw, _ in keyword_counts.most_common()]
+    metrics['keyword_counts'] = dict(keyword_counts.most_common())
+    return metrics
+
 def calculate_sentiment_metrics(analyzed_news: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Calculate sentiment metrics from analyzed news articles.
@@ -29,35 +100,89 @@ def calculate_sentiment_metrics(analyzed_news: List[Dict[str, Any]]) -> Dict[str
     Returns:
         Dict containing sentiment metrics
     """
-    if not analyzed_news:
-        return {}
-        
-    sentiment_scores = [
-        n.get('sentiment', 0) 
-        for n in analyzed_news 
-        if 'sentiment' in n
-    ]
-    
-    if not sentiment_scores:
+    scored = [n for n in analyzed_news or [] if 'sentiment' in n]
+    if not scored:
         return {}
         
-    # Extract unique keywords from all articles
-    keywords = {
-        kw 
-        for article in analyzed_news 
-        for kw in article.get('sentiment_keywords', [])
-    }
-    
-    return {
-        'average': float(np.mean(sentiment_scores)),
-        'count': len(sentiment_scores),
-        'strongly_positive': len([s for s in sentiment_scores if s >= 0.15]),
-        'positive': len([s for s in sentiment_scores if 0.05 <= s < 0.15]),
-        'neutral': len([s for s in sentiment_scores if -0.05 < s < 0.05]),
-        'negative': len([s for s in sentiment_scores if -0.15 < s <= -0.05]),
-        'strongly_negative': len([s for s in sentiment_scores if s <= -0.15]),
-        'keywords': list(keywords)
-    }
+    # Each de-duplicated story stands for cluster_size copies of it
+    metrics = sentiment_metrics_from_arrays(
+        scores=[n.get('sentiment', 0) for n in scored],
+        confidences=[n.get('sentiment_confidence', 1.0) for n in scored],
+        weights=[n.get('cluster_size', 1) for n in scored],
+        keywords=[n.get('sentiment_keywords', []) for n in scored]
+    )
+    metrics['full_text_count'] = sum(1 for n in scored if n.get('full_text'))
+    return metrics
+
+def rolling_sentiment_metrics(sentiment_df: pd.DataFrame, window: str = '7D') -> pd.DataFrame:
+    """
+    Sentiment metrics over a trailing time window ending at every article.
+
+    Args:
+        sentiment_df: Date-indexed frame with a 'sentiment' column and
+            optionally 'confidence' and 'weight' columns
+        window: pandas offset string for the window length
+
+    Returns:
+        DataFrame with average, confidence_weighted_average, median, std,
+        count and one count column per sentiment label
+    """
+    if sentiment_df is None or sentiment_df.empty:
+        return pd.DataFrame()
+    df = sentiment_df.sort_index()
+    scores = df['sentiment'].astype(float)
+    conf = df['confidence'].astype(float) if 'confidence' in df else pd.Series(1.0, index=df.index)
+    weight = df['weight'].astype(float) if 'weight' in df else pd.Series(1.0, index=df.index)
+
+    labels = sentiment_label_index(scores.to_numpy())
+    one_hot = pd.DataFrame(np.eye(len(SENTIMENT_LABELS), dtype=int)[labels],
+                           index=df.index, columns=list(SENTIMENT_LABELS))
+    rolling = scores.rolling(window)
+    cw = conf * weight
+    out = pd.DataFrame({
+        'average': rolling.mean(),
+        'confidence_weighted_average': (scores * cw).rolling(window).sum() / cw.rolling(window).sum(),
+        'median': rolling.median(),
+        'std': rolling.std(ddof=0),
+        'count': rolling.count().astype(int)
+    })
+    return out.join(one_hot.rolling(window).sum().astype(int))
+
+class RecordsView(SequenceABC):
+    """
+    Read-only list-of-dicts view over a DataFrame, built row by row on demand.
+
+    Stands in for df.to_dict(orient='records') without materializing one dict
+    per row; len() is free and to_list() produces the full list only when a
+    JSON document actually needs it.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RecordsView(self.df.iloc[index]).to_list()
+        return self.df.iloc[index].to_dict()
+
+    def __iter__(self):
+        columns = list(self.df.columns)
+        for row in self.df.itertuples(index=False, name=None):
+            yield dict(zip(columns, row))
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return self.df.to_dict(orient='records')
+
+def _json_default(obj: Any) -> Any:
+    """JSON fallback: expand lazy record views and frames, stringify everything else."""
+    if isinstance(obj, RecordsView):
+        return obj.to_list()
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict(orient='records')
+    return str(obj)
 
 def save_report(data: Any, filepath: Path) -> Path:
     """
@@ -82,12 +207,13 @@ def save_report(data: Any, filepath: Path) -> Path:
         
         # Save the file
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, default=str)
+            json.dump(data, f, indent=2, default=_json_default)
             
         # Verify the file was created
         if not filepath.exists():
             raise FileNotFoundError(f"Failed to create file: {filepath}")
-            
+        record_artifact(filepath)
+
         logger.info(f"Successfully saved report to {filepath.absolute()}")
         return filepath.absolute()
         
@@ -96,7 +222,217 @@ def save_report(data: Any, filepath: Path) -> Path:
         logger.error(error_msg, exc_info=True)
         raise Exception(error_msg)
 
-def aggregate_analysis(ticker: str, period: str = '1y', num_articles: int = 20) -> Dict[str, Any]:
+# Pipeline steps, shared by aggregate_analysis and the batch engine (src/batch.py)
+
+def new_result(ticker: str) -> Dict[str, Any]:
+    """Return an empty analysis result for ticker with default values."""
+    return {
+        'ticker': ticker.upper(),
+        'timestamp': datetime.now().isoformat(),
+        'price_data': None,
+        'sentiment': {},
+        'news': [],
+        'saved_files': [],
+        'error': None
+    }
+
+def attach_price_history(result: Dict[str, Any], history: Optional[pd.DataFrame],
+                          ticker_dir: Path, timestamp: str) -> None:
+    """Save fetched price history and attach it to result."""
+    ticker = result['ticker']
+    if history is None or history.empty:
+        logger.warning(f"No price data available for {ticker}")
+        result['error'] = f"No price data available for {ticker}"
+        return
+
+    # Save price data
+    price_file = ticker_dir / f"{ticker}_price_data_{timestamp}.csv"
+    try:
+        # Ensure directory exists
+        price_file.parent.mkdir(parents=True, exist_ok=True)
+        # Save the file
+        history.to_csv(price_file, index=False)
+        # Verify it was created
+        if not price_file.exists():
+            raise FileNotFoundError(f"Failed to create price data file: {price_file}")
+        record_artifact(price_file, ticker, timestamp)
+
+        saved_path = str(price_file.absolute())
+        result['saved_files'].append(saved_path)
+        # The DataFrame is the one canonical copy; price_data is a lazy
+        # records view over it for JSON-style consumers.
+        result['price_history'] = history
+        result['price_data'] = RecordsView(history)
+        logger.info(f"Successfully saved price data to {saved_path}")
+    except Exception as e:
+        error_msg = f"Failed to save price data: {str(e)}"
+        logger.error(error_msg, exc_info=True)
+        result['error'] = error_msg
+
+def _sentiment_frame(analyzed_news: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Date-indexed frame of article scores for plotting and features (numeric index if no dates)."""
+    try:
+        sent_df = pd.DataFrame([
+            {
+                'date': a.get('date') if a.get('date') is not None else a.get('analysis_timestamp'),
+                'sentiment': a.get('sentiment', 0.0),
+                'confidence': a.get('sentiment_confidence', 1.0),
+                'weight': a.get('cluster_size', 1),
+                'title': a.get('title', '')
+            }
+            for a in analyzed_news
+        ])
+        if sent_df.empty:
+            return pd.DataFrame()
+        # Convert date column to datetime and set as index
+        sent_df['date'] = pd.to_datetime(sent_df['date'], errors='coerce')
+        # If all dates are NaT, keep numeric index
+        if sent_df['date'].notna().any():
+            sent_df = sent_df.set_index('date').sort_index()
+        return sent_df
+    except Exception:
+        return pd.DataFrame()
+
+def attach_news(result: Dict[str, Any], analyzed_news: List[Dict[str, Any]],
+                 ticker_dir: Path, timestamp: str) -> None:
+    """Attach analyzed news, sentiment metrics and plot data to result and save the news."""
+    ticker = result['ticker']
+    if not analyzed_news:
+        logger.warning("No articles were successfully analyzed")
+        return
+
+    result['news'] = analyzed_news
+    result['sentiment'] = calculate_sentiment_metrics(analyzed_news)
+    result['sentiment_data'] = _sentiment_frame(analyzed_news)
+    
+    # Save news data
+    news_file = ticker_dir / f"{ticker}_news_{timestamp}.json"
+    try:
+        saved_path = save_report(analyzed_news, news_file)
+        result['saved_files'].append(str(saved_path))
+    except Exception as e:
+        error_msg = f"Failed to save news data: {str(e)}"
+        logger.error(error_msg, exc_info=True)
+        if not result.get('error'):
+            result['error'] = error_msg
+
+def attach_features(result: Dict[str, Any], stored: Optional[pd.DataFrame] = None,
+                    since: Optional[pd.Timestamp] = None) -> None:
+    """
+    Attach the trading-day aligned price/sentiment feature frame to result.
+
+    With the previous run's frame (RunCache.stored_features), only the days
+    from since and the newly added bars are recomputed.
+    """
+    try:
+        if stored is not None:
+            result['features'] = update_features(stored, result.get('price_history'),
+                                                 result.get('sentiment_data'), since)
+        else:
+            result['features'] = compute_features(result.get('price_history'), result.get('sentiment_data'))
+    except Exception as e:
+        logger.error(f"Error computing features for {result['ticker']}: {e}", exc_info=True)
+        result['features'] = pd.DataFrame()
+
+def write_summary(result: Dict[str, Any], ticker_dir: Path, timestamp: str) -> None:
+    """Generate and save the summary report; always runs, even if some parts failed."""
+    ticker = result['ticker']
+    try:
+        logger.info("Generating summary report...")
+        # Use safe defaults in case parts of the result are None
+        price_data_list = result.get('price_data') or []
+        news_list = result.get('news') or []
+
+        summary = {
+            'ticker': result['ticker'],
+            'timestamp': result['timestamp'],
+            'price_data_points': len(price_data_list),
+            'news_articles_analyzed': len(news_list),
+            'sentiment_summary': result.get('sentiment', {}),
+            'saved_files': result.get('saved_files', []),
+            'error': result.get('error')
+        }
+        
+        summary_file = ticker_dir / f"{ticker}_summary_{timestamp}.json"
+        try:
+            saved_path = save_report(summary, summary_file)
+            result['saved_files'].append(str(saved_path))
+        except Exception as e:
+            error_msg = f"Failed to save summary report: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            if not result.get('error'):
+                result['error'] = error_msg
+        
+        logger.info(f"Analysis complete. Generated {len(result['saved_files'])} report files for {ticker}")
+        
+    except Exception as e:
+        error_msg = f"Error generating summary for {ticker}: {str(e)}"
+        logger.error(error_msg, exc_info=True)
+        result['error'] = error_msg
+
+def append_dataset(result: Dict[str, Any], run_id: str) -> None:
+    """Append the run to the partitioned Parquet result dataset (see src/storage.py)."""
+    if not SAVE_DATASET:
+        return
+    try:
+        result_store.append_run(result, run_id)
+    except Exception as e:
+        # The per-run report files are already written; the dataset is an index over them
+        logger.error(f"Failed to append {result['ticker']} to the result dataset: {e}", exc_info=True)
+
+def merge_scored(reused: List[Dict[str, Any]], scored: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Articles with cached scores plus newly scored ones, most positive first (as batch_analyze)."""
+    return sorted(reused + scored, key=lambda a: a.get('sentiment', 0), reverse=True) if reused else scored
+
+def restore_run(result: Dict[str, Any], entry: Dict[str, Any], fingerprints: RunFingerprints,
+                 history: pd.DataFrame, news: List[Dict[str, Any]]) -> bool:
+    """
+    Fill result from a cached run whose inputs are unchanged.
+
+    The run's report files and dataset rows are reused as they are; only the
+    in-memory frames are rebuilt from the freshly fetched (identical) inputs.
+
+    Returns:
+        bool: False, leaving result untouched, if any of the run's report
+        files is gone (e.g. pruned by cleanup); the run must then be redone
+    """
+    missing = run_cache.missing_files(entry)
+    if missing or not entry['result'].get('saved_files'):
+        logger.info(f"Cached run of {result['ticker']} is missing {len(missing)} report files; recomputing")
+        return False
+    cached = entry['result']
+    result.update({
+        'timestamp': cached['timestamp'],
+        'run_id': cached['run_id'],
+        'sentiment': cached['sentiment'],
+        'saved_files': list(cached['saved_files']),
+        'reused': True,
+        'price_history': history,
+        'price_data': RecordsView(history)
+    })
+    analyzed, _ = run_cache.split(entry, fingerprints, news)
+    if analyzed:
+        result['news'] = merge_scored(analyzed, [])
+        result['sentiment_data'] = _sentiment_frame(result['news'])
+    logger.info(f"Inputs of {result['ticker']} unchanged since run {cached['run_id']}; reusing its reports")
+    return True
+
+def verify_saved_files(result: Dict[str, Any]) -> None:
+    """Drop saved file entries that do not exist on disk."""
+    verified_files = []
+    for filepath in result.get('saved_files', []):
+        if Path(filepath).exists():
+            verified_files.append(filepath)
+        else:
+            logger.warning(f"Expected file not found: {filepath}")
+    
+    result['saved_files'] = verified_files
+    
+    if not verified_files and not result.get('error'):
+        result['error'] = "No report files were generated. Check logs for details."
+
+def aggregate_analysis(ticker: str, period: str = '1y', num_articles: int = 20,
+                       full_text: bool = ENRICH_FULL_TEXT) -> Dict[str, Any]:
     """
     Aggregate all analysis for a given ticker and save results to reports directory.
     
@@ -104,6 +440,8 @@ def aggregate_analysis(ticker: str, period: str = '1y', num_articles: int = 20)
         ticker: Stock ticker symbol
         period: Time period for historical data (e.g., '1y', '6mo')
         num_articles: Number of news articles to analyze
+        full_text: Scrape article bodies (within the ENRICH_* budget) and
+            score them instead of headlines
         
     Returns:
         dict: Aggregated analysis results with 'saved_files' list and 'error' if any
@@ -111,166 +449,93 @@ def aggregate_analysis(ticker: str, period: str = '1y', num_articles: int = 20)
     logger.info(f"Starting analysis for {ticker}")
     
     # Initialize response with default values
-    result = {
-        'ticker': ticker.upper(),
-        'timestamp': datetime.now().isoformat(),
-        'price_data': None,
-        'sentiment': {},
-        'news': [],
-        'saved_files': [],
-        'error': None
-    }
+    result = new_result(ticker)
+    ticker = result['ticker']
     
-    ticker_dir = None
     try:
         # 0. Setup directories
-        ticker_dir = get_company_dir(ticker.upper())
-        ticker_dir.mkdir(parents=True, exist_ok=True)
+        ticker_dir = get_company_dir(ticker)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        result['run_id'] = timestamp
         
-        # 1. Fetch and save stock data
+        # 1. Fetch stock data
         logger.info(f"Fetching stock data for {ticker}...")
         try:
-            stock_data = fetch_stock_data(ticker, period)
-            if not stock_data or 'history' not in stock_data or stock_data['history'].empty:
-                logger.warning(f"No price data available for {ticker}")
-                result['error'] = f"No price data available for {ticker}"
-            else:
-                # Save price data
-                price_file = ticker_dir / f"{ticker}_price_data_{timestamp}.csv"
-                try:
-                    # Ensure directory exists
-                    price_file.parent.mkdir(parents=True, exist_ok=True)
-                    # Save the file
-                    stock_data['history'].to_csv(price_file, index=False)
-                    # Verify it was created
-                    if not price_file.exists():
-                        raise FileNotFoundError(f"Failed to create price data file: {price_file}")
-                    
-                    saved_path = str(price_file.absolute())
-                    result['saved_files'].append(saved_path)
-                    # Keep both raw DataFrame (for plotting) and a JSON-serializable
-                    # representation for the aggregated result.
-                    try:
-                        result['price_history'] = stock_data['history']
-                    except Exception:
-                        result['price_history'] = None
-                    result['price_data'] = stock_data['history'].to_dict(orient='records')
-                    logger.info(f"Successfully saved price data to {saved_path}")
-                except Exception as e:
-                    error_msg = f"Failed to save price data: {str(e)}"
-                    logger.error(error_msg, exc_info=True)
-                    result['error'] = error_msg
+            # Only history is needed here; info/financials stay unfetched unless
+            # a consumer of result['stock_data'] (e.g. the CLI) reads them.
+            result['stock_data'] = fetch_stock_data(ticker, period)
         except Exception as e:
             error_msg = f"Error fetching stock data for {ticker}: {str(e)}"
             logger.error(error_msg, exc_info=True)
             result['error'] = error_msg
+        history = (result.get('stock_data') or {}).get('history')
         
-        # 2. Fetch and analyze news
+        # 2. Fetch news
         logger.info(f"Fetching news for {ticker}...")
         try:
-            news = fetch_news_rss(ticker, num_articles)
-            
-            if not news:
-                logger.warning(f"No news articles found for {ticker}")
+            if NEWS_INGEST_ENABLED:
+                news = ingest_ticker_news([ticker], num_articles).get(ticker) or []
             else:
-                logger.info(f"Analyzing sentiment for {len(news)} articles...")
-                analyzed_news = batch_analyze(news)
-                
-                if not analyzed_news:
-                    logger.warning("No articles were successfully analyzed")
-                else:
-                    result['news'] = analyzed_news
-                    result['sentiment'] = calculate_sentiment_metrics(analyzed_news)
-
-                    # Build a sentiment DataFrame (date -> sentiment score) for plotting
-                    try:
-                        sent_df = pd.DataFrame([
-                            {
-                                'date': a.get('date') if a.get('date') is not None else a.get('analysis_timestamp'),
-                                'sentiment': a.get('sentiment', 0.0),
-                                'title': a.get('title', '')
-                            }
-                            for a in analyzed_news
-                        ])
-                        if not sent_df.empty:
-                            # Convert date column to datetime and set as index
-                            sent_df['date'] = pd.to_datetime(sent_df['date'], errors='coerce')
-                            # If all dates are NaT, keep numeric index
-                            if sent_df['date'].notna().any():
-                                sent_df = sent_df.set_index('date').sort_index()
-                            result['sentiment_data'] = sent_df
-                        else:
-                            result['sentiment_data'] = pd.DataFrame()
-                    except Exception:
-                        result['sentiment_data'] = pd.DataFrame()
-                    
-                    # Save news data
-                    news_file = ticker_dir / f"{ticker}_news_{timestamp}.json"
-                    try:
-                        saved_path = save_report(analyzed_news, news_file)
-                        result['saved_files'].append(str(saved_path))
-                    except Exception as e:
-                        error_msg = f"Failed to save news data: {str(e)}"
-                        logger.error(error_msg, exc_info=True)
-                        if not result.get('error'):
-                            result['error'] = error_msg
+                news = fetch_news_rss(ticker, num_articles) or []
+            if news and DEDUP_ENABLED:
+                # Score each wire story once, weighted by how many outlets ran it
+                news = dedup_articles(news)
         except Exception as e:
+            news = None
             error_msg = f"Error processing news for {ticker}: {str(e)}"
             logger.error(error_msg, exc_info=True)
             if not result.get('error'):  # Only set if no previous error
                 result['error'] = error_msg
         
-        # 3. Always generate and save summary, even if some parts failed
+        # 3. Reuse the previous run outright if prices, news and analyzer are unchanged
+        fingerprints = entry = None
+        cache_params = (period, num_articles, bool(full_text))
+        if RUN_CACHE_ENABLED and not result.get('error'):
+            fingerprints = RunFingerprints(news, history)
+            entry = run_cache.get(ticker, cache_params)
+            if run_cache.unchanged(entry, fingerprints) and restore_run(result, entry, fingerprints, history, news):
+                attach_features(result, *run_cache.stored_features(entry, fingerprints, news))
+                return result
+        
+        # 4. Save stock data
+        if 'stock_data' in result:
+            attach_price_history(result, history, ticker_dir, timestamp)
+        
+        # 5. Analyze news; articles unchanged since the last run keep their scores
         try:
-            logger.info("Generating summary report...")
-            # Use safe defaults in case parts of the result are None
-            price_data_list = result.get('price_data') or []
-            news_list = result.get('news') or []
-
-            summary = {
-                'ticker': result['ticker'],
-                'timestamp': result['timestamp'],
-                'price_data_points': len(price_data_list),
-                'news_articles_analyzed': len(news_list),
-                'sentiment_summary': result.get('sentiment', {}),
-                'saved_files': result.get('saved_files', []),
-                'error': result.get('error')
-            }
-            
-            summary_file = ticker_dir / f"{ticker}_summary_{timestamp}.json"
-            try:
-                saved_path = save_report(summary, summary_file)
-                result['saved_files'].append(str(saved_path))
-            except Exception as e:
-                error_msg = f"Failed to save summary report: {str(e)}"
-                logger.error(error_msg, exc_info=True)
-                if not result.get('error'):
-                    result['error'] = error_msg
-            
-            logger.info(f"Analysis complete. Generated {len(result['saved_files'])} report files for {ticker}")
-            
+            if news is not None and not news:
+                logger.warning(f"No news articles found for {ticker}")
+            elif news:
+                reused, fresh = run_cache.split(entry, fingerprints, news) if fingerprints else ([], news)
+                if fresh:
+                    if full_text:
+                        logger.info(f"Fetching article bodies for {len(fresh)} articles...")
+                        fresh = enrich_articles(fresh)
+                    logger.info(f"Analyzing sentiment for {len(fresh)} articles...")
+                    fresh = batch_analyze(fresh)
+                attach_news(result, merge_scored(reused, fresh), ticker_dir, timestamp)
         except Exception as e:
-            error_msg = f"Error generating summary for {ticker}: {str(e)}"
+            error_msg = f"Error processing news for {ticker}: {str(e)}"
             logger.error(error_msg, exc_info=True)
-            result['error'] = error_msg
+            if not result.get('error'):  # Only set if no previous error
+                result['error'] = error_msg
+        
+        # 6. Align sentiment with prices and compute rolling indicators,
+        # extending the last run's frame when only new bars or articles arrived
+        attach_features(result, *run_cache.stored_features(entry, fingerprints, news or []))
+        
+        # 7. Always generate and save summary, even if some parts failed
+        write_summary(result, ticker_dir, timestamp)
+        append_dataset(result, timestamp)
         
     except Exception as e:
         error_msg = f"Unexpected error in aggregate_analysis for {ticker}: {str(e)}"
         logger.error(error_msg, exc_info=True)
         result['error'] = error_msg
+        fingerprints = None
     
     # Verify files were actually created
-    verified_files = []
-    for filepath in result.get('saved_files', []):
-        if Path(filepath).exists():
-            verified_files.append(filepath)
-        else:
-            logger.warning(f"Expected file not found: {filepath}")
-    
-    result['saved_files'] = verified_files
-    
-    if not verified_files and not result.get('error'):
-        result['error'] = "No report files were generated. Check logs for details."
-    
+    verify_saved_files(result)
+    if fingerprints is not None:
+        run_cache.save(ticker, cache_params, fingerprints, result)
     return result
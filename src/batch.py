@@ -0,0 +1,360 @@
+"""
+Multi-ticker batch analysis.
+
+Each ticker flows through independent stages (price fetch, news fetch,
+article body enrichment, sentiment scoring and report writing). Prices are downloaded in chunks of
+tickers with one batched request each. Every stage has its own bounded
+worker pool, so network-bound fetches for later tickers overlap with scoring
+and writing of earlier ones, and a failure in one ticker only affects that
+ticker's result. With NEWS_INGEST_ENABLED, all news feeds are fetched by one
+asynchronous ingestion (src/ingest.py) instead of the news pool.
+
+With RUN_CACHE_ENABLED, a ticker whose prices, news and analyzer are
+unchanged since its last run returns that run without scoring or writing
+anything, and only new or changed articles are enriched and scored
+(see src/run_cache.py).
+
+Run with: python -m src.batch AAPL MSFT NVDA
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.aggregator import (
+    get_company_dir,
+    new_result,
+    attach_price_history,
+    attach_news,
+    attach_features,
+    write_summary,
+    append_dataset,
+    verify_saved_files,
+    merge_scored,
+    restore_run
+)
+from src.fetch_data import fetch_stock_history, fetch_stock_history_bulk
+from src.news_processor import fetch_news_rss, enrich_articles
+from src.ingest import start_ticker_news
+from src.dedup import dedup_articles
+from src.sentiment_analyzer import batch_analyze, warm_up
+from src.run_cache import run_cache, RunFingerprints, price_fingerprint
+from src.utils import logger
+from src.config import (
+    BATCH_PRICE_WORKERS,
+    BATCH_NEWS_WORKERS,
+    BATCH_ENRICH_WORKERS,
+    BATCH_SCORE_WORKERS,
+    BATCH_WRITE_WORKERS,
+    BULK_DOWNLOAD_CHUNK_SIZE,
+    ENRICH_FULL_TEXT,
+    DEDUP_ENABLED,
+    RUN_CACHE_ENABLED,
+    NEWS_INGEST_ENABLED
+)
+
+ProgressCallback = Callable[[str, str, Optional[str]], None]
+
+
+class _TickerJob:
+    """Intermediate state of one ticker as it moves through the stages."""
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+        self.history = None
+        self.news: Optional[List[Dict[str, Any]]] = None
+        self.analyzed: Optional[List[Dict[str, Any]]] = None
+        # Run cache state: articles with cached scores and those still to enrich and score
+        self.fingerprints: Optional[RunFingerprints] = None
+        self.cache_entry: Optional[Dict[str, Any]] = None
+        self.reused: List[Dict[str, Any]] = []
+        self.fresh: List[Dict[str, Any]] = []
+        self.price_done = False
+        self.news_done = False
+        self.errors: Dict[str, str] = {}
+        self.started = time.time()
+
+    @property
+    def ready_to_write(self) -> bool:
+        return self.price_done and self.news_done
+
+
+def _log_progress(ticker: str, stage: str, error: Optional[str]) -> None:
+    if error:
+        logger.warning(f"[batch] {ticker}: {stage} failed: {error}")
+    else:
+        logger.info(f"[batch] {ticker}: {stage} done")
+
+
+def _dedup(news: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Collapse duplicate stories before enrichment and scoring."""
+    return dedup_articles(news) if news and DEDUP_ENABLED else news
+
+
+def _news_stage(ticker: str, num_articles: int) -> List[Dict[str, Any]]:
+    """Fetch a ticker's news feed and collapse duplicate stories."""
+    return _dedup(fetch_news_rss(ticker, num_articles) or [])
+
+
+def _write_stage(job: _TickerJob, cache_params: tuple) -> Dict[str, Any]:
+    """Save the artifacts for one ticker and build its result dict."""
+    result = new_result(job.ticker)
+    ticker_dir = get_company_dir(job.ticker)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    result['run_id'] = timestamp
+
+    if job.fingerprints is not None and not job.errors:
+        job.fingerprints.price = price_fingerprint(job.history)
+        if run_cache.unchanged(job.cache_entry, job.fingerprints) and \
+                restore_run(result, job.cache_entry, job.fingerprints, job.history, job.news):
+            attach_features(result, *run_cache.stored_features(job.cache_entry, job.fingerprints, job.news))
+            result['failed_stages'] = []
+            result['elapsed_sec'] = round(time.time() - job.started, 3)
+            return result
+
+    if 'price' in job.errors:
+        result['error'] = f"Error fetching stock data for {job.ticker}: {job.errors['price']}"
+    else:
+        attach_price_history(result, job.history, ticker_dir, timestamp)
+
+    if 'news' in job.errors or 'score' in job.errors:
+        stage = 'news' if 'news' in job.errors else 'score'
+        if not result.get('error'):
+            result['error'] = f"Error processing news for {job.ticker}: {job.errors[stage]}"
+    elif job.analyzed:
+        attach_news(result, job.analyzed, ticker_dir, timestamp)
+    else:
+        logger.warning(f"No news articles found for {job.ticker}")
+
+    attach_features(result, *run_cache.stored_features(job.cache_entry, job.fingerprints, job.news or []))
+    write_summary(result, ticker_dir, timestamp)
+    append_dataset(result, timestamp)
+    verify_saved_files(result)
+    if job.fingerprints is not None:
+        run_cache.save(job.ticker, cache_params, job.fingerprints, result)
+    result['failed_stages'] = sorted(job.errors)
+    result['elapsed_sec'] = round(time.time() - job.started, 3)
+    return result
+
+
+def batch_aggregate(tickers: Iterable[str], period: str = '1y', num_articles: int = 20,
+                    price_workers: int = BATCH_PRICE_WORKERS,
+                    news_workers: int = BATCH_NEWS_WORKERS,
+                    enrich_workers: int = BATCH_ENRICH_WORKERS,
+                    score_workers: int = BATCH_SCORE_WORKERS,
+                    write_workers: int = BATCH_WRITE_WORKERS,
+                    chunk_size: int = BULK_DOWNLOAD_CHUNK_SIZE,
+                    full_text: bool = ENRICH_FULL_TEXT,
+                    progress: Optional[ProgressCallback] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Analyze many tickers with pipelined, per-stage bounded concurrency.
+
+    Args:
+        tickers: Stock ticker symbols (duplicates are analyzed once)
+        period: Time period for historical data (e.g., '1y', '6mo')
+        num_articles: Number of news articles to analyze per ticker
+        price_workers: Concurrent price history downloads
+        news_workers: Concurrent RSS fetches (when NEWS_INGEST_ENABLED is off;
+            otherwise src.ingest fetches every feed at once)
+        enrich_workers: Tickers whose article bodies are fetched concurrently
+        score_workers: Concurrent sentiment scoring jobs
+        write_workers: Concurrent report writers
+        chunk_size: Tickers per batched price download; a chunk that fails
+            as a whole, or a ticker it returns no bars for, is retried
+            ticker by ticker
+        full_text: Scrape article bodies (within the ENRICH_* budget per
+            ticker) and score them instead of headlines
+        progress: Called as progress(ticker, stage, error) whenever a stage
+            finishes for a ticker; error is None on success
+
+    Returns:
+        dict: Ticker -> result in the same shape as aggregate_analysis, plus
+        'failed_stages' and 'elapsed_sec'
+    """
+    progress = progress or _log_progress
+    jobs = {t: _TickerJob(t) for t in dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip())}
+    results: Dict[str, Dict[str, Any]] = {}
+    if not jobs:
+        return results
+
+    logger.info(f"Starting batch analysis for {len(jobs)} tickers")
+    pools = {
+        'price': ThreadPoolExecutor(max_workers=price_workers, thread_name_prefix='batch-price'),
+        'bulk_price': ThreadPoolExecutor(max_workers=price_workers, thread_name_prefix='batch-bulk'),
+        'news': ThreadPoolExecutor(max_workers=news_workers, thread_name_prefix='batch-news'),
+        'enrich': ThreadPoolExecutor(max_workers=enrich_workers, thread_name_prefix='batch-enrich'),
+        'score': ThreadPoolExecutor(max_workers=score_workers, thread_name_prefix='batch-score'),
+        'write': ThreadPoolExecutor(max_workers=write_workers, thread_name_prefix='batch-write')
+    }
+    pending: Dict[Future, tuple] = {}
+    # Same key as aggregate_analysis, so single and batch runs share cached runs
+    cache_params = (period, num_articles, bool(full_text))
+
+    def submit(stage: str, job, fn, *args) -> None:
+        pending[pools[stage].submit(fn, *args)] = (stage, job)
+
+    def schedule_write(job: _TickerJob) -> None:
+        if job.ready_to_write and job.ticker not in results:
+            results[job.ticker] = None
+            submit('write', job, _write_stage, job, cache_params)
+
+    try:
+        # Load the shared analyzer while the first fetches are in flight
+        pools['score'].submit(warm_up)
+        symbols = list(jobs)
+        for start in range(0, len(symbols), chunk_size):
+            chunk = [jobs[t] for t in symbols[start:start + chunk_size]]
+            submit('bulk_price', chunk, fetch_stock_history_bulk,
+                   [j.ticker for j in chunk], period, chunk_size)
+        if NEWS_INGEST_ENABLED:
+            # All feeds are fetched by one async ingestion; each ticker's future
+            # resolves as soon as its own feeds are in
+            for ticker, future in start_ticker_news(symbols, num_articles, postprocess=_dedup).items():
+                pending[future] = ('news', jobs[ticker])
+        else:
+            for job in jobs.values():
+                submit('news', job, _news_stage, job.ticker, num_articles)
+
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, job = pending.pop(future)
+                if stage == 'bulk_price':
+                    frames = future.exception() is None and future.result()
+                    if not frames:
+                        # The whole chunk failed; fall back to one request per ticker
+                        for chunk_job in job:
+                            submit('price', chunk_job, fetch_stock_history, chunk_job.ticker, period)
+                        continue
+                    for chunk_job in job:
+                        history = frames.get(chunk_job.ticker)
+                        if history is None or history.dropna(how='all').empty:
+                            # yfinance can leave single tickers of a good chunk empty
+                            submit('price', chunk_job, fetch_stock_history, chunk_job.ticker, period)
+                            continue
+                        chunk_job.history = history.dropna(how='all')
+                        chunk_job.price_done = True
+                        progress(chunk_job.ticker, 'price', None)
+                        schedule_write(chunk_job)
+                    continue
+
+                error = None
+                try:
+                    value = future.result()
+                except Exception as e:
+                    value = None
+                    error = str(e) or e.__class__.__name__
+                    job.errors[stage] = error
+                progress(job.ticker, stage, error)
+
+                if stage == 'price':
+                    job.history = value
+                    job.price_done = True
+                elif stage == 'news':
+                    job.news = value or []
+                    job.fresh = job.news
+                    if RUN_CACHE_ENABLED and error is None:
+                        # Fingerprint the feed articles before enrichment adds bodies
+                        job.fingerprints = RunFingerprints(job.news)
+                        job.cache_entry = run_cache.get(job.ticker, cache_params)
+                        job.reused, job.fresh = run_cache.split(job.cache_entry, job.fingerprints, job.news)
+                    if not job.fresh:
+                        job.analyzed = merge_scored(job.reused, [])
+                        job.news_done = True
+                    elif full_text:
+                        submit('enrich', job, enrich_articles, job.fresh)
+                    else:
+                        submit('score', job, batch_analyze, job.fresh)
+                elif stage == 'enrich':
+                    # On failure the articles are still scored on their headlines
+                    if value is not None:
+                        job.fresh = value
+                    submit('score', job, batch_analyze, job.fresh)
+                elif stage == 'score':
+                    job.analyzed = merge_scored(job.reused, value or [])
+                    job.news_done = True
+                elif stage == 'write':
+                    if value is None:
+                        value = new_result(job.ticker)
+                        value['error'] = f"Error writing reports for {job.ticker}: {error}"
+                        value['failed_stages'] = sorted(job.errors)
+                    results[job.ticker] = value
+                    continue
+
+                schedule_write(job)
+    finally:
+        for pool in pools.values():
+            pool.shutdown(wait=True)
+
+    failed = [t for t, r in results.items() if r.get('error')]
+    logger.info(f"Batch analysis complete: {len(results) - len(failed)} succeeded, {len(failed)} with errors")
+    return {t: results[t] for t in jobs}
+
+
+def _read_tickers(args: argparse.Namespace) -> List[str]:
+    tickers = [t for arg in args.tickers for t in arg.split(',')]
+    if args.file:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if line:
+                    tickers.extend(line.replace(',', ' ').split())
+    return tickers
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for batch analysis."""
+    parser = argparse.ArgumentParser(description="Analyze many stock tickers in one batch.")
+    parser.add_argument('tickers', nargs='*', help="Ticker symbols (space or comma separated)")
+    parser.add_argument('-f', '--file', help="File with ticker symbols, one or more per line")
+    parser.add_argument('--period', default='1y', help="History period (default: 1y)")
+    parser.add_argument('--articles', type=int, default=20, help="News articles per ticker (default: 20)")
+    parser.add_argument('--price-workers', type=int, default=BATCH_PRICE_WORKERS)
+    parser.add_argument('--news-workers', type=int, default=BATCH_NEWS_WORKERS)
+    parser.add_argument('--enrich-workers', type=int, default=BATCH_ENRICH_WORKERS)
+    parser.add_argument('--score-workers', type=int, default=BATCH_SCORE_WORKERS)
+    parser.add_argument('--headlines-only', action='store_true',
+                        help="Score headlines without fetching article bodies")
+    args = parser.parse_args(argv)
+
+    tickers = _read_tickers(args)
+    if not tickers:
+        parser.error("no tickers given")
+
+    completed = {'count': 0}
+    total = len(set(t.strip().upper() for t in tickers if t.strip()))
+
+    def report_progress(ticker: str, stage: str, error: Optional[str]) -> None:
+        _log_progress(ticker, stage, error)
+        if stage == 'write':
+            completed['count'] += 1
+            print(f"[{completed['count']}/{total}] {ticker} {'FAILED' if error else 'done'}")
+
+    start = time.time()
+    results = batch_aggregate(
+        tickers,
+        period=args.period,
+        num_articles=args.articles,
+        price_workers=args.price_workers,
+        news_workers=args.news_workers,
+        enrich_workers=args.enrich_workers,
+        score_workers=args.score_workers,
+        full_text=ENRICH_FULL_TEXT and not args.headlines_only,
+        progress=report_progress
+    )
+
+    print(f"\n{'Ticker':<10}{'Status':<10}{'Articles':>9}{'Avg sentiment':>15}  Error")
+    for ticker, result in results.items():
+        sentiment = result.get('sentiment') or {}
+        average = sentiment.get('weighted_average', sentiment.get('average'))
+        average = f"{average:.3f}" if average is not None else '-'
+        status = 'error' if result.get('error') else 'ok'
+        print(f"{ticker:<10}{status:<10}{len(result.get('news') or []):>9}{average:>15}  {result.get('error') or ''}")
+    print(f"\nAnalyzed {len(results)} tickers in {time.time() - start:.1f}s")
+    return 0 if all(not r.get('error') for r in results.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
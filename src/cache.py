@@ -0,0 +1,181 @@
+import os
+import pickle
+import hashlib
+import logging
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+ENTRY_SUFFIX = '.pkl'
+
+
+class DiskCache:
+    """
+    Persistent key/value cache with per-entry expiry and size-bounded LRU eviction.
+
+    Each entry is stored as a pickle file named after the SHA-256 digest of its
+    key, so keys may contain any characters. Writes go to a temporary file that
+    is atomically renamed into place, which keeps concurrent readers (threads or
+    worker processes sharing the same root) from ever seeing a partial entry.
+    """
+
+    def __init__(self, root: Union[str, Path], max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        # filename -> size in bytes, ordered from least to most recently used
+        self._index: Optional[OrderedDict] = None
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return self.root / f"{digest}{ENTRY_SUFFIX}"
+
+    def _load_index(self) -> OrderedDict:
+        """Build the LRU index from the files on disk (oldest access first)."""
+        if self._index is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            entries = []
+            for path in self.root.glob(f'*{ENTRY_SUFFIX}'):
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, path.name, st.st_size))
+            entries.sort()
+            self._index = OrderedDict((name, size) for _, name, size in entries)
+            self._total_bytes = sum(self._index.values())
+        return self._index
+
+    def _forget(self, name: str) -> None:
+        size = self._load_index().pop(name, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _remove(self, path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        self._forget(path.name)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for ``key``, or None if missing or expired."""
+        path = self._path(key)
+        with self._lock:
+            index = self._load_index()
+            try:
+                with open(path, 'rb') as f:
+                    entry = pickle.load(f)
+            except FileNotFoundError:
+                self._forget(path.name)
+                self.misses += 1
+                return None
+            except Exception as e:
+                logger.warning(f"Discarding unreadable cache entry for {key}: {e}")
+                self._remove(path)
+                self.misses += 1
+                return None
+
+            expires_at = entry.get('expires_at')
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(path)
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            # Touch the file so the LRU order survives a restart
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            if path.name in index:
+                index.move_to_end(path.name)
+            self.hits += 1
+            return entry.get('data')
+
+    def set(self, key: str, data: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store ``data`` under ``key``, expiring after ``ttl_seconds`` (None = never)."""
+        path = self._path(key)
+        entry = {
+            'key': key,
+            'created_at': time.time(),
+            'expires_at': time.time() + ttl_seconds if ttl_seconds is not None else None,
+            'data': data
+        }
+        payload = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            logger.warning(f"Not caching {key}: entry of {len(payload)} bytes exceeds cache size")
+            return
+
+        with self._lock:
+            self._load_index()
+            fd, tmp_name = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(payload)
+                os.replace(tmp_name, path)
+            except Exception:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+                raise
+
+            self._forget(path.name)
+            self._index[path.name] = len(payload)
+            self._total_bytes += len(payload)
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        index = self._load_index()
+        while self._total_bytes > self.max_bytes and index:
+            name, size = index.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                (self.root / name).unlink()
+            except FileNotFoundError:
+                pass
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        """Remove a single entry if present."""
+        with self._lock:
+            self._remove(self._path(key))
+
+    def clear(self) -> None:
+        """Remove every entry (and any stray temporary files) from the cache root."""
+        with self._lock:
+            if self.root.exists():
+                for path in self.root.iterdir():
+                    if path.is_file() and path.suffix in (ENTRY_SUFFIX, '.tmp'):
+                        try:
+                            path.unlink()
+                        except OSError as e:
+                            logger.error(f"Error deleting cache file {path}: {e}")
+            self._index = OrderedDict()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and the current cache footprint."""
+        with self._lock:
+            index = self._load_index()
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'evictions': self.evictions,
+                'entries': len(index),
+                'size_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes
+            }
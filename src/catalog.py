@@ -0,0 +1,192 @@
+import re
+import sqlite3
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Report file names end in a run timestamp: AAPL_summary_20240501_093000.json
+_RUN_ID_RE = re.compile(r'(\d{8}_\d{6})$')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    path TEXT PRIMARY KEY,
+    ticker TEXT NOT NULL,
+    run_id TEXT,
+    kind TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artifacts_ticker_ext_created ON artifacts (ticker, ext, created);
+CREATE INDEX IF NOT EXISTS artifacts_created ON artifacts (created);
+CREATE TABLE IF NOT EXISTS scanned_dirs (
+    ticker TEXT PRIMARY KEY,
+    scanned REAL NOT NULL
+);
+"""
+
+
+def parse_artifact_name(path: Union[str, Path], ticker: str) -> Tuple[str, Optional[str]]:
+    """
+    Split a report file name into (kind, run_id).
+
+    'AAPL_AAPL_analysis_20240501_093000.png' -> ('analysis', '20240501_093000');
+    'AAPL_price_data.csv' -> ('price_data', None)
+    """
+    stem = Path(path).stem
+    match = _RUN_ID_RE.search(stem)
+    run_id = match.group(1) if match else None
+    if run_id:
+        stem = stem[:match.start()].rstrip('_')
+    prefix = f"{ticker.upper()}_"
+    while stem.upper().startswith(prefix):
+        stem = stem[len(prefix):]
+    return stem or 'report', run_id
+
+
+class ReportCatalog:
+    """
+    SQLite index of the report files written per ticker.
+
+    Every artifact (price CSV, news/summary JSON, plot PNG, ...) is recorded
+    with its ticker, run id, kind, size and creation time when it is written,
+    so latest-report lookups, listings and retention pruning are indexed
+    queries instead of globbing and stat()-ing every file in a ticker's
+    directory. A ticker directory that predates the catalog (or was filled by
+    hand) is scanned once, the first time it is queried.
+    """
+
+    def __init__(self, db_path: Union[str, Path]):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def record(self, path: Union[str, Path], ticker: str, run_id: Optional[str] = None,
+               kind: Optional[str] = None) -> None:
+        """Add (or refresh) a written file; run_id and kind default to ones parsed from its name."""
+        path = Path(path).absolute()
+        st = path.stat()
+        parsed_kind, parsed_run = parse_artifact_name(path, ticker)
+        with self._lock, self._db() as db:
+            db.execute(
+                'INSERT OR REPLACE INTO artifacts (path, ticker, run_id, kind, ext, size, created) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (str(path), ticker.upper(), run_id or parsed_run, kind or parsed_kind,
+                 path.suffix.lstrip('.').lower(), st.st_size, st.st_mtime)
+            )
+
+    def ensure_scanned(self, ticker: str, directory: Union[str, Path]) -> None:
+        """Index the files of a ticker directory not yet known to the catalog (once per ticker)."""
+        ticker = ticker.upper()
+        with self._lock:
+            if self._db().execute('SELECT 1 FROM scanned_dirs WHERE ticker = ?', (ticker,)).fetchone():
+                return
+        rows = []
+        for path in Path(directory).glob('*.*'):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            if not path.is_file():
+                continue
+            kind, run_id = parse_artifact_name(path, ticker)
+            rows.append((str(path.absolute()), ticker, run_id, kind, path.suffix.lstrip('.').lower(),
+                         st.st_size, st.st_mtime))
+        with self._lock, self._db() as db:
+            db.executemany('INSERT OR IGNORE INTO artifacts (path, ticker, run_id, kind, ext, size, created) '
+                           'VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+            db.execute('INSERT OR REPLACE INTO scanned_dirs (ticker, scanned) VALUES (?, ?)', (ticker, time.time()))
+        if rows:
+            logger.info(f"Indexed {len(rows)} existing report files for {ticker}")
+
+    def forget(self, paths: Iterable[Union[str, Path]]) -> None:
+        """Drop catalog entries (the files themselves are left alone)."""
+        with self._lock, self._db() as db:
+            db.executemany('DELETE FROM artifacts WHERE path = ?', [(str(Path(p).absolute()),) for p in paths])
+
+    def latest(self, ticker: str, exts: Iterable[str] = ('csv', 'png', 'json')) -> Dict[str, Path]:
+        """Newest file per extension for ticker; entries whose file has gone are dropped."""
+        latest = {}
+        for ext in exts:
+            while True:
+                with self._lock:
+                    row = self._db().execute(
+                        'SELECT path FROM artifacts WHERE ticker = ? AND ext = ? ORDER BY created DESC, run_id DESC LIMIT 1',
+                        (ticker.upper(), ext)
+                    ).fetchone()
+                if row is None:
+                    break
+                if Path(row[0]).exists():
+                    latest[ext] = Path(row[0])
+                    break
+                self.forget([row[0]])
+        return latest
+
+    def run_files(self, ticker: str, run_id: str, exts: Iterable[str] = ('csv', 'png', 'json')) -> List[Path]:
+        """Existing files of one run of ticker with the given extensions."""
+        exts = list(exts)
+        with self._lock:
+            rows = self._db().execute(
+                f"SELECT path FROM artifacts WHERE ticker = ? AND run_id = ? AND ext IN ({','.join('?' * len(exts))}) "
+                'ORDER BY path', (ticker.upper(), run_id, *exts)
+            ).fetchall()
+        return [Path(r[0]) for r in rows if Path(r[0]).exists()]
+
+    def files(self, ticker: str, keep_runs: int = 0, keep_run_ids: Iterable[Optional[str]] = ()) -> List[Path]:
+        """
+        Files of ticker outside its keep_runs most recent runs and the runs in
+        keep_run_ids (all files when neither keeps a run).
+
+        Files without a run id in their name are kept when they are newer
+        than the oldest kept run.
+        """
+        ticker = ticker.upper()
+        kept = {run_id for run_id in keep_run_ids if run_id}
+        with self._lock:
+            db = self._db()
+            if keep_runs > 0:
+                # Run ids are timestamps, so they sort chronologically
+                kept.update(r[0] for r in db.execute(
+                    'SELECT DISTINCT run_id FROM artifacts WHERE ticker = ? AND run_id IS NOT NULL '
+                    'ORDER BY run_id DESC LIMIT ?', (ticker, keep_runs)))
+            if keep_runs <= 0 and not kept:
+                rows = db.execute('SELECT path FROM artifacts WHERE ticker = ?', (ticker,)).fetchall()
+            else:
+                kept_list = ', '.join('?' * len(kept))
+                rows = db.execute(
+                    f'SELECT path FROM artifacts WHERE ticker = ? AND ('
+                    f'(run_id IS NOT NULL AND run_id NOT IN ({kept_list})) OR '
+                    f'(run_id IS NULL AND created < (SELECT MIN(created) FROM artifacts '
+                    f'WHERE ticker = ? AND run_id IN ({kept_list}))))',
+                    (ticker, *kept, ticker, *kept)
+                ).fetchall()
+        return [Path(r[0]) for r in rows]
+
+    def recent(self, limit: int = 20) -> List[Dict[str, object]]:
+        """Most recently analyzed tickers with their last run time, run count and file count."""
+        with self._lock:
+            rows = self._db().execute(
+                'SELECT ticker, MAX(created), COUNT(DISTINCT run_id), COUNT(*), SUM(size) FROM artifacts '
+                'GROUP BY ticker ORDER BY MAX(created) DESC LIMIT ?', (limit,)
+            ).fetchall()
+        return [{'ticker': t, 'last_run': last, 'runs': runs, 'files': files, 'bytes': size}
+                for t, last, runs, files, size in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
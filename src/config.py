@@ -20,22 +20,80 @@ NEWS_SOURCES = [
     'https://www.investing.com/rss/news.rss'
 ]
 
+NEWS_CACHE_MINUTES = 60  # reuse a ticker's fetched news without revalidating
+FEED_STATE_TTL_HOURS = 24 * 7  # how long ETag/Last-Modified validators are kept per feed
+
 RESPECT_ROBOTS = True
 ALLOW_PAYWALLED = False
 REQUEST_TIMEOUT_SEC = 15
-REQUEST_DELAY_SEC = 1
+REQUEST_DELAY_SEC = 1  # minimum spacing between requests to the same host
+HTTP_RETRIES = 2  # retries of a GET answered with 429 or a 5xx status
+HTTP_RETRY_BACKOFF_SEC = 0.5  # exponential backoff base between those retries
+SCRAPE_MAX_WORKERS = 8  # hosts scraped in parallel
+SCRAPE_MAX_BYTES = 2 * 1024 * 1024  # stop reading an article page after this many bytes
+SCRAPE_CHUNK_BYTES = 64 * 1024
+INGEST_MAX_CONNECTIONS = 32  # concurrent feed downloads in src.ingest
+INGEST_PER_HOST_CONNECTIONS = 4
+INGEST_PARSE_WORKERS = 4
+NEWS_INGEST_ENABLED = True  # fetch news with src.ingest: ticker query plus NEWS_SOURCES headlines citing it
+INGEST_SHARED_FEED_TTL_SEC = 300  # NEWS_SOURCES feeds are reused in-process this long across ticker runs
+ROBOTS_CACHE_TTL_HOURS = 24  # used when robots.txt has no Cache-Control max-age
+ROBOTS_ERROR_TTL_MINUTES = 10  # retry delay after a failed robots.txt fetch
 USER_AGENT = 'ApexAnalysis/1.0 (Educational Use Only)'
 
 # Sentiment analysis
 SENTIMENT_THRESHOLD = 0.1
 MIN_WORDS_FOR_ANALYSIS = 10  # Minimum words for meaningful sentiment analysis
+# Score articles on their scraped body instead of the headline, within a per-ticker budget
+ENRICH_FULL_TEXT = True
+ENRICH_TIME_BUDGET_SEC = 10
+ENRICH_BYTE_BUDGET = 8 * 1024 * 1024
+# Near-duplicate clustering (MinHash LSH over title + body); one story is scored per cluster
+DEDUP_ENABLED = True
+DEDUP_THRESHOLD = 0.7  # estimated Jaccard similarity of character shingles
+DEDUP_NUM_PERM = 64
+DEDUP_BANDS = 16
+DEDUP_SHINGLE_CHARS = 5
+DEDUP_MAX_CHARS = 2000  # body characters used for similarity
+# Enabled scorers, any of 'vader', 'keywords' and 'textblob'. TextBlob polarity is
+# reported as textblob_score but does not affect the compound score.
+SENTIMENT_BACKENDS = ('vader', 'keywords')
+SENTIMENT_LEXICON_PATH = None  # optional JSON or CSV file of extra 'phrase,weight' entries
+
+# Batch analysis (per-stage worker limits)
+BATCH_PRICE_WORKERS = 8
+BATCH_NEWS_WORKERS = 8
+BATCH_ENRICH_WORKERS = 4
+BATCH_SCORE_WORKERS = 2
+BATCH_WRITE_WORKERS = 2
+BULK_DOWNLOAD_CHUNK_SIZE = 100  # tickers per batched yfinance download
 
 # Data settings
 CACHE_EXPIRY_DAYS = 1
+CACHE_MAX_SIZE_MB = 256  # LRU eviction kicks in above this on-disk footprint
+PRICE_STORE_DIR = CACHE_DIR / 'prices'  # per-ticker Parquet price history
+PRICE_STORE_MAX_AGE_MINUTES = 30  # reuse stored bars without any network call within this window
+RUN_CACHE_ENABLED = True  # reuse the previous run of a ticker whose prices, news and analyzer are unchanged
+RUN_CACHE_HOURS = 24 * 7  # how long a run's fingerprints and article scores are kept
+SAVE_DATASET = True  # append every run to the partitioned Parquet result dataset (src/storage.py)
+DATASET_DIR = REPORTS_DIR / '_dataset'  # <table>/ticker=<T>/year=<YYYY>/<run_id>.parquet
+DATASET_MAX_PARTITION_FILES = 8  # merge the current year's per-run files beyond this many
+REPORT_CATALOG_PATH = REPORTS_DIR / '_catalog.sqlite3'  # SQLite index of every report file written
+
+# Feature engine (src/features.py); windows are in trading days
+FEATURE_MA_WINDOWS = (20, 50, 200)
+FEATURE_VOLATILITY_WINDOW = 20
+FEATURE_SENTIMENT_EMA_SPAN = 5
+FEATURE_CORRELATION_WINDOW = 30
+FEATURE_CORRELATION_LAG = 1  # correlate returns with sentiment from this many days earlier
+SENTIMENT_DAY_CUTOFF_HOUR_UTC = 21  # articles published after the US close count towards the next session
 
 # Plot settings
 PLOT_STYLE = 'seaborn'
 PLOT_FIGSIZE = (14, 8)
 PLOT_DPI = 300
+PLOT_PROFILE = 'publication'  # render profile for saved reports: 'preview' or 'publication'
+RENDER_WORKERS = 4  # chart rendering processes; 0 renders inline
+PLOT_MAX_POINTS = 500  # longer series are resampled to weekly/monthly/quarterly bars; 0 plots every row
 
 SAVE_PLOTS = True
\ No newline at end of file
@@ -0,0 +1,150 @@
+"""
+Article de-duplication and near-duplicate clustering.
+
+The same wire story reaches us many times through different outlets. Articles
+are clustered when their canonical links are equal or when their normalized
+title + body text is a near duplicate, found with MinHash signatures and
+locality-sensitive hashing (LSH): every article is hashed into a fixed number
+of band buckets and only compared with the first member of each bucket it
+lands in, so clustering stays near-linear in the number of articles.
+
+One representative per cluster is kept and carries 'cluster_size' so
+aggregate metrics can weight it by how many outlets ran the story.
+"""
+import re
+import zlib
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.utils import logger, canonicalize_url, resolve_news_link
+from src.config import (
+    DEDUP_THRESHOLD,
+    DEDUP_NUM_PERM,
+    DEDUP_BANDS,
+    DEDUP_SHINGLE_CHARS,
+    DEDUP_MAX_CHARS
+)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_NON_WORD_RE = re.compile(r'\W+')
+
+
+def normalize_title(title: str, source: str = '') -> str:
+    """Lowercased headline without punctuation or Google News' ' - Publisher' suffix."""
+    title = title or ''
+    suffix = f" - {source}"
+    if source and title.endswith(suffix):
+        title = title[:-len(suffix)]
+    return _NON_WORD_RE.sub(' ', title).strip().lower()
+
+
+def _article_text(article: Dict[str, Any]) -> str:
+    title = normalize_title(article.get('title', ''), article.get('source', ''))
+    body = article.get('content') or ''
+    if body:
+        body = _NON_WORD_RE.sub(' ', body[:DEDUP_MAX_CHARS]).strip().lower()
+    return f"{title} {body}".strip()
+
+
+class MinHasher:
+    """MinHash signatures over character shingles, using one vectorized hash family."""
+
+    def __init__(self, num_perm: int = DEDUP_NUM_PERM, shingle_chars: int = DEDUP_SHINGLE_CHARS, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.shingle_chars = shingle_chars
+        # a*h + b stays below 2**64 because a, b and the crc32 shingle hashes are below 2**32
+        self._a = rng.randint(1, 2**32 - 1, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 2**32 - 1, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of text, or None if it is too short to shingle."""
+        k = self.shingle_chars
+        if len(text) < k:
+            return None
+        shingles = {text[i:i + k] for i in range(len(text) - k + 1)}
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME).min(axis=1)
+
+
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def cluster_articles(articles: List[Dict[str, Any]], threshold: float = DEDUP_THRESHOLD,
+                     bands: int = DEDUP_BANDS, hasher: Optional[MinHasher] = None) -> List[List[int]]:
+    """
+    Group article indices into duplicate clusters.
+
+    Two articles are duplicates if their canonical links match, or if the
+    estimated Jaccard similarity of their text shingles is at least threshold.
+
+    Returns:
+        list: Clusters as lists of indices, in order of first appearance
+    """
+    hasher = hasher or MinHasher()
+    rows = hasher.num_perm // bands
+    parent = list(range(len(articles)))
+
+    def union(i: int, j: int) -> None:
+        ri, rj = _find(parent, i), _find(parent, j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+
+    by_link: Dict[str, int] = {}
+    buckets: Dict[tuple, int] = {}
+    signatures: Dict[int, np.ndarray] = {}
+    for i, article in enumerate(articles):
+        link = article.get('link')
+        if link:
+            key = canonicalize_url(resolve_news_link(link))
+            if key in by_link:
+                union(by_link[key], i)
+            else:
+                by_link[key] = i
+
+        sig = hasher.signature(_article_text(article))
+        if sig is None:
+            continue
+        signatures[i] = sig
+        for band in range(bands):
+            key = (band, sig[band * rows:(band + 1) * rows].tobytes())
+            first = buckets.setdefault(key, i)
+            if first != i and _find(parent, first) != _find(parent, i):
+                if np.mean(signatures[first] == sig) >= threshold:
+                    union(first, i)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(articles)):
+        clusters.setdefault(_find(parent, i), []).append(i)
+    return list(clusters.values())
+
+
+def dedup_articles(articles: List[Dict[str, Any]], threshold: float = DEDUP_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Keep one representative article per duplicate cluster.
+
+    The representative is the member with the longest body (the first one on a
+    tie). It gets 'cluster_size' (number of copies, itself included) and
+    'duplicate_sources' (outlets of the other copies).
+    """
+    articles = [a for a in articles or [] if isinstance(a, dict)]
+    if not articles:
+        return []
+
+    kept = []
+    for members in cluster_articles(articles, threshold):
+        rep = max(members, key=lambda i: (len(articles[i].get('content') or ''), -i))
+        article = articles[rep]
+        article['cluster_size'] = len(members)
+        article['duplicate_sources'] = [articles[i].get('source', 'Unknown') for i in members if i != rep]
+        kept.append(article)
+
+    if len(kept) < len(articles):
+        logger.info(f"De-duplicated {len(articles)} articles into {len(kept)} stories")
+    return kept
@@ -0,0 +1,116 @@
+"""
+Bounded-memory article extraction.
+
+Responses are read in chunks up to a byte cap, paywall markers are detected
+on the raw bytes as they arrive (so a paywalled page stops downloading at
+the first marker), and only the article region is parsed: SoupStrainers
+keep the tree limited to <article>, then div.article-body, then <body>,
+using lxml when it is installed.
+"""
+import time
+from typing import Callable, Iterable, Optional, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from src.utils import clean_text
+from src.config import SCRAPE_MAX_BYTES
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+PAYWALL_MARKERS = (b"subscribe", b"paywall", b"metered", b"membership", b"register to read")
+_STRIP_TAGS = ["script", "style", "noscript"]
+
+
+# Tried in order, like soup.find('article') or ... or soup.find('body') on a full tree
+ARTICLE_REGIONS = (
+    ('article', {}),
+    ('div', {'class': 'article-body'}),
+    ('body', {})
+)
+
+
+class StreamResult:
+    """Body bytes read from a response and why reading stopped."""
+
+    def __init__(self, content: bytes, truncated: bool, paywalled: bool):
+        self.content = content
+        self.truncated = truncated
+        self.paywalled = paywalled
+
+
+def read_stream(chunks: Iterable[bytes], max_bytes: int = SCRAPE_MAX_BYTES,
+                markers: Tuple[bytes, ...] = PAYWALL_MARKERS, stop_on_marker: bool = True,
+                deadline: Optional[float] = None,
+                charge: Optional[Callable[[int], int]] = None) -> StreamResult:
+    """
+    Read chunks until max_bytes (or the time.monotonic() deadline), scanning for markers on the way.
+
+    charge, if given, is called with the size of every chunk kept and returns
+    how many of its bytes a shared budget still allows; a chunk it cuts short
+    ends the read as truncated.
+
+    Marker matching is case-insensitive and spans chunk boundaries. With
+    stop_on_marker, reading stops at the first marker found. The result is
+    only marked truncated if data remains past max_bytes, so a body that
+    fills the cap exactly reads the next chunk to find out.
+    """
+    buf = bytearray()
+    overlap = max((len(m) for m in markers), default=1) - 1
+    tail = b''
+    paywalled = truncated = False
+    for chunk in chunks:
+        if not chunk:
+            continue
+        room = max_bytes - len(buf)
+        if room <= 0:
+            truncated = True
+            break
+        if len(chunk) > room:
+            chunk = chunk[:room]
+            truncated = True
+        if charge is not None:
+            granted = charge(len(chunk))
+            if granted < len(chunk):
+                chunk = chunk[:granted]
+                truncated = True
+        buf += chunk
+        if markers and not paywalled:
+            window = tail + chunk.lower()
+            paywalled = any(m in window for m in markers)
+            tail = window[-overlap:] if overlap else b''
+            if paywalled and stop_on_marker:
+                break
+        if deadline is not None and time.monotonic() >= deadline:
+            truncated = True
+        if truncated:
+            break
+    return StreamResult(bytes(buf), truncated, paywalled)
+
+
+def extract_article_text(content: bytes, encoding: Optional[str] = None) -> str:
+    """Return the cleaned text of the article region of an HTML page ('' if none)."""
+    if not content:
+        return ""
+    for name, attrs in ARTICLE_REGIONS:
+        soup = BeautifulSoup(content, HTML_PARSER, parse_only=SoupStrainer(name, attrs), from_encoding=encoding)
+        body = soup.find(name, attrs)
+        if body is not None:
+            break
+    else:
+        return ""
+    for tag in body(_STRIP_TAGS):
+        tag.decompose()
+    return clean_text(body.get_text(separator=" "))
+
+
+def response_encoding(content_type: str) -> Optional[str]:
+    """Charset declared in a Content-Type header, if any (else let the parser sniff it)."""
+    for param in content_type.split(';')[1:]:
+        key, _, value = param.partition('=')
+        if key.strip().lower() == 'charset' and value.strip():
+            return value.strip().strip('"\'')
+    return None
@@ -0,0 +1,179 @@
+"""
+Aligned price/sentiment features.
+
+Per-article sentiment is mapped onto trading days with merge_asof (articles
+published after the session cutoff or on non-trading days count towards the
+next bar), aggregated per day and joined to the daily price history. Rolling
+indicators are then computed as vectorized pandas/NumPy operations into one
+frame indexed by trading day:
+
+    Close, Volume, return, log_return, MA20/MA50/MA200, volatility,
+    sentiment, sentiment_weighted, article_count, sentiment_ema,
+    sentiment_return_corr
+
+update_features() extends an existing frame when new bars or articles arrive
+by recomputing only the affected tail plus the rows the rolling windows look
+back over.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.price_store import naive_index
+from src.config import (
+    FEATURE_MA_WINDOWS,
+    FEATURE_VOLATILITY_WINDOW,
+    FEATURE_SENTIMENT_EMA_SPAN,
+    FEATURE_CORRELATION_WINDOW,
+    FEATURE_CORRELATION_LAG,
+    SENTIMENT_DAY_CUTOFF_HOUR_UTC
+)
+
+TRADING_DAYS_PER_YEAR = 252
+
+# Rows before a changed bar whose values the rolling windows depend on
+LOOKBACK_ROWS = max(max(FEATURE_MA_WINDOWS), FEATURE_VOLATILITY_WINDOW + 1,
+                    FEATURE_CORRELATION_WINDOW + FEATURE_CORRELATION_LAG + 1)
+
+
+def daily_sentiment(sentiment_df: Optional[pd.DataFrame], trading_days: pd.DatetimeIndex) -> pd.DataFrame:
+    """
+    Aggregate per-article sentiment onto trading days.
+
+    Args:
+        sentiment_df: Frame indexed by publish time with a 'sentiment' column
+            and optionally 'weight' (e.g. de-duplicated cluster size)
+        trading_days: Sorted daily bar index to align to
+
+    Returns:
+        DataFrame indexed like trading_days with sentiment (mean),
+        sentiment_weighted (weight-averaged) and article_count; days without
+        articles have NaN sentiment and a count of 0
+    """
+    out = pd.DataFrame(index=trading_days, columns=['sentiment', 'sentiment_weighted', 'article_count'], dtype=float)
+    out['article_count'] = 0
+    if (sentiment_df is None or sentiment_df.empty or 'sentiment' not in sentiment_df
+            or not isinstance(sentiment_df.index, pd.DatetimeIndex) or trading_days.empty):
+        return out
+
+    articles = naive_index(sentiment_df)
+    articles = articles[articles.index.notna()]
+    # Articles after the cutoff belong to the next session
+    session = (articles.index + pd.Timedelta(hours=24 - SENTIMENT_DAY_CUTOFF_HOUR_UTC)).normalize()
+    left = pd.DataFrame({
+        'session': session,
+        'sentiment': articles['sentiment'].to_numpy(dtype=float),
+        'weight': articles['weight'].to_numpy(dtype=float) if 'weight' in articles else 1.0
+    }).sort_values('session')
+    bars = pd.DataFrame({'bar': trading_days, 'session': trading_days.normalize()})
+    # Align datetime resolutions (ns vs us) so merge_asof accepts the keys
+    left['session'] = left['session'].astype(bars['session'].dtype)
+    aligned = pd.merge_asof(left, bars, on='session', direction='forward').dropna(subset=['bar'])
+    if aligned.empty:
+        return out
+
+    aligned['weighted'] = aligned['sentiment'] * aligned['weight']
+    grouped = aligned.groupby('bar').agg(sentiment=('sentiment', 'mean'), weighted=('weighted', 'sum'),
+                                         weight=('weight', 'sum'), article_count=('sentiment', 'size'))
+    out.loc[grouped.index, 'sentiment'] = grouped['sentiment']
+    out.loc[grouped.index, 'sentiment_weighted'] = grouped['weighted'] / grouped['weight']
+    out.loc[grouped.index, 'article_count'] = grouped['article_count']
+    out['article_count'] = out['article_count'].astype(int)
+    return out
+
+
+def _compute(history: pd.DataFrame, daily: pd.DataFrame) -> pd.DataFrame:
+    close = history['Close'].astype(float)
+    features = pd.DataFrame(index=history.index)
+    features['Close'] = close
+    if 'Volume' in history:
+        features['Volume'] = history['Volume']
+    features['return'] = close.pct_change()
+    features['log_return'] = np.log(close.where(close > 0)).diff()
+    for window in FEATURE_MA_WINDOWS:
+        features[f'MA{window}'] = close.rolling(window, min_periods=window).mean()
+    features['volatility'] = (features['log_return'].rolling(FEATURE_VOLATILITY_WINDOW).std()
+                              * np.sqrt(TRADING_DAYS_PER_YEAR))
+    features = features.join(daily)
+    # adjust=False makes the EMA a plain recursion, which update_features continues exactly
+    features['sentiment_ema'] = features['sentiment'].ewm(span=FEATURE_SENTIMENT_EMA_SPAN, adjust=False,
+                                                          ignore_na=True).mean()
+    features['sentiment_return_corr'] = (features['sentiment'].shift(FEATURE_CORRELATION_LAG)
+                                         .rolling(FEATURE_CORRELATION_WINDOW, min_periods=3)
+                                         .corr(features['return']))
+    return features
+
+
+def compute_features(history: Optional[pd.DataFrame],
+                     sentiment_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Build the aligned feature frame from daily OHLCV history and per-article sentiment."""
+    if history is None or history.empty or 'Close' not in history:
+        return pd.DataFrame()
+    history = naive_index(history).sort_index()
+    return _compute(history, daily_sentiment(sentiment_df, history.index))
+
+
+def _continue_ema(previous: float, values: pd.Series) -> pd.Series:
+    """Continue an adjust=False, ignore_na=True EMA from its last value over new inputs."""
+    alpha = 2.0 / (FEATURE_SENTIMENT_EMA_SPAN + 1)
+    out = np.empty(len(values))
+    ema = previous
+    for i, x in enumerate(values.to_numpy(dtype=float)):
+        if not np.isnan(x):
+            ema = x if np.isnan(ema) else alpha * x + (1 - alpha) * ema
+        out[i] = ema
+    return pd.Series(out, index=values.index)
+
+
+def update_features(features: Optional[pd.DataFrame], history: pd.DataFrame,
+                    sentiment_df: Optional[pd.DataFrame] = None,
+                    since: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    Extend a feature frame after new bars or articles arrive.
+
+    Only rows from `since` on are recomputed (default: the last existing row,
+    which may have been an intraday bar). Rolling windows read the
+    LOOKBACK_ROWS bars before it, and the sentiment EMA continues from its
+    previous value, so the result equals compute_features() on the full
+    inputs as long as nothing before `since` changed. Stored rows keep the
+    sentiment of articles that have since dropped out of the feed. If the
+    stored closes no longer match history (e.g. after a split re-adjusted
+    the series), the frame is recomputed in full.
+
+    Args:
+        features: Previous output of compute_features/update_features
+        history: Full current daily price history
+        sentiment_df: Per-article sentiment covering at least the days from
+            `since` on
+        since: First trading day whose bars or articles changed
+    """
+    if features is None or features.empty or history is None or history.empty or 'Close' not in history:
+        return compute_features(history, sentiment_df)
+    history = naive_index(history).sort_index()
+    # A period window moves forward with time; rows that left it are dropped
+    features = features[features.index >= history.index[0]]
+    if features.empty:
+        return compute_features(history, sentiment_df)
+    since = features.index[-1] if since is None else min(pd.Timestamp(since), features.index[-1])
+    kept = features.index < since
+    stored_close = features['Close'].to_numpy(dtype=float)[kept]
+    current_close = history['Close'].reindex(features.index[kept]).to_numpy(dtype=float)
+    if not np.allclose(stored_close, current_close, rtol=1e-9, atol=0):
+        return compute_features(history, sentiment_df)
+    start = history.index.searchsorted(since)
+    lo = max(0, start - LOOKBACK_ROWS)
+
+    window = history.iloc[lo:]
+    articles = sentiment_df
+    if articles is not None and not articles.empty and isinstance(articles.index, pd.DatetimeIndex) and lo > 0:
+        # Articles up to the bar before the window belong to earlier, unchanged rows
+        boundary = history.index[lo - 1].normalize() + pd.Timedelta(hours=SENTIMENT_DAY_CUTOFF_HOUR_UTC)
+        articles = naive_index(articles)
+        articles = articles[articles.index >= boundary]
+    tail = _compute(window, daily_sentiment(articles, window.index)).iloc[start - lo:]
+
+    head = features[features.index < tail.index[0]] if len(tail) else features
+    previous_ema = head['sentiment_ema'].iloc[-1] if len(head) else np.nan
+    tail['sentiment_ema'] = _continue_ema(previous_ema, tail['sentiment'])
+    return pd.concat([head, tail])
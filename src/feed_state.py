@@ -0,0 +1,75 @@
+import threading
+from typing import Any, Dict, List, Mapping, Optional
+
+from src.utils import load_cache, cache_data, stable_digest
+from src.config import FEED_STATE_TTL_HOURS
+
+
+class FeedStateStore:
+    """
+    Conditional GET state for polled RSS feeds.
+
+    For each feed URL the store keeps the ETag / Last-Modified validators of
+    the last full download together with its parsed articles. Later requests
+    send If-None-Match / If-Modified-Since, and a 304 answer is served from
+    the stored articles without downloading or parsing the feed again.
+    Counters track full (200) vs not-modified (304) responses and the bytes
+    the 304s saved.
+    """
+
+    def __init__(self, ttl_hours: float):
+        self.ttl_hours = ttl_hours
+        self._lock = threading.Lock()
+        self._counters = {'full': 0, 'not_modified': 0, 'bytes_downloaded': 0, 'bytes_saved': 0}
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return f"feed_state_{stable_digest(url)}"
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Stored state for url ('etag', 'last_modified', 'articles', 'size'), if any."""
+        return load_cache(self._key(url))
+
+    @staticmethod
+    def request_headers(state: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Conditional request headers for a feed's stored state."""
+        headers = {}
+        if state:
+            if state.get('etag'):
+                headers['If-None-Match'] = state['etag']
+            if state.get('last_modified'):
+                headers['If-Modified-Since'] = state['last_modified']
+        return headers
+
+    def save(self, url: str, response_headers: Mapping[str, str],
+             articles: List[Dict[str, Any]], size: int) -> None:
+        """Record a full (200) download and keep its validators for the next poll."""
+        with self._lock:
+            self._counters['full'] += 1
+            self._counters['bytes_downloaded'] += size
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+        if etag or last_modified:
+            cache_data(self._key(url), {
+                'etag': etag,
+                'last_modified': last_modified,
+                'articles': articles,
+                'size': size
+            }, expire_hours=self.ttl_hours)
+
+    def not_modified(self, url: str, state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Record a 304 for url and return its stored articles."""
+        with self._lock:
+            self._counters['not_modified'] += 1
+            self._counters['bytes_saved'] += state.get('size', 0)
+        # Refresh the TTL so feeds that rarely change keep their validators
+        cache_data(self._key(url), state, expire_hours=self.ttl_hours)
+        return state['articles']
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for full vs not-modified responses and bytes downloaded/saved."""
+        with self._lock:
+            return dict(self._counters)
+
+
+feed_state = FeedStateStore(FEED_STATE_TTL_HOURS)
@@ -1,27 +1,175 @@
-from typing import Dict, Any
+import threading
+from collections.abc import Mapping
+from contextlib import ExitStack
+from typing import Dict, Any, List, Iterable, Optional
 import yfinance as yf
 import pandas as pd
 from src.utils import handle_errors, logger, load_cache, cache_data
+from src.config import BULK_DOWNLOAD_CHUNK_SIZE
+from src.price_store import price_store, period_start, period_bars
 
 @handle_errors
-def fetch_stock_history(ticker: str, period: str = '1y') -> pd.DataFrame:
-    """Fetch stock history without caching."""
-    logger.info(f"Fetching history for {ticker}")
-    try:
-        data = yf.Ticker(ticker).history(period=period)
-        if data.empty:
-            logger.warning(f"No data returned for {ticker}")
-        return data
-    except Exception as e:
-        logger.error(f"Error fetching history for {ticker}: {e}")
-        return pd.DataFrame()
+def fetch_stock_history(ticker: str, period: str = '1y',
+                        ticker_obj: Optional[yf.Ticker] = None) -> pd.DataFrame:
+    """
+    Fetch stock history, reading from the local price store where possible.
+
+    Only bars after the last stored one are downloaded when the store already
+    covers the requested period, and nothing is downloaded if the store was
+    refreshed within PRICE_STORE_MAX_AGE_MINUTES.
+    """
+    ticker = ticker.strip().upper()
+    start, bars = period_start(period), period_bars(period)
+    with price_store.lock(ticker):
+        stored, meta = price_store.load(ticker)
+        covered = stored is not None and price_store.covers(meta, start, stored, bars)
+        if covered and price_store.is_fresh(meta):
+            logger.info(f"Using stored history for {ticker}")
+            return price_store.window(stored, start, bars)
+
+        try:
+            handle = ticker_obj or yf.Ticker(ticker)
+            if covered and not stored.empty:
+                last_bar = stored.index[-1]
+                logger.info(f"Fetching history for {ticker} since {last_bar.date()}")
+                data = handle.history(start=last_bar.strftime('%Y-%m-%d'))
+                if price_store.needs_full_refresh(data, last_bar):
+                    logger.info(f"Split/dividend for {ticker}; refetching full history")
+                    stored, covered = None, False
+            if not covered:
+                logger.info(f"Fetching history for {ticker}")
+                data = handle.history(period=period)
+                if data.empty:
+                    logger.warning(f"No data returned for {ticker}")
+                    return data
+            if covered:
+                covered_from = price_store.coverage_start(meta)
+            else:
+                covered_from = price_store.download_start(data, start, bars)
+            merged = price_store.merge(ticker, stored, data, covered_from)
+            return price_store.window(merged, start, bars)
+        except Exception as e:
+            logger.error(f"Error fetching history for {ticker}: {e}")
+            return pd.DataFrame()
+
+def _split_download(data: pd.DataFrame, tickers: List[str]) -> Dict[str, pd.DataFrame]:
+    """Split a yf.download frame grouped by ticker into one frame per ticker."""
+    frames = {}
+    if data is None or data.empty:
+        return {t: pd.DataFrame() for t in tickers}
+    if not isinstance(data.columns, pd.MultiIndex):
+        # Older yfinance returns flat columns when a single ticker is requested
+        return {tickers[0]: data.dropna(how='all')} if len(tickers) == 1 else {}
+    available = set(data.columns.get_level_values(0))
+    for t in tickers:
+        frames[t] = data[t].dropna(how='all') if t in available else pd.DataFrame()
+    return frames
 
 @handle_errors
-def fetch_stock_info(ticker: str) -> Dict[str, Any]:
+def fetch_stock_history_bulk(tickers: Iterable[str], period: str = '1y',
+                             chunk_size: int = BULK_DOWNLOAD_CHUNK_SIZE) -> Dict[str, pd.DataFrame]:
+    """
+    Fetch history for many tickers with one batched download per chunk.
+
+    Tickers already in the price store download only the bars after their
+    last stored one (or nothing while the store is fresh), grouped so that
+    tickers with the same last bar share a request.
+
+    Args:
+        tickers: Stock ticker symbols
+        period: Time period for historical data (e.g., '1y', '6mo')
+        chunk_size: Maximum number of tickers per download request
+
+    Returns:
+        dict: Ticker -> OHLCV DataFrame; all frames share one DatetimeIndex
+        (rows where a ticker did not trade are NaN) and tickers without data
+        map to an empty DataFrame
+    """
+    symbols = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+    # Hold every ticker's store lock (in sorted order, so concurrent bulk calls
+    # cannot deadlock) from load to merge, like fetch_stock_history does
+    with ExitStack() as locks:
+        for t in sorted(symbols):
+            locks.enter_context(price_store.lock(t))
+        frames = _fetch_bulk_locked(symbols, period, chunk_size)
+
+    non_empty = [f.index for f in frames.values() if not f.empty]
+    if non_empty:
+        shared_index = non_empty[0]
+        for index in non_empty[1:]:
+            shared_index = shared_index.union(index)
+        frames = {t: (f.reindex(shared_index) if not f.empty else f) for t, f in frames.items()}
+    return frames
+
+def _fetch_bulk_locked(symbols: List[str], period: str, chunk_size: int) -> Dict[str, pd.DataFrame]:
+    """fetch_stock_history_bulk body; the caller holds the price store locks of symbols."""
+    frames: Dict[str, pd.DataFrame] = {}
+    chunk_size = max(1, int(chunk_size))
+    start, bars = period_start(period), period_bars(period)
+
+    # Serve fresh tickers from the price store and group stale ones by the
+    # date of their last stored bar so each group shares one tail download.
+    stored_by_ticker = {}
+    full, tails = [], {}
+    for t in symbols:
+        stored, meta = price_store.load(t)
+        if stored is not None and not stored.empty and price_store.covers(meta, start, stored, bars):
+            if price_store.is_fresh(meta):
+                frames[t] = price_store.window(stored, start, bars)
+                continue
+            stored_by_ticker[t] = (stored, meta)
+            tails.setdefault(stored.index[-1], []).append(t)
+        else:
+            full.append(t)
+
+    def chunks(items):
+        return [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+    requests = [(chunk, {'period': period}) for chunk in chunks(full)]
+    for last_bar, group in tails.items():
+        requests += [(chunk, {'start': last_bar.strftime('%Y-%m-%d')}) for chunk in chunks(group)]
+
+    while requests:
+        chunk, window = requests.pop(0)
+        logger.info(f"Fetching history for {len(chunk)} tickers ({chunk[0]}..{chunk[-1]})")
+        data = yf.download(
+            chunk,
+            group_by='ticker',
+            auto_adjust=True,
+            actions=True,
+            threads=True,
+            progress=False,
+            **window
+        )
+        refetch = []
+        for t, history in _split_download(data, chunk).items():
+            if t in stored_by_ticker and 'start' in window:
+                stored, meta = stored_by_ticker[t]
+                if price_store.needs_full_refresh(history, stored.index[-1]):
+                    refetch.append(t)
+                    continue
+                merged = price_store.merge(t, stored, history, price_store.coverage_start(meta))
+            elif not history.empty:
+                merged = price_store.merge(t, None, history, price_store.download_start(history, start, bars))
+            else:
+                merged = history
+            frames[t] = price_store.window(merged, start, bars)
+        if refetch:
+            logger.info(f"Split/dividend for {len(refetch)} tickers; refetching full history")
+            requests += [(c, {'period': period}) for c in chunks(refetch)]
+
+    for t in symbols:
+        if frames.get(t) is None or frames[t].empty:
+            logger.warning(f"No data returned for {t}")
+            frames[t] = pd.DataFrame()
+    return frames
+
+@handle_errors
+def fetch_stock_info(ticker: str, ticker_obj: Optional[yf.Ticker] = None) -> Dict[str, Any]:
     """Fetch stock info without caching."""
     logger.info(f"Fetching info for {ticker}")
     try:
-        info = yf.Ticker(ticker).info
+        info = (ticker_obj or yf.Ticker(ticker)).info
         if not info:
             logger.warning(f"No info returned for {ticker}")
         return info if info else {}
@@ -30,11 +178,11 @@ def fetch_stock_info(ticker: str) -> Dict[str, Any]:
         return {}
 
 @handle_errors
-def fetch_financials(ticker: str) -> Dict[str, pd.DataFrame]:
+def fetch_financials(ticker: str, ticker_obj: Optional[yf.Ticker] = None) -> Dict[str, pd.DataFrame]:
     """Fetch financial data without caching."""
     logger.info(f"Fetching financials for {ticker}")
     try:
-        ticker_obj = yf.Ticker(ticker)
+        ticker_obj = ticker_obj or yf.Ticker(ticker)
         financials = {
             'income': ticker_obj.financials,
             'balance': ticker_obj.balance_sheet,
@@ -45,9 +193,84 @@ def fetch_financials(ticker: str) -> Dict[str, pd.DataFrame]:
         logger.error(f"Error fetching financials for {ticker}: {e}")
         return {}
 
-def fetch_stock_data(ticker: str, period: str = '1y') -> dict:
-    return {
-        'history': fetch_stock_history(ticker, period),
-        'info': fetch_stock_info(ticker),
-        'financials': fetch_financials(ticker)
-    }
+STOCK_DATA_FIELDS = ('history', 'info', 'financials')
+
+class StockData(Mapping):
+    """
+    Stock data for one ticker whose parts are fetched on first access.
+
+    Behaves like the dict previously returned by fetch_stock_data (keys
+    'history', 'info' and 'financials'), but nothing is downloaded until a
+    key is read, each part is fetched at most once, and all parts share a
+    single yf.Ticker handle. Membership tests never trigger a fetch.
+    """
+
+    def __init__(self, ticker: str, period: str = '1y', fields: Optional[Iterable[str]] = None):
+        self.ticker = ticker.strip().upper()
+        self.period = period
+        self.fields = tuple(fields) if fields is not None else STOCK_DATA_FIELDS
+        unknown = set(self.fields) - set(STOCK_DATA_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown stock data fields: {sorted(unknown)}")
+        self._handle: Optional[yf.Ticker] = None
+        self._values: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def handle(self) -> yf.Ticker:
+        """The shared yf.Ticker used for every part of this request."""
+        if self._handle is None:
+            self._handle = yf.Ticker(self.ticker)
+        return self._handle
+
+    def _fetch(self, field: str) -> Any:
+        if field == 'history':
+            return fetch_stock_history(self.ticker, self.period, ticker_obj=self.handle)
+        if field == 'info':
+            return fetch_stock_info(self.ticker, ticker_obj=self.handle)
+        return fetch_financials(self.ticker, ticker_obj=self.handle)
+
+    def __getitem__(self, field: str) -> Any:
+        if field not in self.fields:
+            raise KeyError(field)
+        with self._lock:
+            if field not in self._values:
+                self._values[field] = self._fetch(field)
+            return self._values[field]
+
+    def __contains__(self, field: object) -> bool:
+        return field in self.fields
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __len__(self) -> int:
+        return len(self.fields)
+
+    @property
+    def fetched(self) -> tuple:
+        """Names of the parts that have already been downloaded."""
+        return tuple(f for f in self.fields if f in self._values)
+
+    def __repr__(self) -> str:
+        return f"StockData({self.ticker!r}, period={self.period!r}, fetched={self.fetched})"
+
+def fetch_stock_data(ticker: str, period: str = '1y', fields: Optional[Iterable[str]] = None) -> StockData:
+    """
+    Return stock data for ticker, fetching each part only when it is used.
+
+    Args:
+        ticker: Stock ticker symbol
+        period: Time period for historical data (e.g., '1y', '6mo')
+        fields: Parts to make available, any of 'history', 'info' and
+            'financials'. When given, these parts are fetched immediately;
+            when omitted, all parts are available and fetched lazily.
+
+    Returns:
+        StockData: Mapping of field name -> fetched data
+    """
+    data = StockData(ticker, period, fields)
+    if fields is not None:
+        for field in data.fields:
+            data[field]
+    return data
@@ -0,0 +1,326 @@
+"""
+Asynchronous news ingestion.
+
+Fetches every feed in config.NEWS_SOURCES plus one Google News query per
+ticker concurrently, parses the feeds in a worker pool so the event loop
+keeps downloading, and streams normalized article dicts to the caller as
+each feed completes. Feeds are revalidated with conditional GETs (see
+src.feed_state), so unchanged feeds are neither downloaded nor parsed
+again, and the general NEWS_SOURCES feeds every ticker run shares are kept
+in memory for INGEST_SHARED_FEED_TTL_SEC, so consecutive single-ticker
+runs in one process request only their own query feed.
+
+stream_news yields every article once across all feeds (same canonical URL
+or same headline). stream_ticker_news groups them per ticker instead: a
+ticker's query feed plus the general-source headlines that cite its symbol
+('(AAPL)', '$AAPL', 'NASDAQ: AAPL'). This is how aggregate_analysis and
+the batch engine fetch news when NEWS_INGEST_ENABLED is set.
+
+Usage:
+    async for article in stream_news(['AAPL', 'MSFT']):
+        ...
+
+or, from synchronous code, ingest_news(['AAPL', 'MSFT']) and
+ingest_ticker_news(['AAPL', 'MSFT']).
+"""
+import asyncio
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import aiohttp
+import feedparser
+
+from src.news_processor import normalize_entry, ticker_feed_url
+from src.feed_state import feed_state
+from src.dedup import normalize_title
+from src.utils import logger, canonicalize_url, resolve_news_link
+from src.config import (
+    NEWS_SOURCES,
+    REQUEST_TIMEOUT_SEC,
+    USER_AGENT,
+    INGEST_MAX_CONNECTIONS,
+    INGEST_PER_HOST_CONNECTIONS,
+    INGEST_PARSE_WORKERS,
+    INGEST_SHARED_FEED_TTL_SEC
+)
+
+# General-source feed URL -> (time.monotonic() when fetched, articles)
+_shared_feeds: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+_shared_feeds_lock = threading.Lock()
+
+
+def _recent_shared_feed(url: str) -> Optional[List[Dict[str, Any]]]:
+    """Copies of a shared feed's articles fetched in this process within the TTL, else None."""
+    with _shared_feeds_lock:
+        cached = _shared_feeds.get(url)
+    if cached is None or time.monotonic() - cached[0] >= INGEST_SHARED_FEED_TTL_SEC:
+        return None
+    return [dict(a) for a in cached[1]]
+
+
+def _keep_shared_feed(url: str, articles: List[Dict[str, Any]]) -> None:
+    with _shared_feeds_lock:
+        _shared_feeds[url] = (time.monotonic(), [dict(a) for a in articles])
+
+def _parse_feed(content: bytes, url: str) -> List[Dict[str, Any]]:
+    """Parse raw feed bytes into normalized article dicts (runs in the worker pool)."""
+    feed = feedparser.parse(content)
+    if feed.bozo and not feed.entries:
+        logger.warning(f"Error parsing RSS feed {url}: {feed.bozo_exception}")
+        return []
+    default_source = feed.feed.get('title', 'Unknown')
+    articles = []
+    for entry in feed.entries:
+        article = normalize_entry(entry, default_source)
+        if article is not None:
+            articles.append(article)
+    return articles
+
+
+async def _fetch_feed(session: aiohttp.ClientSession, url: str,
+                      headers: Dict[str, str]) -> Tuple[int, Optional[bytes], Mapping[str, str]]:
+    """Return (status, body, response headers); status 0 means the request failed."""
+    try:
+        async with session.get(url, headers=headers) as resp:
+            if resp.status not in (200, 304):
+                logger.warning(f"RSS feed {url} returned HTTP {resp.status}")
+                return resp.status, None, {}
+            body = await resp.read() if resp.status == 200 else None
+            # Kept case-insensitive: aiohttp may report 'ETag' as 'Etag'
+            return resp.status, body, resp.headers
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.warning(f"Error fetching RSS feed {url}: {str(e) or e.__class__.__name__}")
+        return 0, None, {}
+
+
+def feed_urls(tickers: Iterable[str] = (), sources: Sequence[str] = NEWS_SOURCES,
+              ticker_url: Callable[[str], str] = ticker_feed_url) -> Dict[str, Optional[str]]:
+    """Feeds to ingest: URL -> ticker it was queried for (None for general sources)."""
+    urls: Dict[str, Optional[str]] = {url: None for url in sources}
+    for ticker in dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()):
+        urls.setdefault(ticker_url(ticker), ticker)
+    return urls
+
+
+async def _feeds(urls: Iterable[str], timeout: float,
+                 shared: Iterable[str] = ()) -> AsyncIterator[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Fetch feeds concurrently and yield (url, articles) as each completes; failed feeds yield [].
+
+    Feeds in shared are served from the in-process copy while it is fresh.
+    """
+    shared = set(shared)
+    loop = asyncio.get_running_loop()
+    connector = aiohttp.TCPConnector(limit=INGEST_MAX_CONNECTIONS, limit_per_host=INGEST_PER_HOST_CONNECTIONS)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    pool = ThreadPoolExecutor(max_workers=INGEST_PARSE_WORKERS, thread_name_prefix='feed-parse')
+    try:
+        async with aiohttp.ClientSession(connector=connector, timeout=client_timeout,
+                                         headers={'User-Agent': USER_AGENT}) as session:
+
+            async def ingest(url: str):
+                if url in shared:
+                    recent = _recent_shared_feed(url)
+                    if recent is not None:
+                        return url, recent
+                state = await loop.run_in_executor(pool, feed_state.get, url)
+                status, content, headers = await _fetch_feed(session, url, feed_state.request_headers(state))
+                if status == 304 and state:
+                    articles = await loop.run_in_executor(pool, feed_state.not_modified, url, state)
+                elif content:
+                    articles = await loop.run_in_executor(pool, _parse_feed, content, url)
+                    await loop.run_in_executor(pool, feed_state.save, url, headers, articles, len(content))
+                else:
+                    return url, []
+                if url in shared:
+                    _keep_shared_feed(url, articles)
+                return url, articles
+
+            tasks = [asyncio.ensure_future(ingest(url)) for url in urls]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        # Wait for in-flight parse jobs off the event loop instead of blocking it
+        await loop.run_in_executor(None, pool.shutdown)
+
+
+async def stream_news(tickers: Iterable[str] = (), sources: Sequence[str] = NEWS_SOURCES,
+                      per_feed_limit: Optional[int] = None,
+                      timeout: float = REQUEST_TIMEOUT_SEC,
+                      ticker_url: Callable[[str], str] = ticker_feed_url) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Fetch all feeds concurrently and yield de-duplicated articles as they arrive.
+
+    Args:
+        tickers: Tickers to run a per-ticker news query for
+        sources: General feed URLs fetched in addition to the ticker queries
+        per_feed_limit: Maximum entries taken from each feed (None = all)
+        timeout: Total seconds allowed for each feed request
+        ticker_url: Builds the feed URL for a ticker query
+
+    Yields:
+        dict: Article with 'title', 'link', 'date' and 'source', plus 'feed'
+        (the feed URL it came from) and 'ticker' (None for general sources)
+    """
+    urls = feed_urls(tickers, sources, ticker_url)
+    seen_links, seen_titles = set(), set()
+    async for url, articles in _feeds(urls, timeout, shared=[u for u, t in urls.items() if t is None]):
+        for article in articles[:per_feed_limit]:
+            link_key = canonicalize_url(resolve_news_link(article['link']))
+            title_key = normalize_title(article['title'], article['source'])
+            if link_key in seen_links or (title_key and title_key in seen_titles):
+                continue
+            seen_links.add(link_key)
+            if title_key:
+                seen_titles.add(title_key)
+            article['feed'] = url
+            article['ticker'] = urls[url]
+            yield article
+
+
+def ingest_news(tickers: Iterable[str] = (), sources: Sequence[str] = NEWS_SOURCES,
+                per_feed_limit: Optional[int] = None,
+                timeout: float = REQUEST_TIMEOUT_SEC,
+                ticker_url: Callable[[str], str] = ticker_feed_url) -> List[Dict[str, Any]]:
+    """
+    Synchronous wrapper around stream_news that returns all articles.
+
+    Must not be called from inside a running event loop; use stream_news there.
+    """
+    async def collect() -> List[Dict[str, Any]]:
+        return [article async for article in stream_news(tickers, sources, per_feed_limit, timeout, ticker_url)]
+
+    articles = asyncio.run(collect())
+    logger.info(f"Ingested {len(articles)} unique articles")
+    return articles
+
+
+def mentions(title: str, ticker: str) -> bool:
+    """True if a headline cites ticker as '(AAPL)', '$AAPL' or 'NASDAQ: AAPL'."""
+    pattern = rf"(?:\$|\(|\b(?:NASDAQ|NYSE|AMEX|NYSEARCA|OTC)\s*:\s*){re.escape(ticker)}\b"
+    return re.search(pattern, title or '') is not None
+
+
+def _ticker_articles(ticker: str, cited: List[Dict[str, Any]], queried: List[Dict[str, Any]],
+                     num_articles: int) -> List[Dict[str, Any]]:
+    """A ticker's articles: general-source citations first, then its query feed, each story once."""
+    seen_links, seen_titles = set(), set()
+    articles = []
+    for article in cited + queried:
+        link_key = canonicalize_url(resolve_news_link(article['link']))
+        title_key = normalize_title(article['title'], article['source'])
+        if link_key in seen_links or (title_key and title_key in seen_titles):
+            continue
+        seen_links.add(link_key)
+        if title_key:
+            seen_titles.add(title_key)
+        articles.append(dict(article, ticker=ticker))
+        if len(articles) >= num_articles:
+            break
+    return articles
+
+
+async def stream_ticker_news(tickers: Iterable[str], num_articles: int = 20,
+                             sources: Sequence[str] = NEWS_SOURCES,
+                             timeout: float = REQUEST_TIMEOUT_SEC,
+                             ticker_url: Callable[[str], str] = ticker_feed_url
+                             ) -> AsyncIterator[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Fetch all feeds concurrently and yield (ticker, articles) per ticker.
+
+    A ticker is yielded as soon as its own query feed and every general
+    source have arrived, so tickers with fast feeds do not wait for slow ones.
+
+    Args:
+        tickers: Tickers to collect news for
+        num_articles: Maximum articles per ticker
+        sources: General feed URLs searched for headlines citing a ticker
+        timeout: Total seconds allowed for each feed request
+        ticker_url: Builds the feed URL for a ticker query
+
+    Yields:
+        tuple: (ticker, articles), articles tagged with 'feed' and 'ticker'
+    """
+    urls = feed_urls(tickers, sources, ticker_url)
+    symbols = [t for t in urls.values() if t is not None]
+    general_left = len(urls) - len(symbols)
+    cited: Dict[str, List[Dict[str, Any]]] = {t: [] for t in symbols}
+    queried: Dict[str, List[Dict[str, Any]]] = {}
+
+    async for url, articles in _feeds(urls, timeout, shared=[u for u, t in urls.items() if t is None]):
+        for article in articles:
+            article['feed'] = url
+        ticker = urls[url]
+        if ticker is not None:
+            queried[ticker] = articles
+        else:
+            general_left -= 1
+            for article in articles:
+                for t in symbols:
+                    if mentions(article['title'], t):
+                        cited[t].append(article)
+        if general_left == 0:
+            for t in list(queried):
+                yield t, _ticker_articles(t, cited[t], queried.pop(t), num_articles)
+
+
+def ingest_ticker_news(tickers: Iterable[str], num_articles: int = 20,
+                       sources: Sequence[str] = NEWS_SOURCES,
+                       timeout: float = REQUEST_TIMEOUT_SEC,
+                       ticker_url: Callable[[str], str] = ticker_feed_url) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Synchronous wrapper around stream_ticker_news: ticker -> articles.
+
+    Must not be called from inside a running event loop; use stream_ticker_news there.
+    """
+    async def collect() -> Dict[str, List[Dict[str, Any]]]:
+        return {t: articles async for t, articles
+                in stream_ticker_news(tickers, num_articles, sources, timeout, ticker_url)}
+
+    return asyncio.run(collect())
+
+
+def start_ticker_news(tickers: Iterable[str], num_articles: int = 20,
+                      sources: Sequence[str] = NEWS_SOURCES,
+                      timeout: float = REQUEST_TIMEOUT_SEC,
+                      ticker_url: Callable[[str], str] = ticker_feed_url,
+                      postprocess: Optional[Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]] = None
+                      ) -> Dict[str, Future]:
+    """
+    Run stream_ticker_news on a background thread, for thread-pool callers.
+
+    Returns one Future per ticker that resolves to its articles (passed
+    through postprocess, if given) as soon as they are complete, so the
+    futures can be waited on alongside executor futures.
+    """
+    futures = {t: Future() for t in feed_urls(tickers, (), ticker_url).values()}
+
+    async def consume() -> None:
+        async for ticker, articles in stream_ticker_news(futures, num_articles, sources, timeout, ticker_url):
+            try:
+                futures[ticker].set_result(postprocess(articles) if postprocess else articles)
+            except Exception as e:
+                futures[ticker].set_exception(e)
+
+    def run() -> None:
+        try:
+            asyncio.run(consume())
+        except Exception as e:
+            logger.error(f"News ingestion failed: {e}", exc_info=True)
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+        for future in futures.values():
+            if not future.done():
+                future.set_result([])
+
+    threading.Thread(target=run, name='news-ingest', daemon=True).start()
+    return futures
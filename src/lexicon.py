@@ -0,0 +1,162 @@
+import csv
+import json
+import re
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from scipy import sparse
+
+from src.utils import logger
+
+# Inflections accepted after a phrase ('surge' -> 'surged', 'gain' -> 'gains')
+PHRASE_SUFFIX = r'(?:s|es|ed|d|ing)?'
+
+def _trie_pattern(phrases: Iterable[str]) -> str:
+    """
+    Build a regex alternation for phrases factored into a prefix trie.
+
+    Shared prefixes are matched once, so the regex engine does a bounded amount
+    of work per text position instead of retrying every phrase, and optional
+    continuations are greedy so the longest phrase at a position wins
+    ('strong buy' over 'strong').
+    """
+    trie: Dict[str, dict] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        terminal = '' in node
+        branches = []
+        for char in sorted(c for c in node if c):
+            token = r'\s+' if char == ' ' else re.escape(char)
+            branches.append(token + build(node[char]))
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if terminal:
+            return f'(?:{body})?' if len(branches) > 1 or len(branches[0]) > 1 else f'{body}?'
+        return body
+
+    return build(trie)
+
+
+class PhraseMatcher:
+    """
+    Precompiled whole-word matcher for a weighted phrase lexicon.
+
+    All phrases are compiled into one word-bounded regex, so a text is scanned
+    once regardless of lexicon size. 'gain' no longer matches inside
+    'against', multi-word phrases match across any whitespace, and simple
+    inflections of a phrase count as the phrase.
+
+    Phrases are run through the same normalization as the text they are
+    matched against (normalize, e.g. the analyzer's preprocessing), so a
+    phrase with punctuation or stopwords is stored the way it appears in
+    cleaned text. Later entries win when two phrases normalize alike.
+    """
+
+    def __init__(self, weights: Dict[str, float], normalize: Optional[Callable[[str], str]] = None):
+        self.weights: Dict[str, float] = {}
+        for phrase, weight in weights.items():
+            plain = ' '.join(str(phrase).lower().split())
+            key = ' '.join(normalize(plain).split()) if normalize else plain
+            if not key:
+                logger.warning(f"Ignoring lexicon phrase {phrase!r}: nothing left after text normalization")
+                continue
+            if key != plain:
+                logger.warning(f"Lexicon phrase {phrase!r} is matched as {key!r} after text normalization")
+            self.weights[key] = float(weight)
+        self.phrases: List[str] = sorted(self.weights)
+        self.index = {phrase: i for i, phrase in enumerate(self.phrases)}
+        if self.phrases:
+            self.pattern = re.compile(rf'\b({_trie_pattern(self.phrases)}){PHRASE_SUFFIX}\b')
+        else:
+            self.pattern = None
+
+    def find_indices(self, text: str) -> List[int]:
+        """Indices (into self.phrases) of distinct phrases in text, in order of first occurrence."""
+        if self.pattern is None or not text:
+            return []
+        seen = []
+        for match in self.pattern.finditer(text):
+            i = self.index[' '.join(match.group(1).split())]
+            if i not in seen:
+                seen.append(i)
+        return seen
+
+    def document_term_matrix(self, texts: Sequence[str]) -> Tuple[sparse.csr_matrix, List[List[int]]]:
+        """
+        Keyword hits of many cleaned texts as a sparse document-term matrix.
+
+        The texts are joined and scanned in one regex pass. Entry (i, j) is 1
+        when phrase j occurs in text i, and each row stores its phrases in
+        order of first occurrence, so matrix @ weights sums them in the same
+        order as match().
+
+        Returns:
+            (CSR matrix of shape (len(texts), len(self.phrases)), the phrase
+            indices of each text as find_indices returns them)
+        """
+        n, m = len(texts), len(self.phrases)
+        if self.pattern is None or not n:
+            return sparse.csr_matrix((n, m)), [[] for _ in range(n)]
+        # NUL never survives preprocessing and is neither a word character nor
+        # whitespace, so no phrase can match across two texts
+        lengths = np.fromiter((len(t) + 1 for t in texts), dtype=np.int64, count=n)
+        starts = np.cumsum(lengths) - lengths
+        positions, columns = [], []
+        for match in self.pattern.finditer('\x00'.join(texts)):
+            positions.append(match.start())
+            columns.append(self.index[' '.join(match.group(1).split())])
+        rows = np.searchsorted(starts, np.asarray(positions, dtype=np.int64), side='right') - 1
+        cols = np.asarray(columns, dtype=np.int64)
+        # Keep the first occurrence of each (text, phrase) pair, in text order
+        first = np.sort(np.unique(rows * m + cols, return_index=True)[1])
+        rows, cols = rows[first], cols[first]
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        matrix = sparse.csr_matrix((np.ones(len(cols)), cols, indptr), shape=(n, m))
+        return matrix, [cols[indptr[i]:indptr[i + 1]].tolist() for i in range(n)]
+
+    def match(self, text: str) -> Tuple[List[str], float]:
+        """Return (matched phrases, summed weight) for text."""
+        matched = [self.phrases[i] for i in self.find_indices(text)]
+        return matched, sum(self.weights[p] for p in matched)
+
+
+def load_lexicon(path: Union[str, Path]) -> Dict[str, float]:
+    """
+    Load a weighted phrase lexicon from a file.
+
+    JSON files must hold an object mapping phrase -> weight. Any other file is
+    read as CSV/TSV rows of 'phrase,weight'; blank lines, '#' comments and a
+    non-numeric header row are skipped.
+    """
+    path = Path(path)
+    if path.suffix.lower() == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f"Lexicon {path} must be a JSON object of phrase -> weight")
+        return {str(k): float(v) for k, v in data.items()}
+
+    weights = {}
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        delimiter = '\t' if path.suffix.lower() == '.tsv' else ','
+        for row in csv.reader(f, delimiter=delimiter):
+            if not row or not row[0].strip() or row[0].lstrip().startswith('#'):
+                continue
+            if len(row) < 2:
+                raise ValueError(f"Lexicon {path}: expected 'phrase,weight', got {row}")
+            try:
+                weights[row[0].strip()] = float(row[1])
+            except ValueError:
+                if not weights:
+                    continue  # header row
+                raise
+    logger.info(f"Loaded {len(weights)} lexicon phrases from {path}")
+    return weights
@@ -0,0 +1,80 @@
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.config import USER_AGENT, REQUEST_DELAY_SEC, SCRAPE_MAX_WORKERS, HTTP_RETRIES, HTTP_RETRY_BACKOFF_SEC
+
+# Transient statuses worth retrying: rate limited, or a server/proxy error
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class HostRateLimiter:
+    """
+    Token-bucket rate limiter keyed by host.
+
+    Each host gets a bucket refilled at one token per ``min_interval`` seconds
+    and holding at most ``burst`` tokens. acquire() reserves a token and sleeps
+    until it is due, so callers for the same host are spaced out in arrival
+    order while callers for other hosts are not delayed at all.
+    """
+
+    def __init__(self, min_interval: float, burst: int = 1):
+        self.min_interval = max(0.0, float(min_interval))
+        self.burst = max(1, int(burst))
+        self._buckets: Dict[str, list] = {}  # host -> [tokens, last refill time]
+        self._lock = threading.Lock()
+
+    def acquire(self, host: str) -> float:
+        """Block until a request to host is allowed; return the seconds waited."""
+        if self.min_interval <= 0:
+            return 0.0
+        host = host.lower()
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._buckets.setdefault(host, [float(self.burst), now])
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) / self.min_interval)
+            bucket[1] = now
+            bucket[0] -= 1
+            wait = -bucket[0] * self.min_interval if bucket[0] < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+def retry_policy(retries: int = HTTP_RETRIES, backoff: float = HTTP_RETRY_BACKOFF_SEC) -> Retry:
+    """
+    Retry GET/HEAD requests answered with RETRY_STATUSES, backing off exponentially.
+
+    Retry-After is not honored: a long value would stall a host's whole queue
+    past the scrape budget, so the request is given up after the retries and
+    the last response is returned as is.
+    """
+    return Retry(total=retries, connect=retries, read=False, status=retries,
+                 status_forcelist=RETRY_STATUSES, allowed_methods=frozenset({'GET', 'HEAD'}),
+                 backoff_factor=backoff, respect_retry_after_header=False, raise_on_status=False)
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """Shared HTTP session with keep-alive connection pooling and retries for all scraping."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=SCRAPE_MAX_WORKERS * 2, pool_maxsize=SCRAPE_MAX_WORKERS,
+                                      max_retries=retry_policy())
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update({'User-Agent': USER_AGENT})
+                _session = session
+    return _session
+
+# Politeness delay between requests to the same host
+host_limiter = HostRateLimiter(REQUEST_DELAY_SEC)
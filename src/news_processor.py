@@ -1,26 +1,38 @@
+import threading
 import time
 import feedparser
 import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse
-from urllib import robotparser
-import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable
 
 from src.utils import (
     handle_errors, 
     logger, 
-    clean_text, 
     load_cache, 
-    cache_data
+    cache_data,
+    canonicalize_url,
+    resolve_news_link,
+    stable_digest
 )
+from src.net import get_session, host_limiter
+from src.robots import robots_cache
+from src.feed_state import feed_state
+from src.extract import PAYWALL_MARKERS, read_stream, extract_article_text, response_encoding
 from src.config import (
     RESPECT_ROBOTS,
     ALLOW_PAYWALLED,
     REQUEST_TIMEOUT_SEC,
-    REQUEST_DELAY_SEC,
-    USER_AGENT
+    USER_AGENT,
+    SCRAPE_MAX_WORKERS,
+    SCRAPE_MAX_BYTES,
+    SCRAPE_CHUNK_BYTES,
+    NEWS_CACHE_MINUTES,
+    MIN_WORDS_FOR_ANALYSIS,
+    ENRICH_TIME_BUDGET_SEC,
+    ENRICH_BYTE_BUDGET
 )
 
 def _robots_allows(url: str) -> bool:
@@ -33,24 +45,38 @@ def _robots_allows(url: str) -> bool:
         logger.warning(f"Invalid URL format: {url}")
         return False
         
-    robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
-    rp = robotparser.RobotFileParser()
-    
+    can_fetch = robots_cache.allows(url, USER_AGENT)
+    if not can_fetch:
+        logger.info(f"Robots.txt disallows: {url}")
+    return can_fetch
+
+def ticker_feed_url(ticker: str) -> str:
+    """Google News RSS search URL for a ticker."""
+    return f"https://news.google.com/rss/search?q={ticker}+stock&hl=en-US&gl=US&ceid=US:en"
+
+def normalize_entry(entry, default_source: str = 'Unknown') -> Optional[dict]:
+    """Turn a feedparser entry into an article dict, or None if it has no link."""
     try:
-        # Set a timeout for the robots.txt request
-        rp.set_url(robots_url)
-        rp.read()
-        can_fetch = rp.can_fetch(USER_AGENT, url)
-        
-        if not can_fetch:
-            logger.info(f"Robots.txt disallows: {url}")
+        if not hasattr(entry, 'link') or not entry.link:
+            return None
             
-        return can_fetch
+        raw_date = getattr(entry, 'published', '') or getattr(entry, 'updated', '')
+        try:
+            date = datetime.strptime(raw_date, '%a, %d %b %Y %H:%M:%S %Z') if raw_date else datetime.utcnow()
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Error parsing date '{raw_date}': {e}")
+            date = datetime.utcnow()
+            
+        return {
+            'title': getattr(entry, 'title', 'No title'),
+            'link': entry.link,
+            'date': date,
+            'source': getattr(entry, 'source', {}).get('title', default_source)
+        }
         
     except Exception as e:
-        logger.warning(f"Error checking robots.txt for {robots_url}: {str(e)}")
-        # Be more conservative - if we can't check robots.txt, don't scrape
-        return False
+        logger.error(f"Error processing RSS entry: {e}", exc_info=True)
+        return None
 
 @handle_errors
 def fetch_news_rss(ticker: str, num_articles: int = 20) -> list[dict]:
@@ -60,109 +86,225 @@ def fetch_news_rss(ticker: str, num_articles: int = 20) -> list[dict]:
         return []
         
     ticker = ticker.strip().upper()
+    # The whole feed is cached and sliced per call, so requests for different
+    # numbers of articles share one entry without truncating each other
     cache_key = f"{ticker}_news_rss"
     
     try:
         cached = load_cache(cache_key)
         if cached is not None:
-            return cached
+            return cached[:num_articles]
             
-        url = f"https://news.google.com/rss/search?q={ticker}+stock&hl=en-US&gl=US&ceid=US:en"
+        url = ticker_feed_url(ticker)
         logger.info(f"Fetching RSS for {ticker}: {url}")
         
-        # Set up the feedparser with custom request handling
-        import socket
-        import urllib.request
-        
-        # Create a custom request with timeout
-        req = urllib.request.Request(
-            url,
-            headers={'User-Agent': USER_AGENT}
-        )
-        
+        state = feed_state.get(url)
         try:
-            # Open URL with timeout
-            with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT_SEC) as response:
-                content = response.read()
-                feed = feedparser.parse(content)
-        except (urllib.error.URLError, socket.timeout) as e:
+            resp = get_session().get(url, headers=feed_state.request_headers(state), timeout=REQUEST_TIMEOUT_SEC)
+        except requests.RequestException as e:
             logger.warning(f"Error fetching RSS feed: {e}")
             return []
         
-        if feed.bozo and feed.bozo_exception:
-            logger.warning(f"Error parsing RSS feed: {feed.bozo_exception}")
+        if resp.status_code == 304 and state:
+            logger.info(f"RSS for {ticker} not modified, reusing stored entries")
+            # Refill the news cache with the full stored feed, like a 200 does
+            entries = feed_state.not_modified(url, state)
+        elif resp.status_code != 200:
+            logger.warning(f"Error fetching RSS feed: HTTP {resp.status_code}")
             return []
-            
-        articles = []
-        for entry in feed.entries[:num_articles]:
-            try:
-                if not hasattr(entry, 'link') or not entry.link:
-                    continue
-                    
-                raw_date = getattr(entry, 'published', '') or getattr(entry, 'updated', '')
-                try:
-                    date = datetime.strptime(raw_date, '%a, %d %b %Y %H:%M:%S %Z') if raw_date else datetime.utcnow()
-                except (ValueError, TypeError) as e:
-                    logger.warning(f"Error parsing date '{raw_date}': {e}")
-                    date = datetime.utcnow()
-                    
-                articles.append({
-                    'title': getattr(entry, 'title', 'No title'),
-                    'link': entry.link,
-                    'date': date,
-                    'source': getattr(entry, 'source', {}).get('title', 'Unknown')
-                })
+        else:
+            feed = feedparser.parse(resp.content)
+            if feed.bozo and feed.bozo_exception:
+                logger.warning(f"Error parsing RSS feed: {feed.bozo_exception}")
+                return []
                 
-            except Exception as e:
-                logger.error(f"Error processing RSS entry: {e}", exc_info=True)
-                continue
+            entries = [a for a in (normalize_entry(entry) for entry in feed.entries) if a is not None]
+            feed_state.save(url, resp.headers, entries, len(resp.content))
                 
-        if articles:
-            cache_data(cache_key, articles, expire_hours=1)  # Cache for 1 hour
+        if entries:
+            cache_data(cache_key, entries, expire_hours=NEWS_CACHE_MINUTES / 60)
             
-        return articles
+        return entries[:num_articles]
         
     except Exception as e:
         logger.error(f"Error in fetch_news_rss for {ticker}: {e}", exc_info=True)
         return []
 
-def _looks_paywalled(html: str) -> bool:
-    low = html.lower()
-    for k in ["subscribe", "paywall", "metered", "membership", "register to read"]:
-        if k in low:
-            return True
-    return False
+def _article_cache_key(canonical_url: str) -> str:
+    """Cache key for a scraped article body, stable across processes and runs."""
+    return f"article_{stable_digest(canonical_url)}"
+
+def _article_index_key(canonical_url: str) -> str:
+    """Cache key mapping a requested URL to the body cached under its final URL."""
+    return f"article_index_{stable_digest(canonical_url)}"
+
+def _load_cached_article(canonical_url: str) -> Optional[str]:
+    cached = load_cache(_article_cache_key(canonical_url))
+    if cached is not None:
+        return cached
+    body_key = load_cache(_article_index_key(canonical_url))
+    if body_key is not None:
+        return load_cache(body_key)
+    return None
+
+def _cache_article(requested_url: str, final_url: str, text: str) -> None:
+    """Cache text under the final URL and index the requested URL to it."""
+    body_key = _article_cache_key(final_url)
+    cache_data(body_key, text)
+    if requested_url != final_url:
+        cache_data(_article_index_key(requested_url), body_key)
+
+class ScrapeBudget:
+    """
+    Time and byte allowance shared by a group of article fetches.
+
+    Bytes are charged chunk by chunk as they are read (see take()), so
+    concurrent fetches never overshoot the byte budget, yet each one only
+    counts against it what it actually downloaded; fetches stop being
+    started once the deadline passes or the bytes are spent.
+    """
+
+    def __init__(self, seconds: float, max_bytes: int):
+        self.deadline = time.monotonic() + seconds
+        self.bytes_left = max_bytes
+        self.bytes_used = 0
+        self._lock = threading.Lock()
+
+    def remaining_time(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def exhausted(self) -> bool:
+        return self.remaining_time() <= 0 or self.bytes_left <= 0
+
+    def take(self, nbytes: int) -> int:
+        """Charge up to nbytes just read and return how many of them fit in the budget."""
+        with self._lock:
+            granted = max(0, min(nbytes, self.bytes_left))
+            self.bytes_left -= granted
+            self.bytes_used += granted
+            return granted
 
 @handle_errors
-def scrape_article_content(link: str) -> str:
-    cache_key = f"article_{hash(link)}"
-    cached = load_cache(cache_key)
+def scrape_article_content(link: str, budget: Optional[ScrapeBudget] = None) -> str:
+    canonical = canonicalize_url(link)
+    cached = _load_cached_article(canonical)
     if cached is not None:
         return cached
 
-    if not _robots_allows(link):
-        logger.info(f"Skipping (robots.txt disallow): {link}")
+    if budget is not None and budget.exhausted():
+        return ""
+
+    target = resolve_news_link(link)
+    if not _robots_allows(target):
+        logger.info(f"Skipping (robots.txt disallow): {target}")
         return ""
 
-    headers = {"User-Agent": USER_AGENT}
-    resp = requests.get(link, headers=headers, timeout=REQUEST_TIMEOUT_SEC)
-    time.sleep(REQUEST_DELAY_SEC)
+    # Space out requests per host instead of sleeping after every article
+    host_limiter.acquire(urlparse(target).netloc)
+    timeout, deadline, charge = REQUEST_TIMEOUT_SEC, None, None
+    if budget is not None:
+        timeout, deadline, charge = min(timeout, budget.remaining_time()), budget.deadline, budget.take
 
-    if resp.status_code != 200:
-        logger.info(f"Skipping non-200 ({resp.status_code}): {link}")
+    try:
+        with get_session().get(target, timeout=timeout, stream=True) as resp:
+            if resp.status_code != 200:
+                logger.info(f"Skipping non-200 ({resp.status_code}): {target}")
+                return ""
+
+            # Read at most SCRAPE_MAX_BYTES, stopping early at the first paywall marker
+            streamed = read_stream(
+                resp.iter_content(chunk_size=SCRAPE_CHUNK_BYTES),
+                max_bytes=SCRAPE_MAX_BYTES,
+                markers=() if ALLOW_PAYWALLED else PAYWALL_MARKERS,
+                deadline=deadline,
+                charge=charge
+            )
+            used = len(streamed.content)
+            encoding = response_encoding(resp.headers.get('Content-Type', ''))
+            final_url = resp.url or target
+    except requests.RequestException as e:
+        # Don't let one slow or broken host hold up the rest of its queue
+        logger.info(f"Error fetching article {target}: {e}")
         return ""
 
-    if not ALLOW_PAYWALLED and _looks_paywalled(resp.text):
-        logger.info(f"Skipping likely paywalled article: {link}")
+    if streamed.paywalled:
+        logger.info(f"Skipping likely paywalled article: {target}")
         return ""
+    if streamed.truncated:
+        logger.info(f"Article cut off after {used} bytes, extracting from the first part: {target}")
 
-    soup = BeautifulSoup(resp.text, 'html.parser')
-    body = soup.find('article') or soup.find('div', class_='article-body') or soup.find('body')
-    if not body:
+    cleaned = extract_article_text(streamed.content, encoding)
+    if not cleaned:
         return ""
-    for tag in body(["script", "style", "noscript"]):
-        tag.decompose()
-    text = body.get_text(separator=" ")
-    cleaned = clean_text(text)
-    cache_data(cache_key, cleaned)
+    # Text cut short by a budget is still usable now but is not cached as the article
+    if not (streamed.truncated and budget is not None):
+        _cache_article(canonical, canonicalize_url(final_url), cleaned)
     return cleaned
+
+def scrape_articles(links: Iterable[str], max_workers: int = SCRAPE_MAX_WORKERS,
+                    budget: Optional[ScrapeBudget] = None) -> Dict[str, str]:
+    """
+    Scrape many articles concurrently while staying polite to each host.
+
+    Links are grouped by host and each host's queue is worked through by one
+    task, spaced by the per-host rate limiter; up to max_workers hosts are
+    scraped in parallel. Total time is roughly that of the slowest host's
+    queue rather than the sum of all delays. With a budget, fetches stop
+    once its time or bytes run out and the remaining links map to "".
+
+    Returns:
+        dict: Link -> cleaned article text ("" if it could not be scraped)
+    """
+    by_host = defaultdict(list)
+    for link in dict.fromkeys(l for l in links if l):
+        by_host[urlparse(resolve_news_link(link)).netloc.lower()].append(link)
+    if not by_host:
+        return {}
+
+    def scrape_host(host_links: List[str]) -> Dict[str, str]:
+        return {link: scrape_article_content(link, budget) or "" for link in host_links}
+
+    results: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(by_host))),
+                            thread_name_prefix='scrape') as pool:
+        for scraped in pool.map(scrape_host, by_host.values()):
+            results.update(scraped)
+    if RESPECT_ROBOTS:
+        robots = robots_cache.stats()
+        logger.info(f"robots.txt: {robots['fetches']} fetched, {robots['saved']} lookups served from cache")
+    return results
+
+def enrich_articles(articles: List[Dict], time_budget_sec: float = ENRICH_TIME_BUDGET_SEC,
+                    byte_budget: int = ENRICH_BYTE_BUDGET) -> List[Dict]:
+    """
+    Add scraped article bodies as 'content' so sentiment is scored on full text.
+
+    Bodies are fetched concurrently under a shared time and byte budget.
+    Articles whose body could not be fetched in budget (or is shorter than
+    MIN_WORDS_FOR_ANALYSIS words) keep no content and are scored on the
+    headline. Every article gets 'full_text' set to whether it has a body.
+
+    Returns:
+        list: The same article dicts, updated in place
+    """
+    if not articles:
+        return articles
+
+    start = time.time()
+    budget = ScrapeBudget(time_budget_sec, byte_budget)
+    links = [a['link'] for a in articles if a.get('link') and not a.get('content')]
+    bodies = scrape_articles(links, budget=budget) if links else {}
+
+    for article in articles:
+        if article.get('content'):
+            article['full_text'] = True
+            continue
+        body = bodies.get(article.get('link'), '')
+        article['full_text'] = len(body.split()) >= MIN_WORDS_FOR_ANALYSIS
+        if article['full_text']:
+            article['content'] = body
+
+    full = sum(1 for a in articles if a['full_text'])
+    logger.info(f"Full text for {full}/{len(articles)} articles "
+                f"({budget.bytes_used} bytes in {time.time() - start:.1f}s)")
+    return articles
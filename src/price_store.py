@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+from urllib.parse import quote
+
+import pandas as pd
+
+from src.utils import logger
+from src.config import PRICE_STORE_DIR, PRICE_STORE_MAX_AGE_MINUTES
+
+# yfinance period strings -> offset back from today ('max' and 'ytd' handled separately)
+PERIOD_OFFSETS = {
+    'd': lambda n: pd.DateOffset(days=n),
+    'wk': lambda n: pd.DateOffset(weeks=n),
+    'mo': lambda n: pd.DateOffset(months=n),
+    'y': lambda n: pd.DateOffset(years=n)
+}
+
+def period_start(period: str, now: Optional[datetime] = None) -> Optional[pd.Timestamp]:
+    """Return the first date covered by a yfinance period string, or None for 'max'."""
+    today = pd.Timestamp(now or datetime.now()).normalize()
+    period = period.strip().lower()
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return today.replace(month=1, day=1)
+    for suffix, offset in PERIOD_OFFSETS.items():
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return today - offset(int(period[:-len(suffix)]))
+    raise ValueError(f"Unsupported period: {period}")
+
+def period_bars(period: str) -> Optional[int]:
+    """
+    Number of bars in a day-count period ('5d' -> 5), or None for other periods.
+
+    yfinance counts these in trading sessions, not calendar days, so they
+    select the newest bars instead of a date range ('1d' on a Saturday is
+    Friday's bar).
+    """
+    period = period.strip().lower()
+    if period.endswith('d') and period[:-1].isdigit():
+        return int(period[:-1])
+    return None
+
+def naive_index(df: pd.DataFrame) -> pd.DataFrame:
+    """Drop the timezone from a DatetimeIndex, keeping exchange-local wall time."""
+    if isinstance(df.index, pd.DatetimeIndex) and df.index.tz is not None:
+        df = df.copy()
+        df.index = df.index.tz_localize(None)
+    return df
+
+
+class PriceStore:
+    """
+    Local per-ticker OHLCV store so repeat fetches only download the missing tail.
+
+    Each ticker is kept as one Parquet file next to a small JSON sidecar that
+    records how far back the stored history is known to be complete
+    ('covered_from') and when it was last refreshed. Files are replaced
+    atomically, and the index is stored timezone-naive (exchange-local dates)
+    so frames from Ticker.history() and yf.download() merge cleanly.
+    """
+
+    def __init__(self, root: Union[str, Path], max_age_minutes: float):
+        self.root = Path(root)
+        self.max_age_sec = max_age_minutes * 60
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def lock(self, ticker: str) -> threading.Lock:
+        """Per-ticker lock serializing read-modify-write cycles."""
+        with self._locks_guard:
+            return self._locks.setdefault(ticker.upper(), threading.Lock())
+
+    def _paths(self, ticker: str) -> Tuple[Path, Path]:
+        # Built explicitly: with_suffix() would cut 'SHOP.TO' or 'BRK.B' at the dot
+        name = quote(ticker.upper(), safe='')
+        return self.root / f"{name}.parquet", self.root / f"{name}.json"
+
+    def load(self, ticker: str) -> Tuple[Optional[pd.DataFrame], Dict[str, Any]]:
+        """Return (stored history, metadata); history is None if nothing is stored."""
+        data_path, meta_path = self._paths(ticker)
+        if not data_path.exists() or not meta_path.exists():
+            return None, {}
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            return pd.read_parquet(data_path), meta
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable price store for {ticker}: {e}")
+            return None, {}
+
+    def covers(self, meta: Dict[str, Any], start: Optional[pd.Timestamp],
+               stored: Optional[pd.DataFrame] = None, bars: Optional[int] = None) -> bool:
+        """
+        True if the stored history is complete back to start (None = full history).
+
+        For a day-count period (bars given) the newest bars of stored must lie
+        in the complete range instead.
+        """
+        covered_from = meta.get('covered_from')
+        if covered_from is None:
+            return False
+        if covered_from == 'max':
+            return True
+        if bars is not None:
+            return stored is not None and int((stored.index >= pd.Timestamp(covered_from)).sum()) >= bars
+        return start is not None and pd.Timestamp(covered_from) <= start
+
+    @staticmethod
+    def coverage_start(meta: Dict[str, Any]) -> Optional[pd.Timestamp]:
+        """The stored 'covered_from' as a Timestamp (None = full history)."""
+        covered_from = meta.get('covered_from')
+        return None if covered_from in (None, 'max') else pd.Timestamp(covered_from)
+
+    def is_fresh(self, meta: Dict[str, Any]) -> bool:
+        """True if the store was refreshed recently enough to skip the network."""
+        return time.time() - meta.get('refreshed_at', 0) < self.max_age_sec
+
+    def save(self, ticker: str, history: pd.DataFrame, covered_from: Optional[pd.Timestamp]) -> None:
+        """Atomically replace the stored history and its metadata."""
+        data_path, meta_path = self._paths(ticker)
+        self.root.mkdir(parents=True, exist_ok=True)
+        meta = {
+            'covered_from': 'max' if covered_from is None else pd.Timestamp(covered_from).isoformat(),
+            'refreshed_at': time.time(),
+            'rows': len(history),
+            'last_bar': history.index[-1].isoformat() if len(history) else None
+        }
+        tmp_data = data_path.with_name(f"{data_path.name}.tmp")
+        tmp_meta = meta_path.with_name(f"{meta_path.name}.tmp")
+        history.to_parquet(tmp_data)
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_data, data_path)
+        os.replace(tmp_meta, meta_path)
+
+    def merge(self, ticker: str, stored: Optional[pd.DataFrame], new: Optional[pd.DataFrame],
+              covered_from: Optional[pd.Timestamp]) -> pd.DataFrame:
+        """Merge newly fetched bars into the stored history (new bars win) and save."""
+        frames = [f for f in (stored, naive_index(new) if new is not None else None)
+                  if f is not None and not f.empty]
+        if not frames:
+            return pd.DataFrame()
+        merged = pd.concat(frames) if len(frames) > 1 else frames[0]
+        merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+        self.save(ticker, merged, covered_from)
+        return merged
+
+    @staticmethod
+    def download_start(data: Optional[pd.DataFrame], start: Optional[pd.Timestamp],
+                       bars: Optional[int] = None) -> Optional[pd.Timestamp]:
+        """Where a fresh period download is complete from: start, or its first bar for day-count periods."""
+        if bars is None or data is None or data.empty:
+            return start
+        return naive_index(data).index[0]
+
+    @staticmethod
+    def window(history: Optional[pd.DataFrame], start: Optional[pd.Timestamp],
+               bars: Optional[int] = None) -> pd.DataFrame:
+        """Return the rows of history on or after start, or its newest bars for day-count periods."""
+        if history is None or history.empty:
+            return pd.DataFrame()
+        if bars is not None:
+            return history.tail(bars)
+        return history if start is None else history[history.index >= start]
+
+    @staticmethod
+    def needs_full_refresh(tail: Optional[pd.DataFrame], last_bar: pd.Timestamp) -> bool:
+        """
+        True if a freshly fetched tail has a split or dividend after last_bar.
+
+        yfinance returns adjusted prices, so such an event rewrites the whole
+        back-adjusted series and the stored bars can no longer be extended.
+        """
+        if tail is None or tail.empty:
+            return False
+        tail = naive_index(tail)
+        tail = tail[tail.index > last_bar]
+        for column in ('Stock Splits', 'Dividends'):
+            if column in tail.columns and (tail[column].fillna(0) != 0).any():
+                return True
+        return False
+
+
+price_store = PriceStore(PRICE_STORE_DIR, PRICE_STORE_MAX_AGE_MINUTES)
@@ -0,0 +1,306 @@
+"""
+Headless chart rendering.
+
+Charts are described by small picklable specs (plain NumPy arrays plus a
+title) built in the calling process, and rendered in a process pool with
+matplotlib's object-oriented Agg API, so no pyplot global state is touched
+and renders never block the CLI thread. Each worker process keeps one
+figure template per chart kind and updates its artists' data in place
+instead of building a new figure for every chart.
+
+Long series are downsampled on the data side before they reach a worker:
+price history is resampled to weekly/monthly/quarterly OHLC bars and
+article sentiment is averaged per day (or coarser), so a chart holds at most
+PLOT_MAX_POINTS points and a fixed handful of artists (lines plus one
+collection for volume, one for the high/low band and one for sentiment
+stems) however long the history is.
+
+Output quality is chosen per render with a profile from RENDER_PROFILES,
+e.g. 'preview' (low DPI, fast PNG encoding) or 'publication' (PLOT_DPI,
+tight bounding box).
+"""
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import matplotlib.dates as mdates
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
+from matplotlib.ticker import MaxNLocator, ScalarFormatter
+
+from src.utils import logger
+from src.config import PLOT_DPI, PLOT_MAX_POINTS, RENDER_WORKERS
+
+RENDER_PROFILES: Dict[str, Dict[str, Any]] = {
+    'preview': {'dpi': 80, 'bbox_inches': None},
+    'publication': {'dpi': PLOT_DPI, 'bbox_inches': 'tight'}
+}
+
+ChartSpec = Dict[str, Any]
+
+# Coarser bar sizes tried in order when a series has more than PLOT_MAX_POINTS rows
+RESAMPLE_RULES = (('D', 'daily'), ('W-FRI', 'weekly'), ('MS', 'monthly'), ('QS', 'quarterly'))
+_RULE_BY_LABEL = {label: rule for rule, label in RESAMPLE_RULES}
+_OHLC_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+
+def _date_numbers(index: pd.Index) -> np.ndarray:
+    return mdates.date2num(pd.DatetimeIndex(index).to_pydatetime())
+
+
+def _bar_rule(index: pd.DatetimeIndex, max_points: int, start: int = 0) -> Tuple[Optional[str], str]:
+    """First rule from RESAMPLE_RULES[start:] giving at most max_points bars; (None, label) keeps rows as is."""
+    if not max_points or len(index) <= max_points:
+        return None, RESAMPLE_RULES[start][1]
+    ones = pd.Series(1, index=index)
+    for rule, label in RESAMPLE_RULES[start:]:
+        if (ones.resample(rule).size() > 0).sum() <= max_points:
+            return rule, label
+    return RESAMPLE_RULES[-1]
+
+
+def downsample_ohlc(history: pd.DataFrame, max_points: int = PLOT_MAX_POINTS) -> Tuple[pd.DataFrame, str]:
+    """
+    Resample daily bars to the finest of weekly/monthly/quarterly OHLCV bars
+    that fits in max_points rows.
+
+    Returns:
+        tuple: (bars, label), e.g. (weekly frame, 'weekly'); the history is
+            returned unchanged with label 'daily' when it already fits
+    """
+    rule, label = _bar_rule(pd.DatetimeIndex(history.index), max_points, start=1)
+    if rule is None:
+        return history, 'daily'
+    agg = {col: how for col, how in _OHLC_AGG.items() if col in history.columns}
+    return history.resample(rule).agg(agg).dropna(subset=['Close']), label
+
+
+def aggregate_sentiment(sentiment_df: pd.DataFrame, max_points: int = PLOT_MAX_POINTS) -> Tuple[pd.DataFrame, str]:
+    """
+    Average per-article sentiment per day (or per week/month/quarter when
+    there are more than max_points days with articles).
+
+    Returns:
+        tuple: (frame with 'sentiment' mean and 'count' per period, label);
+            without a datetime index articles are averaged over at most
+            max_points equal consecutive groups
+    """
+    scores = sentiment_df['sentiment'].astype(float)
+    if not isinstance(scores.index, pd.DatetimeIndex):
+        n = len(scores)
+        groups = np.arange(n) * max_points // n if max_points and n > max_points else np.arange(n)
+        out = scores.groupby(groups).agg(['mean', 'count'])
+        return out.rename(columns={'mean': 'sentiment'}), 'article'
+    scores = scores[scores.index.notna()].sort_index()
+    rule, label = _bar_rule(pd.DatetimeIndex(scores.index.normalize().unique()), max_points)
+    out = scores.resample(rule or 'D').agg(['mean', 'count'])
+    return out[out['count'] > 0].rename(columns={'mean': 'sentiment'}), label
+
+
+def price_chart_spec(ticker: str, history: pd.DataFrame, features: Optional[pd.DataFrame] = None,
+                     max_points: int = PLOT_MAX_POINTS) -> ChartSpec:
+    """Spec for the price chart: close with high/low band, 50-day MA (if computed) and volume."""
+    bars, label = downsample_ohlc(history, max_points)
+    x = _date_numbers(bars.index)
+    ma = None
+    if features is not None and 'MA50' in features.columns and features['MA50'].notna().any():
+        ma50 = features['MA50'].dropna()
+        if label != 'daily':
+            ma50 = ma50.resample(_RULE_BY_LABEL[label]).last().dropna()
+        ma = (_date_numbers(ma50.index), ma50.to_numpy(dtype=float))
+    has_range = label != 'daily' and {'High', 'Low'} <= set(bars.columns)
+    return {
+        'kind': 'price',
+        'title': f"{ticker} Stock Price Analysis" + (f" ({label} bars)" if label != 'daily' else ''),
+        'close': (x, bars['Close'].to_numpy(dtype=float)),
+        'range': (x, bars['Low'].to_numpy(dtype=float), bars['High'].to_numpy(dtype=float)) if has_range else None,
+        'ma50': ma,
+        'volume': (x, bars['Volume'].to_numpy(dtype=float)) if 'Volume' in bars.columns else None
+    }
+
+
+def sentiment_chart_spec(ticker: str, sentiment_df: pd.DataFrame, max_points: int = PLOT_MAX_POINTS) -> ChartSpec:
+    """Spec for the sentiment chart: one stem per day (or coarser period) at its mean score."""
+    periods, label = aggregate_sentiment(sentiment_df, max_points)
+    dates = isinstance(periods.index, pd.DatetimeIndex)
+    x = _date_numbers(periods.index) if dates else periods.index.to_numpy(dtype=float)
+    count = int(periods['count'].sum())
+    return {
+        'kind': 'sentiment',
+        'title': f"{ticker} Sentiment Analysis (" + (f"{label} average of " if dates else '') + f"{count} articles)",
+        'dates': dates,
+        'sentiment': (x, periods['sentiment'].to_numpy(dtype=float))
+    }
+
+
+def _stems(x: np.ndarray, top: np.ndarray, bottom: float = 0.0) -> np.ndarray:
+    """Vertical segments from bottom to top at each x, as a LineCollection segment array."""
+    segments = np.empty((len(x), 2, 2))
+    segments[:, :, 0] = x[:, None]
+    segments[:, 0, 1] = bottom
+    segments[:, 1, 1] = top
+    return segments
+
+
+def _step_polygon(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Outline of a post-step area from 0 to y, each step lasting until the next x."""
+    if not len(x):
+        return np.empty((0, 2))
+    width = np.median(np.diff(x)) if len(x) > 1 else 1.0
+    edges = np.append(x, x[-1] + width)
+    xs = np.concatenate([[edges[0]], np.repeat(edges, 2)[1:-1], [edges[-1]]])
+    ys = np.concatenate([[0.0], np.repeat(np.nan_to_num(y), 2), [0.0]])
+    return np.column_stack([xs, ys])
+
+
+def _band_polygon(x: np.ndarray, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+    """Outline of the area between low and high."""
+    return np.column_stack([np.concatenate([x, x[::-1]]), np.concatenate([high, low[::-1]])])
+
+
+def _date_axis(ax) -> None:
+    locator = mdates.AutoDateLocator()
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+
+
+class _PriceTemplate:
+    def __init__(self):
+        self.fig = Figure(figsize=(12, 10), constrained_layout=True)
+        FigureCanvasAgg(self.fig)
+        self.ax1, self.ax2 = self.fig.subplots(2, 1, sharex=True, gridspec_kw={'height_ratios': [3, 1]})
+        self.range = PolyCollection([], facecolors='tab:blue', alpha=0.15, label='High/Low')
+        self.ax1.add_collection(self.range)
+        self.close, = self.ax1.plot([], [], label='Close Price', color='tab:blue')
+        self.ma, = self.ax1.plot([], [], label='50-day MA', color='tab:orange', linestyle='--')
+        self.volume = PolyCollection([], facecolors='tab:green', alpha=0.3)
+        self.ax2.add_collection(self.volume)
+        self.ax1.set_ylabel('Price ($)', color='tab:blue')
+        self.ax1.grid(True, linestyle='--', alpha=0.7)
+        self.ax2.set_ylabel('Volume', color='tab:green')
+        self.ax2.grid(True, linestyle='--', alpha=0.3)
+        _date_axis(self.ax2)
+
+    def update(self, spec: ChartSpec) -> None:
+        self.ax1.set_title(spec['title'])
+        self.close.set_data(*spec['close'])
+        self.ma.set_data(*(spec['ma50'] or ([], [])))
+        self.ma.set_visible(spec['ma50'] is not None)
+        self.range.set_verts([_band_polygon(*spec['range'])] if spec['range'] is not None else [])
+        self.range.set_visible(spec['range'] is not None)
+        self.ax1.legend(handles=[h for h in (self.close, self.ma, self.range) if h.get_visible()], loc='upper left')
+        self.ax1.relim()
+        self.ax1.autoscale_view()
+        if spec['range'] is not None:
+            # Collections are not part of relim(); widen the y range to the band
+            x, low, high = spec['range']
+            lo, hi = self.ax1.get_ylim()
+            self.ax1.set_ylim(min(lo, float(np.nanmin(low, initial=lo))), max(hi, float(np.nanmax(high, initial=hi))))
+        self.ax2.set_visible(spec['volume'] is not None)
+        if spec['volume'] is not None:
+            # The shared x axis follows ax1
+            self.volume.set_verts([_step_polygon(*spec['volume'])])
+            self.ax2.set_ylim(0, max(1.0, float(np.nanmax(spec['volume'][1], initial=0))) * 1.05)
+
+
+class _SentimentTemplate:
+    def __init__(self):
+        self.fig = Figure(figsize=(12, 4), constrained_layout=True)
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.subplots()
+        self.stems = LineCollection([], colors='tab:purple', alpha=0.7)
+        self.ax.add_collection(self.stems)
+        self.ax.axhline(0, color='grey', linewidth=0.8)
+        self.ax.set_xlabel('Date')
+        self.ax.set_ylabel('Sentiment Score')
+        self.ax.grid(True, linestyle='--', alpha=0.3)
+
+    def update(self, spec: ChartSpec) -> None:
+        self.ax.set_title(spec['title'])
+        x, y = spec['sentiment']
+        self.stems.set_segments(_stems(x, y))
+        # Stems get thinner as there are more of them, up to a bar-like 6pt
+        axis_points = self.fig.get_figwidth() * 72 * 0.9
+        self.stems.set_linewidth(float(np.clip(0.6 * axis_points / max(len(x), 1), 0.5, 6)))
+        if spec['dates']:
+            _date_axis(self.ax)
+        else:
+            self.ax.xaxis.set_major_locator(MaxNLocator(integer=True))
+            self.ax.xaxis.set_major_formatter(ScalarFormatter())
+        if len(x):
+            pad = max(0.5, (x.max() - x.min()) * 0.02)
+            self.ax.set_xlim(x.min() - pad, x.max() + pad)
+        else:
+            self.ax.set_xlim(0, 1)
+        self.ax.set_ylim(min(-0.1, float(np.nanmin(y, initial=0)) * 1.1),
+                         max(0.1, float(np.nanmax(y, initial=0)) * 1.1))
+
+
+_TEMPLATE_TYPES = {'price': _PriceTemplate, 'sentiment': _SentimentTemplate}
+_templates: Dict[str, Any] = {}
+
+
+def render_chart(spec: ChartSpec, path: Union[str, Path], profile: str = 'publication') -> str:
+    """Render spec to a PNG at path (runs in a worker process, or inline)."""
+    options = RENDER_PROFILES[profile]
+    template = _templates.get(spec['kind'])
+    if template is None:
+        template = _templates[spec['kind']] = _TEMPLATE_TYPES[spec['kind']]()
+    template.update(spec)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    template.fig.savefig(path, dpi=options['dpi'], bbox_inches=options['bbox_inches'])
+    return str(path)
+
+
+class Renderer:
+    """Renders chart specs in a process pool (or inline with workers=0)."""
+
+    def __init__(self, workers: int = RENDER_WORKERS):
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._pool is None:
+                # Spawned workers do not inherit the parent's threads or locks;
+                # fork would copy them mid-use from the batch and scraper pools
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+
+    def submit(self, spec: ChartSpec, path: Union[str, Path], profile: str = 'publication') -> Future:
+        """Queue a render; the future resolves to the saved path."""
+        if profile not in RENDER_PROFILES:
+            raise ValueError(f"Unknown render profile: {profile}")
+        pool = self._get_pool()
+        if pool is not None:
+            try:
+                return pool.submit(render_chart, spec, str(path), profile)
+            except RuntimeError as e:
+                logger.warning(f"Render pool unavailable, rendering inline: {e}")
+        future = Future()
+        try:
+            future.set_result(render_chart(spec, path, profile))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+
+renderer = Renderer()
+atexit.register(renderer.shutdown)
@@ -0,0 +1,138 @@
+import re
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Tuple
+from urllib import robotparser
+from urllib.parse import urlparse
+
+from src.net import get_session, host_limiter
+from src.utils import logger, load_cache, cache_data
+from src.config import (
+    USER_AGENT,
+    REQUEST_TIMEOUT_SEC,
+    ROBOTS_CACHE_TTL_HOURS,
+    ROBOTS_ERROR_TTL_MINUTES
+)
+
+_MAX_AGE_RE = re.compile(r'max-age\s*=\s*(\d+)', re.IGNORECASE)
+
+
+def _ttl_from_headers(headers: Dict[str, str], default_sec: float) -> float:
+    """Use Cache-Control max-age when the server sends one, else the default TTL."""
+    match = _MAX_AGE_RE.search(headers.get('Cache-Control', '') or '')
+    return float(match.group(1)) if match else default_sec
+
+
+def _build_parser(policy: Dict[str, Any]) -> robotparser.RobotFileParser:
+    """Rebuild a RobotFileParser from a cached policy (status + robots.txt lines)."""
+    rp = robotparser.RobotFileParser()
+    status = policy.get('status')
+    if status in (401, 403):
+        rp.disallow_all = True
+    elif status is not None and 400 <= status < 500:
+        rp.allow_all = True
+    elif status == 200:
+        rp.parse(policy.get('lines', []))
+    else:
+        # Server error or network failure: be conservative and don't scrape
+        rp.disallow_all = True
+    return rp
+
+
+class RobotsPolicyCache:
+    """
+    Per-host robots.txt policies shared by all scraping in the process.
+
+    Policies are kept in memory and in the disk cache (so they survive across
+    runs) until their TTL expires: Cache-Control max-age when the server sends
+    one, ROBOTS_CACHE_TTL_HOURS otherwise, and ROBOTS_ERROR_TTL_MINUTES after a
+    failed fetch or a server error. Concurrent lookups for the same host share one in-flight
+    fetch.
+    """
+
+    def __init__(self, default_ttl_sec: float, error_ttl_sec: float):
+        self.default_ttl_sec = default_ttl_sec
+        self.error_ttl_sec = error_ttl_sec
+        self._policies: Dict[str, Tuple[robotparser.RobotFileParser, float]] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.fetches = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.coalesced = 0
+
+    def _fetch(self, origin: str) -> Tuple[robotparser.RobotFileParser, float]:
+        robots_url = f"{origin}/robots.txt"
+        try:
+            host_limiter.acquire(urlparse(origin).netloc)
+            resp = get_session().get(robots_url, timeout=REQUEST_TIMEOUT_SEC)
+            policy = {'status': resp.status_code, 'lines': resp.text.splitlines() if resp.status_code == 200 else []}
+            # A server error disallows scraping only until the next retry
+            ttl = self.error_ttl_sec if resp.status_code >= 500 else _ttl_from_headers(resp.headers, self.default_ttl_sec)
+        except Exception as e:
+            logger.warning(f"Error checking robots.txt for {robots_url}: {str(e)}")
+            policy = {'status': None, 'lines': []}
+            ttl = self.error_ttl_sec
+        policy['expires_at'] = time.time() + ttl
+        cache_data(f"robots_{origin}", policy, expire_hours=ttl / 3600)
+        return _build_parser(policy), policy['expires_at']
+
+    def _load(self, origin: str) -> Tuple[robotparser.RobotFileParser, float]:
+        """Policy from the disk cache if it is still valid, else from the network."""
+        stored = load_cache(f"robots_{origin}")
+        if stored is not None and stored.get('expires_at', 0) > time.time():
+            with self._lock:
+                self.disk_hits += 1
+            return _build_parser(stored), stored['expires_at']
+        with self._lock:
+            self.fetches += 1
+        return self._fetch(origin)
+
+    def _policy(self, origin: str) -> robotparser.RobotFileParser:
+        with self._lock:
+            cached = self._policies.get(origin)
+            if cached and cached[1] > time.time():
+                self.memory_hits += 1
+                return cached[0]
+            inflight = self._inflight.get(origin)
+            if inflight is None:
+                future = self._inflight[origin] = Future()
+            else:
+                self.coalesced += 1
+        if inflight is not None:
+            return inflight.result()
+
+        try:
+            entry = self._load(origin)
+            with self._lock:
+                self._policies[origin] = entry
+            future.set_result(entry[0])
+            return entry[0]
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(origin, None)
+
+    def allows(self, url: str, user_agent: str = USER_AGENT) -> bool:
+        """Check if robots.txt for the url's host allows fetching it."""
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc}".lower()
+        return self._policy(origin).can_fetch(user_agent, url)
+
+    def stats(self) -> Dict[str, int]:
+        """Fetch counters; 'saved' counts lookups answered without a new fetch."""
+        with self._lock:
+            return {
+                'fetches': self.fetches,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'coalesced': self.coalesced,
+                'saved': self.memory_hits + self.disk_hits + self.coalesced,
+                'hosts': len(self._policies)
+            }
+
+
+robots_cache = RobotsPolicyCache(ROBOTS_CACHE_TTL_HOURS * 3600, ROBOTS_ERROR_TTL_MINUTES * 60)
@@ -0,0 +1,183 @@
+"""
+Run-level memoization of ticker analyses.
+
+A run is fingerprinted by its inputs: the fetched price history (bar count,
+first/last bar and last close), the de-duplicated feed articles (canonical
+link, title and feed text) and the sentiment analyzer configuration
+(sentiment_analyzer.analyzer_fingerprint). The fingerprints, the result and
+each article's scored fields are kept in the disk cache after a run, so the
+next run of the same ticker can:
+
+  * return the previous result and its report files as they are when no
+    fingerprint changed, and
+  * otherwise enrich and score only the articles that are new or changed,
+    copying the stored scores of the others (when the analyzer is unchanged),
+    and extend the stored feature frame from the first day that new bars or
+    articles touch (features.update_features) instead of rebuilding it.
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.utils import logger, cache_data, load_cache, stable_digest, url_digest
+from src.sentiment_analyzer import analyzer_fingerprint
+from src.config import RUN_CACHE_HOURS
+
+# Article fields produced by enrichment and scoring, copied from a cached run
+SCORED_FIELDS = ('content', 'full_text', 'sentiment', 'sentiment_label', 'sentiment_confidence',
+                 'sentiment_keywords', 'vader_score', 'textblob_score', 'word_count', 'analysis_timestamp')
+# Result fields stored with a run; news and frames are rebuilt from the fetched inputs instead
+RESULT_FIELDS = ('timestamp', 'run_id', 'sentiment', 'saved_files')
+
+
+def price_fingerprint(history: Optional[pd.DataFrame]) -> str:
+    """Digest of the bars that identify a price history (empty string if there is none)."""
+    if history is None or history.empty:
+        return ''
+    last_close = history['Close'].iloc[-1] if 'Close' in history else None
+    return stable_digest(repr((len(history), str(history.index[0]), str(history.index[-1]), float(last_close))))
+
+
+def article_fingerprint(article: Dict[str, Any]) -> str:
+    """Digest of an article as fetched from the feed (before enrichment)."""
+    link = url_digest(article['link']) if article.get('link') else ''
+    return stable_digest(repr((link, article.get('title') or '', article.get('content') or '')))
+
+
+def article_key(article: Dict[str, Any]) -> str:
+    """Identity of an article that survives copies of its dict: its canonical link (or title)."""
+    if article.get('link'):
+        return url_digest(article['link'])
+    return f"title:{article.get('title') or ''}"
+
+
+def news_fingerprint(article_fps: List[str], news: List[Dict[str, Any]]) -> str:
+    """Digest of a fetched article set, cluster sizes included."""
+    return stable_digest(repr(sorted(zip(article_fps, (a.get('cluster_size', 1) for a in news)))))
+
+
+class RunFingerprints:
+    """
+    Input fingerprints of one ticker run; build it before enriching the articles.
+
+    The price fingerprint can be set later (price_fingerprint(history)) when
+    the news of a ticker arrives before its prices, as in batch runs. Article
+    fingerprints are looked up by article_key, so enriched or scored copies
+    of the fetched dicts still find theirs.
+    """
+
+    def __init__(self, news: List[Dict[str, Any]], history: Optional[pd.DataFrame] = None):
+        fps = [article_fingerprint(a) for a in news]
+        self.articles = {article_key(a): fp for a, fp in zip(news, fps)}
+        self.news = news_fingerprint(fps, news)
+        self.analyzer = analyzer_fingerprint()
+        self.price = price_fingerprint(history)
+
+    def of(self, article: Dict[str, Any]) -> Optional[str]:
+        return self.articles.get(article_key(article))
+
+
+class RunCache:
+    """Per-ticker cache entries of the last run, stored in the shared disk cache."""
+
+    def __init__(self, expire_hours: float = RUN_CACHE_HOURS):
+        self.expire_hours = expire_hours
+
+    @staticmethod
+    def _key(ticker: str, params: Tuple) -> str:
+        return f"run_{ticker.upper()}_{stable_digest(repr(params))[:16]}"
+
+    def get(self, ticker: str, params: Tuple) -> Optional[Dict[str, Any]]:
+        """The last run's entry for ticker with the same parameters, if any."""
+        return load_cache(self._key(ticker, params))
+
+    def save(self, ticker: str, params: Tuple, fingerprints: RunFingerprints, result: Dict[str, Any]) -> None:
+        """Store a finished run; failed runs are not cached."""
+        if result.get('error'):
+            return
+        scores, clusters = {}, {}
+        for article in result.get('news') or []:
+            fp = fingerprints.of(article)
+            if fp is not None:
+                scores[fp] = {f: article[f] for f in SCORED_FIELDS if f in article}
+                clusters[fp] = article.get('cluster_size', 1)
+        features = result.get('features')
+        entry = {
+            'price': fingerprints.price,
+            'news': fingerprints.news,
+            'analyzer': fingerprints.analyzer,
+            'result': {f: result.get(f) for f in RESULT_FIELDS},
+            'scores': scores,
+            'clusters': clusters,
+            'features': features if isinstance(features, pd.DataFrame) and not features.empty else None
+        }
+        cache_data(self._key(ticker, params), entry, expire_hours=self.expire_hours)
+
+    @staticmethod
+    def unchanged(entry: Optional[Dict[str, Any]], fingerprints: RunFingerprints) -> bool:
+        """True if the cached run had the same inputs (see missing_files for its reports)."""
+        if not entry:
+            return False
+        return (entry['price'], entry['news'], entry['analyzer']) == (
+            fingerprints.price, fingerprints.news, fingerprints.analyzer)
+
+    @staticmethod
+    def missing_files(entry: Dict[str, Any]) -> List[str]:
+        """Report files of the cached run that were pruned or deleted since."""
+        return [p for p in entry['result'].get('saved_files') or [] if not Path(p).exists()]
+
+    @staticmethod
+    def split(entry: Optional[Dict[str, Any]], fingerprints: RunFingerprints,
+              news: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Split fetched articles into (reused, fresh).
+
+        Reused articles get the cached run's enrichment and scores copied in;
+        fresh ones still need enriching and scoring. Everything is fresh when
+        the analyzer configuration changed.
+        """
+        if not entry or entry['analyzer'] != fingerprints.analyzer:
+            return [], list(news)
+        reused, fresh = [], []
+        for article in news:
+            scored = entry['scores'].get(fingerprints.of(article))
+            if scored is None:
+                fresh.append(article)
+            else:
+                article.update(scored)
+                reused.append(article)
+        if reused:
+            logger.info(f"Reusing scores of {len(reused)} unchanged articles, scoring {len(fresh)}")
+        return reused, fresh
+
+    @staticmethod
+    def stored_features(entry: Optional[Dict[str, Any]], fingerprints: Optional[RunFingerprints],
+                        news: List[Dict[str, Any]]) -> Tuple[Optional[pd.DataFrame], Optional[pd.Timestamp]]:
+        """
+        The cached run's feature frame and the first day update_features must recompute.
+
+        That day is the publish date of the earliest article that is new or
+        whose cluster size changed (None when only bars were added). Returns
+        (None, None) when there is no stored frame or the analyzer changed,
+        because every stored sentiment value would then be stale.
+        """
+        if not entry or fingerprints is None or entry.get('features') is None \
+                or entry['analyzer'] != fingerprints.analyzer:
+            return None, None
+        since = None
+        clusters = entry.get('clusters') or {}
+        for article in news:
+            fp = fingerprints.of(article)
+            if fp in clusters and clusters[fp] == article.get('cluster_size', 1):
+                continue
+            date = pd.to_datetime(article.get('date'), errors='coerce')
+            if pd.isna(date):
+                # An undated article is placed at analysis time, i.e. the newest rows
+                continue
+            date = (date.tz_localize(None) if date.tzinfo else date).normalize()
+            since = date if since is None else min(since, date)
+        return entry['features'], since
+
+
+run_cache = RunCache()
@@ -1,22 +1,91 @@
 import re
-from typing import List, Dict, Any, Tuple
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Dict, Any, Tuple, Optional, Sequence, Iterable
+import numpy as np
+import pandas as pd
 import nltk
-from nltk.sentiment import SentimentIntensityAnalyzer
-from textblob import TextBlob
 from datetime import datetime
 from pathlib import Path
-from src.news_processor import scrape_article_content
-from src.utils import handle_errors, logger
-from src.config import MIN_WORDS_FOR_ANALYSIS
+from src.utils import handle_errors, logger, stable_digest
+from src.lexicon import PhraseMatcher, load_lexicon
+from src.config import MIN_WORDS_FOR_ANALYSIS, SENTIMENT_LEXICON_PATH, SENTIMENT_BACKENDS
 
-# Download required NLTK data
-nltk.download('vader_lexicon', quiet=True)
-nltk.download('punkt', quiet=True)
-nltk.download('stopwords', quiet=True)
+# NLTK resources used by the analyzer: download id -> nltk.data path
+NLTK_RESOURCES = {
+    'vader_lexicon': 'sentiment/vader_lexicon.zip',
+    'stopwords': 'corpora/stopwords'
+}
+
+# Scorer backends that can be enabled per analyzer. Only VADER and the keyword
+# lexicon feed the compound score; TextBlob polarity is informational.
+SCORER_BACKENDS = ('vader', 'textblob', 'keywords')
+
+# Compound score thresholds for the sentiment labels (shared with the aggregate metrics)
+STRONG_THRESHOLD = 0.15
+WEAK_THRESHOLD = 0.05
+SENTIMENT_LABELS = ('strongly_negative', 'negative', 'neutral', 'positive', 'strongly_positive')
+
+# Bump whenever a change to the scoring code alters scores, so cached runs are rescored
+ANALYZER_VERSION = 2
+
+# Text cleanup applied before scoring, in order
+_HTML_RE = re.compile(r'<[^>]+>')
+_URL_RE = re.compile(r'https?://\S+|www\.\S+')
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_SPACE_RE = re.compile(r'\s+')
+
+_nltk_ready = set()
+_analyzer: Optional['SentimentAnalyzer'] = None
+_analyzer_lock = threading.Lock()
+
+def ensure_nltk_data(packages: Iterable[str] = tuple(NLTK_RESOURCES)) -> None:
+    """Download missing NLTK resources; a no-op once they are known to be present."""
+    for package in packages:
+        if package in _nltk_ready:
+            continue
+        try:
+            nltk.data.find(NLTK_RESOURCES[package])
+        except LookupError:
+            logger.info(f"Downloading NLTK resource: {package}")
+            nltk.download(package, quiet=True)
+        _nltk_ready.add(package)
+
+def sentiment_label_index(scores: Sequence[float]) -> np.ndarray:
+    """
+    Map compound scores to indices into SENTIMENT_LABELS in one vectorized pass.
+
+    Matches analyze_sentiment: >= 0.15 strongly positive, >= 0.05 positive,
+    <= -0.15 strongly negative, <= -0.05 negative, otherwise neutral.
+    """
+    scores = np.asarray(scores, dtype=float)
+    return (np.digitize(scores, [-STRONG_THRESHOLD, -WEAK_THRESHOLD], right=True)
+            + np.digitize(scores, [WEAK_THRESHOLD, STRONG_THRESHOLD]))
 
 class SentimentAnalyzer:
-    def __init__(self):
-        self.sid = SentimentIntensityAnalyzer()
+    def __init__(self, lexicon_path: Optional[str] = SENTIMENT_LEXICON_PATH,
+                 backends: Optional[Sequence[str]] = None):
+        self.backends = tuple(SENTIMENT_BACKENDS if backends is None else backends)
+        unknown = set(self.backends) - set(SCORER_BACKENDS)
+        if unknown:
+            raise ValueError(f"Unknown sentiment backends: {sorted(unknown)}")
+
+        # Backends are imported only when enabled; disabled ones cost nothing
+        ensure_nltk_data(['stopwords'] + (['vader_lexicon'] if 'vader' in self.backends else []))
+        self.sid = None
+        if 'vader' in self.backends:
+            from nltk.sentiment import SentimentIntensityAnalyzer
+            self.sid = SentimentIntensityAnalyzer()
+        self._textblob = None
+        if 'textblob' in self.backends:
+            from textblob import TextBlob
+            self._textblob = TextBlob
+
+        # Cumulative wall time per pipeline stage: stage -> [documents, seconds]
+        self._timings = {stage: [0, 0.0] for stage in ('preprocess',) + self.backends}
+        self._timings_lock = threading.Lock()
+
         self.stopwords = set(nltk.corpus.stopwords.words('english'))
         
         # Enhanced sentiment keywords with weights
@@ -45,22 +114,70 @@ class SentimentAnalyzer:
             'downturn': -1.2, 'recession': -1.3, 'bankrupt': -2.0, 'default': -1.8,
             'overvalued': -1.1, 'bubble': -1.4, 'correction': -1.2, 'volatility': -0.8
         }
+
+        # Stopwords and words of two characters or less, as whole tokens
+        stopword_alternation = '|'.join(re.escape(w) for w in sorted(self.stopwords, key=len, reverse=True))
+        self._stopword_re = re.compile(rf'(?<!\S)(?:{stopword_alternation}|\S{{1,2}})(?!\S)')
+
+        # Custom weighted phrases override the built-in ones; all are cleaned
+        # like the text they are matched against
+        self.custom_phrases = load_lexicon(lexicon_path) if lexicon_path else {}
+        self.matcher = PhraseMatcher({**self.positive_phrases, **self.negative_phrases, **self.custom_phrases},
+                                     normalize=self._preprocess_text)
+        self.phrase_weights = np.array([self.matcher.weights[p] for p in self.matcher.phrases], dtype=float)
     
+    @contextmanager
+    def _timed(self, stage: str, documents: int = 1):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._timings_lock:
+                self._timings[stage][0] += documents
+                self._timings[stage][1] += elapsed
+
+    def get_timings(self) -> Dict[str, Dict[str, float]]:
+        """Cumulative time spent in preprocessing and each enabled backend."""
+        with self._timings_lock:
+            return {
+                stage: {
+                    'documents': documents,
+                    'seconds': seconds,
+                    'ms_per_document': 1000 * seconds / documents if documents else 0.0
+                }
+                for stage, (documents, seconds) in self._timings.items()
+            }
+
+    def reset_timings(self) -> None:
+        with self._timings_lock:
+            for timing in self._timings.values():
+                timing[0], timing[1] = 0, 0.0
+
     def _preprocess_text(self, text: str) -> str:
         """Clean and preprocess text for sentiment analysis."""
         if not text:
             return ""
             
         # Remove HTML tags, URLs, and special characters
-        text = re.sub(r'<[^>]+>', '', text)
-        text = re.sub(r'https?://\S+|www\.\S+', '', text)
-        text = re.sub(r'[^\w\s]', ' ', text)
-        text = re.sub(r'\s+', ' ', text).strip().lower()
+        text = _HTML_RE.sub('', text)
+        text = _URL_RE.sub('', text)
+        text = _PUNCT_RE.sub(' ', text)
+        text = _SPACE_RE.sub(' ', text).strip().lower()
         
         # Remove stopwords and short words
-        words = [word for word in text.split() 
-                if word not in self.stopwords and len(word) > 2]
-        return ' '.join(words)
+        text = self._stopword_re.sub('', text)
+        return _SPACE_RE.sub(' ', text).strip()
+
+    def _preprocess_series(self, texts: pd.Series) -> pd.Series:
+        """Vectorized _preprocess_text(text.lower()) over a Series of strings."""
+        return (texts.str.lower()
+                .str.replace(_HTML_RE, '', regex=True)
+                .str.replace(_URL_RE, '', regex=True)
+                .str.replace(_PUNCT_RE, ' ', regex=True)
+                .str.replace(_SPACE_RE, ' ', regex=True).str.strip().str.lower()
+                .str.replace(self._stopword_re, '', regex=True)
+                .str.replace(_SPACE_RE, ' ', regex=True).str.strip())
     
     def _is_meaningful_text(self, text: str) -> bool:
         """Check if text has enough meaningful content for analysis."""
@@ -88,28 +205,31 @@ class SentimentAnalyzer:
             }
         
         # Clean and preprocess text
-        cleaned_text = self._preprocess_text(text.lower())
-        words = cleaned_text.split()
-        
-        # Initialize scores
-        keyword_score = 0
-        matched_keywords = []
+        with self._timed('preprocess'):
+            cleaned_text = self._preprocess_text(text.lower())
+            words = cleaned_text.split()
         
-        # Check for positive and negative phrases
-        for phrase, weight in {**self.positive_phrases, **self.negative_phrases}.items():
-            if phrase in cleaned_text:
-                keyword_score += weight
-                matched_keywords.append(phrase)
+        # Check for positive and negative phrases (whole words, one pass)
+        matched_keywords, keyword_score = [], 0
+        if 'keywords' in self.backends:
+            with self._timed('keywords'):
+                matched_keywords, keyword_score = self.matcher.match(cleaned_text)
         
         # Get VADER sentiment
-        vader_scores = self.sid.polarity_scores(cleaned_text)
+        vader_score = None
+        if self.sid is not None:
+            with self._timed('vader'):
+                vader_score = self.sid.polarity_scores(cleaned_text)['compound']
         
-        # Get TextBlob sentiment
-        blob = TextBlob(cleaned_text)
+        # Get TextBlob sentiment (informational only, not part of the compound score)
+        textblob_score = None
+        if self._textblob is not None:
+            with self._timed('textblob'):
+                textblob_score = self._textblob(cleaned_text).sentiment.polarity
         
         # Combine scores with emphasis on keywords
         keyword_weight = min(1.0, len(matched_keywords) * 0.2)  # Cap keyword influence
-        base_score = vader_scores['compound'] * (1 - keyword_weight)
+        base_score = (vader_score or 0.0) * (1 - keyword_weight)
         adjusted_score = base_score + (keyword_score * 0.1 * keyword_weight)
         
         # Normalize to [-1, 1] range
@@ -121,13 +241,13 @@ class SentimentAnalyzer:
         confidence = max(0.1, (length_confidence + keyword_confidence) / 2)
         
         # Determine sentiment
-        if compound_score >= 0.15:
+        if compound_score >= STRONG_THRESHOLD:
             sentiment = 'strongly_positive'
-        elif compound_score >= 0.05:
+        elif compound_score >= WEAK_THRESHOLD:
             sentiment = 'positive'
-        elif compound_score <= -0.15:
+        elif compound_score <= -STRONG_THRESHOLD:
             sentiment = 'strongly_negative'
-        elif compound_score <= -0.05:
+        elif compound_score <= -WEAK_THRESHOLD:
             sentiment = 'negative'
         else:
             sentiment = 'neutral'
@@ -137,44 +257,174 @@ class SentimentAnalyzer:
             'sentiment': sentiment,
             'confidence': confidence,
             'keywords_found': matched_keywords,
-            'vader_score': vader_scores['compound'],
-            'textblob_score': blob.sentiment.polarity,
+            'vader_score': vader_score,
+            'textblob_score': textblob_score,
             'word_count': len(words)
         }
 
+    def analyze_batch(self, texts: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Score many texts at once; results match analyze_sentiment exactly.
+
+        Preprocessing runs as pandas string operations over the whole batch,
+        keyword hits form a scipy.sparse CSR document-term matrix that is
+        multiplied by the phrase weight vector, and the score combination,
+        confidence and labeling run as NumPy array math. VADER still scores
+        one text at a time, but each distinct text only once.
+
+        Args:
+            texts: The texts to analyze
+
+        Returns:
+            List of result dicts, one per input text, in input order
+        """
+        texts = list(texts)
+        results: List[Dict[str, Any]] = [
+            {'compound': 0.0, 'sentiment': 'neutral', 'confidence': 0.0, 'keywords_found': []}
+            for _ in texts
+        ]
+        valid = [i for i, t in enumerate(texts) if t and isinstance(t, str) and len(t.strip()) >= 10]
+        if not valid:
+            return results
+
+        n = len(valid)
+        with self._timed('preprocess', n):
+            series = self._preprocess_series(pd.Series([texts[i] for i in valid], dtype=object))
+            word_counts = series.str.split().str.len().to_numpy(dtype=np.int64)
+            cleaned = series.tolist()
+
+        # Sparse document-term matrix of keyword hits times the phrase weights
+        hits = [[] for _ in cleaned]
+        hit_counts = np.zeros(n, dtype=np.int64)
+        keyword_scores = np.zeros(n)
+        if 'keywords' in self.backends:
+            with self._timed('keywords', n):
+                matrix, hits = self.matcher.document_term_matrix(cleaned)
+                hit_counts = np.diff(matrix.indptr)
+                keyword_scores = matrix @ self.phrase_weights
+
+        # VADER has no vectorized form; score each distinct text once, since
+        # syndicated headlines repeat across a batch
+        vader = None
+        if self.sid is not None:
+            with self._timed('vader', n):
+                polarity = {c: self.sid.polarity_scores(c)['compound'] for c in dict.fromkeys(cleaned)}
+                vader = np.array([polarity[c] for c in cleaned], dtype=float)
+        textblob = None
+        if self._textblob is not None:
+            with self._timed('textblob', n):
+                textblob = [self._textblob(c).sentiment.polarity for c in cleaned]
+
+        # Combine scores with emphasis on keywords (same formula as analyze_sentiment)
+        keyword_weight = np.minimum(1.0, hit_counts * 0.2)
+        base_score = (vader if vader is not None else np.zeros(n)) * (1 - keyword_weight)
+        adjusted = base_score + (keyword_scores * 0.1 * keyword_weight)
+        compound = np.maximum(-1.0, np.minimum(1.0, adjusted))
+
+        length_confidence = np.minimum(1.0, word_counts / 50.0)
+        keyword_confidence = np.minimum(1.0, hit_counts * 0.3)
+        confidence = np.maximum(0.1, (length_confidence + keyword_confidence) / 2)
+        labels = sentiment_label_index(compound)
+
+        for k, i in enumerate(valid):
+            results[i] = {
+                'compound': float(compound[k]),
+                'sentiment': SENTIMENT_LABELS[labels[k]],
+                'confidence': float(confidence[k]),
+                'keywords_found': [self.matcher.phrases[j] for j in hits[k]],
+                'vader_score': float(vader[k]) if vader is not None else None,
+                'textblob_score': textblob[k] if textblob is not None else None,
+                'word_count': int(word_counts[k])
+            }
+        return results
+
+def get_analyzer() -> SentimentAnalyzer:
+    """
+    Return the process-wide SentimentAnalyzer, creating it on first use.
+
+    Loading the VADER lexicon and stopword corpus is the expensive part of
+    constructing an analyzer, so every caller (and thread) shares one
+    instance; scoring only reads from it.
+    """
+    global _analyzer
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                _analyzer = SentimentAnalyzer()
+    return _analyzer
+
+def warm_up() -> SentimentAnalyzer:
+    """Load NLTK resources and the shared analyzer now instead of on the first article."""
+    analyzer = get_analyzer()
+    analyzer.analyze_sentiment("Warm-up text so lazily initialized scorers load their data.")
+    return analyzer
+
+def analyzer_fingerprint(lexicon_path: Optional[str] = SENTIMENT_LEXICON_PATH,
+                         backends: Optional[Sequence[str]] = None) -> str:
+    """
+    Digest of everything that determines an article's score: the code version,
+    enabled backends, label thresholds and the custom lexicon file's contents.
+
+    Cheap to compute (the analyzer itself is not loaded), so run caches can
+    check it before deciding whether stored scores are still valid.
+    """
+    lexicon = ''
+    if lexicon_path:
+        try:
+            lexicon = stable_digest(Path(lexicon_path).read_text(encoding='utf-8'))
+        except OSError:
+            lexicon = 'missing'
+    backends = tuple(SENTIMENT_BACKENDS if backends is None else backends)
+    return stable_digest(repr((ANALYZER_VERSION, backends, STRONG_THRESHOLD, WEAK_THRESHOLD,
+                               MIN_WORDS_FOR_ANALYSIS, lexicon)))
+
+def _optional_float(value: Any) -> Optional[float]:
+    """float(value), keeping None for scores of disabled backends."""
+    return None if value is None else float(value)
+
 def batch_analyze(articles: List[Dict]) -> List[Dict]:
     if not articles:
         return []
         
-    analyzer = SentimentAnalyzer()
-    updated = []
+    analyzer = get_analyzer()
+    to_score = []
+    contents = []
     
     for article in articles:
         if not article or not isinstance(article, dict):
             continue
             
+        # Get content from article, fallback to title if content is not available
+        content = article.get('content', '')
+        if not content and 'title' in article:
+            content = article['title']
+        
+        if not content:
+            continue
+        to_score.append(article)
+        contents.append(content)
+    
+    try:
+        # Analyze all article contents in one vectorized pass
+        scores = analyzer.analyze_batch(contents)
+    except Exception as e:
+        logger.error(f"Error in batch sentiment scoring, falling back to per-article: {e}")
+        scores = [analyzer.analyze_sentiment(c) for c in contents]
+    
+    updated = []
+    timestamp = datetime.now().isoformat()
+    for article, sentiment in zip(to_score, scores):
         try:
-            # Get content from article, fallback to title if content is not available
-            content = article.get('content', '')
-            if not content and 'title' in article:
-                content = article['title']
-            
-            if not content:
-                continue
-                
-            # Analyze the article content
-            sentiment = analyzer.analyze_sentiment(content)
-            
             # Add detailed sentiment data to article
             article.update({
                 'sentiment': float(sentiment['compound']),
                 'sentiment_label': sentiment['sentiment'],
                 'sentiment_confidence': float(sentiment['confidence']),
                 'sentiment_keywords': sentiment.get('keywords_found', []),
-                'vader_score': float(sentiment.get('vader_score', 0)),
-                'textblob_score': float(sentiment.get('textblob_score', 0)),
+                'vader_score': _optional_float(sentiment.get('vader_score', 0)),
+                'textblob_score': _optional_float(sentiment.get('textblob_score', 0)),
                 'word_count': int(sentiment.get('word_count', 0)),
-                'analysis_timestamp': datetime.now().isoformat()
+                'analysis_timestamp': timestamp
             })
             
             updated.append(article)
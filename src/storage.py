@@ -0,0 +1,281 @@
+"""
+Partitioned, typed result dataset.
+
+Every analysis run is appended as Parquet files to a hive-partitioned
+dataset under DATASET_DIR, partitioned by ticker and run year, with the
+run date as a column:
+
+    runs/ticker=AAPL/year=2024/<run_id>.parquet      one row per run
+    articles/ticker=AAPL/year=2024/<run_id>.parquet  one row per scored article
+
+Per-run files are merged into one file per partition once the year is over
+or once more than DATASET_MAX_PARTITION_FILES have piled up, so reading a
+ticker's year opens a handful of files rather than one per run (per-file
+overhead, not row count, dominates reads of small result tables). A
+compacted partition is built in a hidden directory and swapped in, so
+readers never see a partly merged partition. Each table has a fixed Arrow schema, so files from runs
+with missing parts (no news, no prices) still read back as one consistent
+frame. Reads go through pyarrow.dataset: filters on ticker and run date
+prune whole partition directories before any file is opened, and further
+filters on columns are pushed down to the Parquet reader, so loading a year
+of results for a watchlist does not re-parse the per-run CSV/JSON reports.
+"""
+import os
+import shutil
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.utils import logger
+from src.config import DATASET_DIR, DATASET_MAX_PARTITION_FILES
+from src.sentiment_analyzer import SENTIMENT_LABELS
+
+PARTITION_FIELDS = [pa.field('ticker', pa.string()), pa.field('year', pa.int32())]
+
+# sentiment metric -> runs column
+_METRIC_COLUMNS = {
+    'average': 'sentiment_average',
+    'weighted_average': 'sentiment_weighted_average',
+    'confidence_weighted_average': 'sentiment_confidence_weighted_average',
+    'median': 'sentiment_median',
+    'std': 'sentiment_std',
+    'count': 'story_count',
+    'article_count': 'article_count',
+    'full_text_count': 'full_text_count',
+    **{label: f"{label}_count" for label in SENTIMENT_LABELS}
+}
+
+TABLE_SCHEMAS: Dict[str, pa.Schema] = {
+    'runs': pa.schema(
+        [pa.field('run_id', pa.string()),
+         pa.field('date', pa.date32()),
+         pa.field('timestamp', pa.timestamp('us')),
+         pa.field('price_data_points', pa.int64()),
+         pa.field('first_bar', pa.timestamp('us')),
+         pa.field('last_bar', pa.timestamp('us')),
+         pa.field('last_close', pa.float64()),
+         pa.field('news_articles_analyzed', pa.int64())]
+        + [pa.field(column, pa.float64() if column.startswith('sentiment_') else pa.int64())
+           for column in _METRIC_COLUMNS.values()]
+        + [pa.field('keywords', pa.list_(pa.string())),
+           pa.field('error', pa.string())]
+    ),
+    'articles': pa.schema([
+        pa.field('run_id', pa.string()),
+        pa.field('date', pa.date32()),
+        pa.field('published', pa.timestamp('us')),
+        pa.field('title', pa.string()),
+        pa.field('link', pa.string()),
+        pa.field('source', pa.string()),
+        pa.field('sentiment', pa.float64()),
+        pa.field('sentiment_label', pa.string()),
+        pa.field('sentiment_confidence', pa.float64()),
+        pa.field('cluster_size', pa.int64()),
+        pa.field('full_text', pa.bool_())
+    ])
+}
+
+
+def _utc_naive(values) -> pd.Series:
+    """Timestamps as timezone-naive UTC; naive inputs are UTC already (unparseable values become NaT)."""
+    return pd.to_datetime(pd.Series(values, dtype=object), errors='coerce', utc=True).dt.tz_localize(None)
+
+
+def _local_to_utc_naive(value) -> Optional[pd.Timestamp]:
+    """A timestamp as timezone-naive UTC, reading a naive value as local time (datetime.now())."""
+    ts = pd.to_datetime(value, errors='coerce')
+    if pd.isna(ts):
+        return None
+    # astimezone() treats a naive datetime as local time, DST included
+    return pd.Timestamp(ts.to_pydatetime().astimezone(timezone.utc)).tz_localize(None)
+
+
+def run_row(result: Dict[str, Any], run_id: str) -> pd.DataFrame:
+    """One-row 'runs' frame summarizing an aggregate_analysis result."""
+    history = result.get('price_history')
+    has_prices = history is not None and not history.empty
+    sentiment = result.get('sentiment') or {}
+    row = {
+        'run_id': run_id,
+        'timestamp': _local_to_utc_naive(result.get('timestamp')),
+        'price_data_points': len(history) if has_prices else 0,
+        'first_bar': pd.Timestamp(history.index[0]).tz_localize(None) if has_prices else None,
+        'last_bar': pd.Timestamp(history.index[-1]).tz_localize(None) if has_prices else None,
+        'last_close': float(history['Close'].iloc[-1]) if has_prices and 'Close' in history else None,
+        'news_articles_analyzed': len(result.get('news') or []),
+        'keywords': list(sentiment.get('keywords') or []),
+        'error': result.get('error')
+    }
+    row.update({column: sentiment.get(metric) for metric, column in _METRIC_COLUMNS.items()})
+    return pd.DataFrame([row])
+
+
+def article_rows(news: List[Dict[str, Any]], run_id: str) -> pd.DataFrame:
+    """'articles' frame with one row per analyzed article."""
+    frame = pd.DataFrame({
+        'run_id': run_id,
+        'published': _utc_naive([a.get('date') for a in news]),
+        'title': [a.get('title') for a in news],
+        'link': [a.get('link') for a in news],
+        'source': [a.get('source') for a in news],
+        'sentiment': [a.get('sentiment') for a in news],
+        'sentiment_label': [a.get('sentiment_label') for a in news],
+        'sentiment_confidence': [a.get('sentiment_confidence') for a in news],
+        'cluster_size': [a.get('cluster_size', 1) for a in news],
+        'full_text': [bool(a.get('full_text')) for a in news]
+    })
+    return frame
+
+
+def _write_atomic(table: pa.Table, path: Path) -> None:
+    # Readers skip '_'-prefixed files, so a partly written file is never listed
+    tmp = path.parent / f"_{path.name}.tmp"
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+
+
+class ResultStore:
+    """Hive-partitioned (ticker/year) Parquet dataset of analysis runs."""
+
+    def __init__(self, root: Union[str, Path], max_partition_files: int = DATASET_MAX_PARTITION_FILES):
+        self.root = Path(root)
+        self.max_partition_files = max_partition_files
+
+    def _ticker_dir(self, table: str, ticker: str) -> Path:
+        return self.root / table / f"ticker={quote(ticker.upper(), safe='')}"
+
+    def write(self, table: str, ticker: str, day: date, run_id: str, frame: pd.DataFrame) -> Path:
+        """Atomically write one run's rows of table into its ticker/year partition."""
+        path = self._ticker_dir(table, ticker) / f"year={day.year}" / f"{run_id}.parquet"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        frame = frame.assign(date=day)
+        data = pa.Table.from_pandas(frame, schema=TABLE_SCHEMAS[table], preserve_index=False)
+        _write_atomic(data, path)
+        return path
+
+    def append_run(self, result: Dict[str, Any], run_id: str) -> List[Path]:
+        """
+        Append an aggregate_analysis result to the 'runs' and 'articles' tables.
+
+        Earlier years of the ticker are then compacted into one file each, as
+        is the current year once it holds more than max_partition_files files.
+        """
+        ticker = result['ticker']
+        day = pd.Timestamp(result.get('timestamp') or datetime.now()).date()
+        frames = {'runs': run_row(result, run_id)}
+        if result.get('news'):
+            frames['articles'] = article_rows(result['news'], run_id)
+        paths = []
+        for table, frame in frames.items():
+            path = self.write(table, ticker, day, run_id, frame)
+            for partition in path.parent.parent.glob('year=*'):
+                if partition != path.parent or self._file_count(partition) > self.max_partition_files:
+                    self._compact_partition(table, partition)
+            paths.append(path)
+        return paths
+
+    def dataset(self, table: str) -> ds.Dataset:
+        """The table as a pyarrow dataset, partition columns included."""
+        schema = TABLE_SCHEMAS[table]
+        for field in PARTITION_FIELDS:
+            schema = schema.append(field)
+        return ds.dataset(self.root / table, schema=schema, format='parquet',
+                          partitioning=ds.partitioning(pa.schema(PARTITION_FIELDS), flavor='hive'))
+
+    def load(self, table: str, tickers: Optional[Iterable[str]] = None,
+             start: Optional[Union[str, date]] = None, end: Optional[Union[str, date]] = None,
+             columns: Optional[List[str]] = None, where: Optional[ds.Expression] = None) -> pd.DataFrame:
+        """
+        Read rows of table, pruning partitions by ticker and run year.
+
+        Args:
+            table: 'runs' or 'articles'
+            tickers: Only these tickers (default: all)
+            start: First run date to include
+            end: Last run date to include
+            columns: Columns to read (default: all, partition columns included)
+            where: Extra pyarrow filter pushed down to the Parquet reader,
+                e.g. ds.field('sentiment') < -0.5
+
+        Returns:
+            DataFrame of matching rows (empty if the table has no files yet)
+        """
+        if not (self.root / table).exists():
+            return pd.DataFrame(columns=columns or TABLE_SCHEMAS[table].names + [f.name for f in PARTITION_FIELDS])
+        conditions = []
+        if tickers is not None:
+            conditions.append(ds.field('ticker').isin([t.upper() for t in tickers]))
+        if start is not None:
+            start = pd.Timestamp(start)
+            conditions += [ds.field('year') >= start.year, ds.field('date') >= start.date()]
+        if end is not None:
+            end = pd.Timestamp(end)
+            conditions += [ds.field('year') <= end.year, ds.field('date') <= end.date()]
+        if where is not None:
+            conditions.append(where)
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return self.dataset(table).to_table(columns=columns, filter=expression).to_pandas()
+
+    def latest_runs(self, tickers: Optional[Iterable[str]] = None, **kwargs) -> pd.DataFrame:
+        """The most recent 'runs' row per ticker, indexed by ticker."""
+        runs = self.load('runs', tickers, **kwargs)
+        if runs.empty:
+            return runs
+        return runs.sort_values('timestamp').groupby('ticker').tail(1).set_index('ticker').sort_index()
+
+    @staticmethod
+    def _file_count(partition: Path) -> int:
+        return sum(1 for _ in partition.glob('*.parquet'))
+
+    def _compact_partition(self, table: str, partition: Path) -> int:
+        """
+        Merge a partition's files into one.
+
+        The merged file is written into a hidden sibling directory (readers
+        skip '_'-prefixed paths) that then replaces the partition by rename,
+        so a reader lists either all the per-run files or the merged one,
+        never both or a mix (between the two renames, an instant, it finds
+        the partition empty). Files written while merging are carried over.
+        """
+        files = sorted(partition.glob('*.parquet'))
+        if len(files) < 2:
+            return 0
+        merged = pa.concat_tables(pq.read_table(f, schema=TABLE_SCHEMAS[table]) for f in files)
+        staged, retired = partition.parent / f"_{partition.name}.compact", partition.parent / f"_{partition.name}.old"
+        for leftover in (staged, retired):
+            shutil.rmtree(leftover, ignore_errors=True)
+        staged.mkdir()
+        pq.write_table(merged, staged / files[-1].name)
+        os.replace(partition, retired)
+        os.replace(staged, partition)
+        merged_names = {f.name for f in files}
+        for late in retired.glob('*.parquet'):
+            if late.name not in merged_names:
+                os.replace(late, partition / late.name)
+        shutil.rmtree(retired, ignore_errors=True)
+        return len(files) - 1
+
+    def compact(self, table: str, tickers: Optional[Iterable[str]] = None) -> int:
+        """
+        Merge the per-run files of every ticker/year partition into one file.
+
+        Returns:
+            int: Number of files removed
+        """
+        ticker_dirs = ([self._ticker_dir(table, t) for t in tickers] if tickers is not None
+                       else (self.root / table).glob('ticker=*'))
+        removed = sum(self._compact_partition(table, partition)
+                      for ticker_dir in ticker_dirs for partition in ticker_dir.glob('year=*'))
+        logger.info(f"Compacted {table}: removed {removed} files")
+        return removed
+
+
+result_store = ResultStore(DATASET_DIR)
@@ -1,28 +1,24 @@
 import os
 import datetime as dt
-import matplotlib.pyplot as plt
-import pandas as pd
-import numpy as np
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import Future
 from pathlib import Path
-import matplotlib.dates as mdates
-from matplotlib.ticker import MaxNLocator
 import sys
 import time
-import json
 
 from src.aggregator import aggregate_analysis
+from src.batch import batch_aggregate
+from src.render import renderer, price_chart_spec, sentiment_chart_spec
 from src.utils import (
     logger, 
     cleanup_company_reports,
-    save_plot,
-    save_dataframe
+    record_artifact,
+    list_recent_reports,
+    run_reports
 )
 from src.config import (
     REPORTS_DIR, 
-    PLOT_STYLE, 
-    PLOT_FIGSIZE,
-    PLOT_DPI
+    PLOT_PROFILE
 )
 
 def _ensure_reports_dir(ticker: str) -> Path:
@@ -44,131 +40,70 @@ def _ensure_reports_dir(ticker: str) -> Path:
         fallback_path = Path(REPORTS_DIR) if isinstance(REPORTS_DIR, str) else REPORTS_DIR
         return fallback_path / ticker.upper()  # Fallback path
 
-def _save_plot(fig, filename: str, ticker: str) -> Optional[Path]:
-    """Save a plot to the company's report directory."""
-    try:
-        # Ensure the directory exists
-        company_dir = _ensure_reports_dir(ticker)
-        
-        # Generate file path with timestamp to avoid overwriting
-        timestamp = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{ticker}_{filename}_{timestamp}.png"
-        filepath = company_dir / filename
-        
-        # Save the plot
-        fig.savefig(filepath, dpi=PLOT_DPI, bbox_inches='tight')
-        logger.info(f"Saved plot to {filepath}")
-        
-        # Save report as JSON
-        report_path = company_dir / f"{ticker}_report_{timestamp}.json"
-        with open(report_path, 'w') as f:
-            json.dump({'report': 'generated'}, f, indent=2)
-        logger.info(f"Saved report to {report_path}")
-        
-        # Save analysis results as CSV
-        if 'report_df' in locals() and report_df is not None:
-            csv_path = company_dir / f"{ticker}_analysis_{timestamp}.csv"
-            try:
-                report_df.to_csv(csv_path, index=False)
-                logger.info(f"Saved analysis to {csv_path}")
-            except Exception as e:
-                logger.error(f"Error saving analysis CSV: {e}")
-        
-        # Save any additional data as needed
-        if 'additional_data' in locals():
-            try:
-                data_path = company_dir / f"{ticker}_data_{timestamp}.json"
-                with open(data_path, 'w') as f:
-                    json.dump(additional_data, f, indent=2)
-            except Exception as e:
-                logger.error(f"Error saving additional data: {e}")
-        plt.close(fig)
-        return filepath
-    except Exception as e:
-        logger.error(f"Error saving plot {filename}: {e}", exc_info=True)
-        return None
+def _plot_path(ticker: str, name: str, run_id: Optional[str] = None) -> Path:
+    """PNG path in the company's report directory, stamped with the analysis run id (or now)."""
+    timestamp = run_id or dt.datetime.now().strftime("%Y%m%d_%H%M%S")
+    return _ensure_reports_dir(ticker) / f"{ticker}_{name}_{timestamp}.png"
 
-def generate_report(ticker: str, data: dict) -> dict:
-    """Generate and save analysis reports."""
-    # Initialize report
+def submit_report(ticker: str, data: dict, profile: str = PLOT_PROFILE) -> Tuple[dict, List[Future]]:
+    """
+    Queue the report charts for rendering without waiting for them.
+
+    Returns:
+        tuple: The report dict and one future per chart, each resolving to the
+            saved file path; finish_report() collects them into the report
+    """
     report = {
         'ticker': ticker,
         'timestamp': dt.datetime.now().strftime("%Y%m%d_%H%M%S"),
         'saved_files': []
     }
-    
+    futures = []
+    run_id = data.get('run_id')
     try:
-        # Ensure the reports directory exists
-        company_dir = _ensure_reports_dir(ticker)
-        
-        # NOTE: do not clean up here — cleanup should happen before analysis
-        # so files generated by the aggregator are not immediately deleted.
-        
-        # Create price chart
+        # NOTE: do not clean up here — cleanup runs right after analysis and
+        # keeps the latest run, whose charts are rendered here.
+
+        # A run reused from the run cache already has its charts
+        if data.get('reused') and run_id:
+            charts = run_reports(ticker, run_id, ('png',))
+            if charts:
+                report['saved_files'] = [str(p) for p in charts]
+                report['reused'] = True
+                return report, futures
+
+        # Price chart (the price data itself was already saved by the aggregator)
         if 'price_history' in data and not data['price_history'].empty:
-            # Create a figure with subplots
-            fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10), gridspec_kw={'height_ratios': [3, 1]})
-            
-            # Plot price data on the first subplot
-            data['price_history']['Close'].plot(ax=ax1, label='Close Price', color='tab:blue')
-            if 'MA50' in data['price_history'].columns:
-                data['price_history']['MA50'].plot(ax=ax1, label='50-day MA', color='tab:orange', linestyle='--')
-            
-            ax1.set_title(f"{ticker} Stock Price Analysis")
-            ax1.set_ylabel('Price ($)', color='tab:blue')
-            ax1.legend(loc='upper left')
-            ax1.grid(True, linestyle='--', alpha=0.7)
-            
-            # Add volume as a bar chart on the second subplot if available
-            if 'Volume' in data['price_history'].columns:
-                ax2.bar(data['price_history'].index, 
-                       data['price_history']['Volume'], 
-                       color='tab:green', 
-                       alpha=0.3)
-                ax2.set_ylabel('Volume', color='tab:green')
-                ax2.grid(True, linestyle='--', alpha=0.3)
-            
-            plt.tight_layout()
-            
-            # Save the combined plot
-            plot_path = _save_plot(fig, f"{ticker}_analysis", ticker)
-            if plot_path:
-                report['saved_files'].append(str(plot_path))
-            
-            # Save the price data as CSV
-            csv_path = save_dataframe(data['price_history'], f"{ticker}_price_data", ticker)
-            if csv_path:
-                report['saved_files'].append(str(csv_path))
-        
-        # Add sentiment analysis if available
+            spec = price_chart_spec(ticker, data['price_history'], data.get('features'))
+            futures.append(renderer.submit(spec, _plot_path(ticker, f"{ticker}_analysis", run_id), profile))
+
+        # Sentiment chart (per-article sentiment is already in the aggregator's news JSON)
         if 'sentiment_data' in data and not data['sentiment_data'].empty:
-            # Create sentiment plot
-            fig, ax = plt.subplots(figsize=(12, 4))
-            data['sentiment_data'].plot(ax=ax, kind='bar', color='tab:purple', alpha=0.7)
-            ax.set_title(f"{ticker} Sentiment Analysis")
-            ax.set_xlabel('Date')
-            ax.set_ylabel('Sentiment Score')
-            ax.grid(True, linestyle='--', alpha=0.3)
-            plt.tight_layout()
-            
-            # Save sentiment plot
-            sent_path = _save_plot(fig, f"{ticker}_sentiment", ticker)
-            if sent_path:
-                report['saved_files'].append(str(sent_path))
-            
-            # Save sentiment data as CSV
-            sent_csv_path = save_dataframe(data['sentiment_data'], f"{ticker}_sentiment_data", ticker)
-            if sent_csv_path:
-                report['saved_files'].append(str(sent_csv_path))
-        
-        logger.info(f"Generated {len(report['saved_files'])} report files for {ticker}")
-        
+            spec = sentiment_chart_spec(ticker, data['sentiment_data'])
+            futures.append(renderer.submit(spec, _plot_path(ticker, f"{ticker}_sentiment", run_id), profile))
     except Exception as e:
         logger.error(f"Error generating report for {ticker}: {e}", exc_info=True)
         report['error'] = str(e)
-    
+    return report, futures
+
+def finish_report(report: dict, futures: List[Future]) -> dict:
+    """Wait for a report's charts and record the saved files."""
+    for future in futures:
+        try:
+            path = future.result()
+            record_artifact(path, report['ticker'])
+            logger.info(f"Saved plot to {path}")
+            report['saved_files'].append(path)
+        except Exception as e:
+            logger.error(f"Error saving plot for {report['ticker']}: {e}", exc_info=True)
+            report['error'] = str(e)
+    logger.info(f"Generated {len(report['saved_files'])} report files for {report['ticker']}")
     return report
 
+def generate_report(ticker: str, data: dict, profile: str = PLOT_PROFILE) -> dict:
+    """Generate and save analysis reports."""
+    return finish_report(*submit_report(ticker, data, profile))
+
 def _print_header():
     """Print the application header."""
     print("""
@@ -186,14 +121,15 @@ def _print_help():
   help     - Show this help message
   exit/quit - Exit the application
   clear    - Clear the screen
-  list     - List recently analyzed stocks (coming soon)
+  list     - List recently analyzed stocks
 
 Examples:
   AAPL     - Analyze Apple Inc.
   MSFT     - Analyze Microsoft
   GOOGL    - Analyze Alphabet (Google)
   AMZN     - Analyze Amazon
-  TSLA     - Analyze Tesla\033[0m
+  TSLA     - Analyze Tesla
+  AAPL,MSFT,NVDA - Analyze several tickers in one batch\033[0m
 """)
 
 def _clear_screen():
@@ -201,10 +137,23 @@ def _clear_screen():
     import os
     os.system('cls' if os.name == 'nt' else 'clear')
 
+def _print_recent(limit: int = 20):
+    """Print the most recently analyzed tickers from the report catalog."""
+    recent = list_recent_reports(limit)
+    if not recent:
+        print("\n\033[1mNo analyzed stocks yet.\033[0m")
+        return
+    print("\n\033[1mRecently analyzed stocks:\033[0m")
+    print(f"  {'Ticker':<10}{'Last run':<22}{'Runs':>6}{'Files':>7}{'Size':>10}")
+    for entry in recent:
+        last_run = dt.datetime.fromtimestamp(entry['last_run']).strftime('%Y-%m-%d %H:%M:%S')
+        size = f"{(entry['bytes'] or 0) / 1024:.0f} KB"
+        print(f"  {entry['ticker']:<10}{last_run:<22}{entry['runs']:>6}{entry['files']:>7}{size:>10}")
+
 def _print_stock_info(ticker: str, result: dict):
     """Print stock information."""
-    stock_data = result.get('stock_data', {})
-    info = stock_data.get('info', {})
+    stock_data = result.get('stock_data') or {}
+    info = stock_data.get('info') or {}
     
     print(f"\n\033[1;34m{'='*50}\033[0m")
     print(f"\033[1;36m{'APEX ANALYSIS REPORT':^50}\033[0m")
@@ -221,7 +170,8 @@ def _print_stock_info(ticker: str, result: dict):
         print(f"\033[1mSector:\033[0m {info.get('sector', 'N/A')}")
         print(f"\033[1mIndustry:\033[0m {info.get('industry', 'N/A')}")
         print(f"\033[1mCurrent Price:\033[0m ${info.get('currentPrice', 'N/A')}")
-        print(f"\033[1mMarket Cap:\033[0m ${info.get('marketCap', 'N/A'):,}")
+        market_cap = info.get('marketCap')
+        print(f"\033[1mMarket Cap:\033[0m ${market_cap:,}" if isinstance(market_cap, (int, float)) else "\033[1mMarket Cap:\033[0m N/A")
     
     # Analysis results
     print("\n\033[1mAnalysis Results:\033[0m")
@@ -238,6 +188,52 @@ def _print_stock_info(ticker: str, result: dict):
     
     print("\n\033[1;34m" + "="*50 + "\033[0m\n")
 
+def _run_batch(tickers: List[str]):
+    """Analyze several tickers concurrently and save a report for each."""
+    from datetime import datetime
+
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+    print("\n\033[1;33m" + "="*50)
+    print(f"BATCH ANALYSIS OF {len(tickers)} TICKERS - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("="*50 + "\033[0m\n")
+
+    finished = []
+    def show_progress(ticker: str, stage: str, error: Optional[str]):
+        if error:
+            print(f"\033[1;31m  {ticker}: {stage} failed ({error})\033[0m")
+        elif stage == 'write':
+            finished.append(ticker)
+            print(f"  [{len(finished)}/{len(tickers)}] {ticker} analyzed")
+
+    results = batch_aggregate(tickers, progress=show_progress)
+
+    # Drop earlier runs' files; the run just analyzed (possibly reused, and
+    # then not necessarily the newest) is kept by its run id
+    for ticker in tickers:
+        try:
+            cleanup_company_reports(ticker, keep_runs=1, keep_run_ids=[(results.get(ticker) or {}).get('run_id')])
+        except Exception:
+            logger.exception(f'Failed to cleanup previous reports for {ticker}')
+
+    # Queue every ticker's charts first so they render in parallel
+    pending = {ticker: submit_report(ticker, result)
+               for ticker, result in results.items() if not result.get('error')}
+
+    print()
+    for ticker, result in results.items():
+        if result.get('error'):
+            print(f"\033[1;31m✗ {ticker}: {result['error']}\033[0m")
+            continue
+        sentiment = result.get('sentiment') or {}
+        average = sentiment.get('weighted_average', sentiment.get('average'))
+        summary = (f"avg sentiment {average:.3f} over {sentiment.get('article_count', sentiment.get('count', 0))} articles"
+                   if average is not None else "no news")
+        report = finish_report(*pending[ticker])
+        if report.get('error'):
+            print(f"\033[1;33m⚠ {ticker}: {summary}, could not save report\033[0m")
+        else:
+            print(f"\033[1;32m✓ {ticker}: {summary}, report saved\033[0m")
+
 def run_cli():
     """Run the command line interface."""
     from datetime import datetime
@@ -261,10 +257,18 @@ def run_cli():
                 _print_help()
                 continue
                 
+            if user_input.lower() == 'list':
+                _print_recent()
+                continue
+
             if user_input.lower() == 'clear':
                 _clear_screen()
                 _print_header()
                 continue
+
+            if ',' in user_input:
+                _run_batch(user_input.split(','))
+                continue
             
             ticker = user_input.upper()
             print("\n\033[1;33m" + "="*50)
@@ -279,14 +283,6 @@ def run_cli():
             spinner = itertools.cycle(['-', '/', '|', '\\'])
             start_time = time.time()
             
-            # Clean up any existing reports before starting analysis so new
-            # files generated by aggregate_analysis are not deleted later.
-            try:
-                cleanup_company_reports(ticker)
-            except Exception:
-                # If cleanup fails, continue — we'll still attempt analysis
-                logger.exception('Failed to cleanup previous reports')
-
             # Start analysis in a separate thread
             from threading import Thread
             
@@ -309,6 +305,14 @@ def run_cli():
             
             # Clear spinner
             sys.stdout.write("\r" + " "*50 + "\r")
+
+            # Drop earlier runs' files; the run just analyzed (possibly reused
+            # from the run cache) is kept by its run id along with its charts.
+            try:
+                cleanup_company_reports(ticker, keep_runs=1, keep_run_ids=[result.get('run_id')])
+            except Exception:
+                # If cleanup fails, continue — the new reports are already saved
+                logger.exception('Failed to cleanup previous reports')
             
             # Print results
             _print_stock_info(ticker, result)
@@ -333,6 +337,3 @@ def run_cli():
             logger.error(f"Error in main loop: {str(e)}", exc_info=True)
             print(f"\nAn error occurred: {str(e)}")
             print("Please try again or check the logs for more details.")
-            
-        finally:
-            plt.close('all')  # Ensure all plots are closed
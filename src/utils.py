@@ -5,21 +5,32 @@ import shutil
 from pathlib import Path
 from functools import wraps
 import pickle
+import base64
+import hashlib
+import re
 import requests
-from typing import Optional, Any, Dict, List
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from typing import Optional, Any, Dict, Iterable, List
 
-from src.config import REPORTS_DIR  # centralize reports dir in config
+from src.config import (  # centralize paths and cache settings in config
+    REPORTS_DIR,
+    CACHE_DIR,
+    CACHE_EXPIRY_DAYS,
+    CACHE_MAX_SIZE_MB,
+    REPORT_CATALOG_PATH
+)
+from src.cache import DiskCache
+from src.catalog import ReportCatalog
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Cache directory
-CACHE_DIR = Path('.cache')
+# Shared on-disk cache; CACHE_DIR and REPORTS_DIR are created by src.config
+_cache = DiskCache(CACHE_DIR, CACHE_MAX_SIZE_MB * 1024 * 1024)
 
-# Ensure directories exist
-# REPORTS_DIR is created by src.config; ensure cache exists here
-CACHE_DIR.mkdir(exist_ok=True, parents=True)
+# Index of the report files under REPORTS_DIR
+report_catalog = ReportCatalog(REPORT_CATALOG_PATH)
 
 def handle_errors(func):
     @wraps(func)
@@ -42,22 +53,120 @@ def clean_text(text: str) -> str:
     """Clean and normalize text by removing extra whitespace."""
     return ' '.join(str(text).split()).strip()
 
+# Query parameters that only carry campaign/referrer tracking and never change content
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'oc', 'ocid', 'cmpid',
+    'ncid', 'guccounter', 'guce_referrer', 'guce_referrer_sig', 'soc_src', 'soc_trk',
+    'taid', 'yptr', '.tsrc', 'ref', 'ref_src', 'src', 'smid', 'mod'
+}
+TRACKING_PREFIXES = ('utm_', 'mkt_', 'trk_')
+GOOGLE_NEWS_HOSTS = {'news.google.com', 'www.google.com', 'google.com'}
+_EMBEDDED_URL_RE = re.compile(rb'https?://[\x21-\x7e]+')
+
+def _decode_google_news_id(article_id: str) -> Optional[str]:
+    """Extract the publisher URL embedded in a Google News article id, if present."""
+    try:
+        raw = base64.urlsafe_b64decode(article_id + '=' * (-len(article_id) % 4))
+    except (ValueError, TypeError):
+        return None
+    match = _EMBEDDED_URL_RE.search(raw)
+    return match.group(0).decode('ascii') if match else None
+
+def resolve_news_link(url: str) -> str:
+    """Unwrap Google News/Google redirect links to the publisher URL when possible."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host not in GOOGLE_NEWS_HOSTS:
+        return url.strip()
+
+    if parts.path == '/url':
+        params = dict(parse_qsl(parts.query))
+        target = params.get('url') or params.get('q')
+        if target and target.startswith(('http://', 'https://')):
+            return resolve_news_link(target)
+
+    segments = [seg for seg in parts.path.split('/') if seg]
+    if 'articles' in segments and segments[-1] != 'articles':
+        decoded = _decode_google_news_id(segments[segments.index('articles') + 1])
+        if decoded:
+            return decoded
+    return url.strip()
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize an article URL so equivalent links compare equal.
+
+    Redirect wrappers are resolved, scheme and host are lowercased (with a
+    leading ``www.`` and default ports dropped), tracking parameters and
+    fragments are removed and the remaining query parameters are sorted.
+    """
+    parts = urlsplit(resolve_news_link(url))
+    scheme = 'https' if parts.scheme.lower() in ('http', 'https') else parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = parts.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/')
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+def stable_digest(value: str) -> str:
+    """Return a hex digest of value that is identical across processes and runs."""
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+def url_digest(url: str) -> str:
+    """Stable digest of the canonical form of url, suitable as a cache key."""
+    return stable_digest(canonicalize_url(url))
+
 def get_company_dir(ticker: str) -> Path:
     """Get or create a directory for a company's reports."""
     company_dir = Path(REPORTS_DIR) / ticker.upper()
     company_dir.mkdir(exist_ok=True, parents=True)
     return company_dir
 
-def cleanup_company_reports(ticker: str) -> None:
-    """Remove all existing report files for a company."""
+def record_artifact(path: Path, ticker: Optional[str] = None, run_id: Optional[str] = None) -> None:
+    """Add a written report file to the catalog (ticker defaults to its directory name)."""
+    try:
+        report_catalog.record(path, ticker or Path(path).parent.name, run_id)
+    except Exception as e:
+        logger.warning(f"Could not catalog {path}: {e}")
+
+def cleanup_company_reports(ticker: str, keep_runs: int = 0, keep_run_ids: Iterable[Optional[str]] = ()) -> None:
+    """
+    Remove a company's report files, keeping the keep_runs most recent runs
+    and the runs listed in keep_run_ids (e.g. one just reused from the run
+    cache, which need not be the newest).
+
+    The files to delete come from the report catalog, so this does not list
+    or stat the whole directory.
+    """
     company_dir = get_company_dir(ticker)
-    if company_dir.exists():
-        for file in company_dir.glob('*.*'):
-            try:
-                if file.is_file():
-                    file.unlink()
-            except Exception as e:
-                logger.error(f"Error deleting {file}: {e}")
+    report_catalog.ensure_scanned(ticker, company_dir)
+    removed = []
+    for file in report_catalog.files(ticker, keep_runs, keep_run_ids):
+        try:
+            file.unlink()
+            removed.append(file)
+        except FileNotFoundError:
+            removed.append(file)
+        except Exception as e:
+            logger.error(f"Error deleting {file}: {e}")
+    report_catalog.forget(removed)
+
+def run_reports(ticker: str, run_id: str, exts: tuple = ('csv', 'png', 'json')) -> List[Path]:
+    """Existing report files written by one run of ticker."""
+    report_catalog.ensure_scanned(ticker, get_company_dir(ticker))
+    return report_catalog.run_files(ticker, run_id, exts)
+
+def list_recent_reports(limit: int = 20) -> List[Dict[str, Any]]:
+    """Most recently analyzed tickers: last run time, number of runs and files."""
+    return report_catalog.recent(limit)
 
 def save_plot(fig, filename: str, ticker: str) -> Optional[Path]:
     """Save a matplotlib figure as PNG in the company's report directory."""
@@ -73,6 +182,7 @@ def save_plot(fig, filename: str, ticker: str) -> Optional[Path]:
         
         # Save the figure
         fig.savefig(filepath, bbox_inches='tight', dpi=300)
+        record_artifact(filepath, ticker)
         logger.info(f"Saved plot to {filepath}")
         return filepath
     except Exception as e:
@@ -93,42 +203,43 @@ def save_dataframe(df, filename: str, ticker: str) -> Optional[Path]:
         
         # Save the DataFrame
         df.to_csv(filepath, index=False)
+        record_artifact(filepath, ticker)
         logger.info(f"Saved data to {filepath}")
         return filepath
     except Exception as e:
         logger.error(f"Error saving DataFrame {filename}: {e}")
         return None
 
-def cache_data(key: str, data: Any, expire_hours: int = 24) -> None:
-    """
-    Cache data - DISABLED
-    This function is kept for API compatibility but doesn't cache anything.
-    """
-    # Completely disable caching
-    return
+def cache_data(key: str, data: Any, expire_hours: Optional[float] = CACHE_EXPIRY_DAYS * 24) -> None:
+    """Cache data on disk under key; pass expire_hours=None to keep it until evicted."""
+    try:
+        ttl = expire_hours * 3600 if expire_hours is not None else None
+        _cache.set(key, data, ttl_seconds=ttl)
+    except Exception as e:
+        logger.warning(f"Error caching {key}: {e}")
 
 def load_cache(key: str) -> Optional[Any]:
-    """Load data from cache - DISABLED"""
-    # Always return None to force fresh data
-    return None
+    """Load data from cache, returning None if the entry is missing or expired."""
+    try:
+        return _cache.get(key)
+    except Exception as e:
+        logger.warning(f"Error loading cache entry {key}: {e}")
+        return None
 
 def clear_all_cache() -> None:
-    """Clear all cached data - DISABLED"""
-    # No-op since caching is disabled
-    return
+    """Clear all cached data."""
+    _cache.clear()
+    logger.info(f"Cleared cache at {CACHE_DIR}")
+
+def get_cache_stats() -> Dict[str, int]:
+    """Return cache hit/miss/eviction counters and current size."""
+    return _cache.stats()
 
 def get_latest_report(ticker: str) -> Optional[Dict[str, Path]]:
     """Get the paths to the latest report files for a ticker."""
     company_dir = get_company_dir(ticker)
     if not company_dir.exists():
         return None
-        
-    report_files = {}
-    for ext in ['.csv', '.png', '.json']:
-        files = list(company_dir.glob(f'*{ext}'))
-        if files:
-            # Get the most recently modified file of this type
-            latest = max(files, key=lambda f: f.stat().st_mtime)
-            report_files[ext[1:]] = latest
-            
-    return report_files if report_files else None
\ No newline at end of file
+    report_catalog.ensure_scanned(ticker, company_dir)
+    report_files = report_catalog.latest(ticker)
+    return report_files if report_files else None
@@ -0,0 +1,90 @@
+"""
+Batch run artifacts: each report file is written once and cataloged, and
+peak memory stays close to the price frames themselves (no per-row dict copy
+of the history). Network fetches are replaced with generated data.
+
+Run with: python -m pytest test_artifacts.py
+(benchmarks/bench_artifacts.py reports the timings and memory at full size)
+"""
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import batch, ui, utils
+from src.catalog import ReportCatalog
+from src.storage import result_store
+from src.sentiment_analyzer import warm_up
+
+TICKERS = [f"ZZART{i}" for i in range(8)]
+YEARS = 20  # large enough that the frames, not fixed overhead, dominate peak memory
+# Artifacts expected per ticker: aggregator outputs plus the two report plots
+EXPECTED_ARTIFACTS = {'price_data.csv': 1, 'news.json': 1, 'summary.json': 1, 'analysis.png': 1, 'sentiment.png': 1}
+# Results keep the price frame plus the derived feature frame per ticker (about
+# 3x the price data); materializing per-row record dicts adds roughly 7x more.
+MAX_PEAK_TO_DATA_RATIO = 8.0
+
+
+def make_history(seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=252 * YEARS)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(days))))
+    return pd.DataFrame({
+        'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+        'Volume': rng.integers(1e5, 1e7, len(days)), 'Dividends': 0.0, 'Stock Splits': 0.0
+    }, index=days)
+
+
+def make_news(ticker: str, num_articles: int):
+    now = pd.Timestamp.now()
+    return [{'title': f"{ticker} story {i}: shares {'surge' if i % 2 else 'slump'} after update {i * 7919}",
+             'link': f"https://example.com/{ticker}/{i}", 'date': now - pd.Timedelta(days=i), 'source': 'Example'}
+            for i in range(num_articles)]
+
+
+def artifact_kind(path: Path, ticker: str) -> str:
+    """'ZZA_price_data_20240101_120000.csv' -> 'price_data.csv'."""
+    stem = path.stem.replace(f"{ticker}_", '')
+    return '_'.join(p for p in stem.split('_') if not p.isdigit()) + path.suffix
+
+
+@pytest.fixture
+def histories(monkeypatch, tmp_path):
+    histories = {t: make_history(i) for i, t in enumerate(TICKERS)}
+    monkeypatch.setattr(batch, 'fetch_stock_history_bulk',
+                        lambda symbols, period, chunk_size: {t: histories[t] for t in symbols})
+    monkeypatch.setattr(batch, 'fetch_news_rss', make_news)
+    monkeypatch.setattr(batch, 'NEWS_INGEST_ENABLED', False)
+    monkeypatch.setattr(batch, 'RUN_CACHE_ENABLED', False)
+    monkeypatch.setattr(utils, 'REPORTS_DIR', tmp_path / 'reports')
+    monkeypatch.setattr(ui, 'REPORTS_DIR', tmp_path / 'reports')
+    monkeypatch.setattr(result_store, 'root', tmp_path / 'dataset')
+    monkeypatch.setattr(utils, 'report_catalog', ReportCatalog(tmp_path / 'catalog.sqlite3'))
+    warm_up()  # the analyzer's lexicons are loaded once per process, not per run
+    return histories
+
+
+def test_batch_writes_each_artifact_once_within_memory_bounds(histories):
+    data_bytes = sum(int(h.memory_usage(deep=True).sum()) for h in histories.values())
+
+    tracemalloc.start()
+    try:
+        results = batch.batch_aggregate(TICKERS, num_articles=20, full_text=False)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    for report, futures in [ui.submit_report(t, result) for t, result in results.items()]:
+        ui.finish_report(report, futures)
+
+    for t in TICKERS:
+        files = [f for f in utils.get_company_dir(t).iterdir() if f.is_file()]
+        assert Counter(artifact_kind(f, t) for f in files) == Counter(EXPECTED_ARTIFACTS), t
+        assert {f.name for f in utils.report_catalog.files(t)} == {f.name for f in files}, t
+    assert peak / data_bytes <= MAX_PEAK_TO_DATA_RATIO
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,69 @@
+"""
+Batch runs: a ticker whose prices fail, in the bulk download or on its own,
+does not hold back or fail the others. Network fetches are replaced with
+generated data.
+
+Run with: python -m pytest test_batch.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import batch, utils
+from src.catalog import ReportCatalog
+from src.storage import result_store
+
+TICKERS = ['ZZOK1', 'ZZOK2', 'ZZLATE', 'ZZBAD']
+
+
+def make_history(seed: int) -> pd.DataFrame:
+    days = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=30)
+    close = 100 + np.cumsum(np.random.default_rng(seed).normal(0, 1, len(days)))
+    return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 1000}, index=days)
+
+
+def make_news(ticker: str, num_articles: int):
+    return [{'title': f"{ticker} shares rally after strong quarter", 'link': f"https://example.com/{ticker}",
+             'date': pd.Timestamp.now(), 'source': 'Example'}]
+
+
+@pytest.fixture
+def single_fetches(monkeypatch, tmp_path):
+    """Bulk download returns no bars for ZZLATE and ZZBAD; alone, ZZLATE succeeds and ZZBAD raises."""
+    histories = {t: make_history(i) for i, t in enumerate(TICKERS)}
+    calls = []
+
+    def bulk(symbols, period, chunk_size):
+        return {t: histories[t] if t.startswith('ZZOK') else pd.DataFrame() for t in symbols}
+
+    def single(ticker, period):
+        calls.append(ticker)
+        if ticker == 'ZZBAD':
+            raise ValueError('no such symbol')
+        return histories[ticker]
+
+    monkeypatch.setattr(batch, 'fetch_stock_history_bulk', bulk)
+    monkeypatch.setattr(batch, 'fetch_stock_history', single)
+    monkeypatch.setattr(batch, 'fetch_news_rss', make_news)
+    monkeypatch.setattr(batch, 'NEWS_INGEST_ENABLED', False)
+    monkeypatch.setattr(batch, 'RUN_CACHE_ENABLED', False)
+    monkeypatch.setattr(utils, 'REPORTS_DIR', tmp_path / 'reports')
+    monkeypatch.setattr(result_store, 'root', tmp_path / 'dataset')
+    monkeypatch.setattr(utils, 'report_catalog', ReportCatalog(tmp_path / 'catalog.sqlite3'))
+    return calls
+
+
+def test_empty_bulk_frames_are_refetched_per_ticker(single_fetches):
+    results = batch.batch_aggregate(TICKERS, num_articles=1)
+
+    assert sorted(single_fetches) == ['ZZBAD', 'ZZLATE']
+    for ticker in ('ZZOK1', 'ZZOK2', 'ZZLATE'):
+        assert not results[ticker].get('error'), results[ticker].get('error')
+        assert results[ticker]['price_history'] is not None and len(results[ticker]['price_history']) == 30
+        assert results[ticker]['sentiment']['count'] == 1
+    assert 'no such symbol' in results['ZZBAD']['error']
+    assert results['ZZBAD']['failed_stages'] == ['price']
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
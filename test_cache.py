@@ -0,0 +1,95 @@
+"""
+Disk cache: entry expiry, LRU eviction under the size cap and atomic writes.
+
+Run with: python -m pytest test_cache.py
+"""
+import os
+import pickle
+from types import SimpleNamespace
+
+import pytest
+
+from src import cache as cache_module
+from src.cache import DiskCache, ENTRY_SUFFIX
+
+VALUE = b'x' * 1000
+ENTRY_BYTES = len(pickle.dumps({'key': 'a', 'created_at': 0.0, 'expires_at': None, 'data': VALUE},
+                               protocol=pickle.HIGHEST_PROTOCOL))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(cache_module, 'time', SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def test_entries_expire_after_their_ttl(tmp_path, clock):
+    cache = DiskCache(tmp_path, 1 << 20)
+    cache.set('short', 1, ttl_seconds=60)
+    cache.set('forever', 2)
+
+    clock.value += 59
+    assert cache.get('short') == 1
+    clock.value += 1
+    assert cache.get('short') is None
+    assert cache.get('forever') == 2
+    assert cache.stats()['expired'] == 1 and cache.stats()['entries'] == 1
+
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path):
+    cache = DiskCache(tmp_path, 3 * ENTRY_BYTES + 100)
+    for key in ('a', 'b', 'c'):
+        cache.set(key, VALUE)
+    cache.get('a')
+
+    cache.set('d', VALUE)
+
+    assert cache.get('b') is None
+    assert all(cache.get(k) == VALUE for k in ('a', 'c', 'd'))
+    stats = cache.stats()
+    assert stats['evictions'] == 1 and stats['size_bytes'] <= stats['max_bytes']
+    assert len(list(tmp_path.glob(f'*{ENTRY_SUFFIX}'))) == 3
+
+
+def test_index_is_rebuilt_from_disk(tmp_path):
+    DiskCache(tmp_path, 1 << 20).set('kept', {'n': 1})
+
+    reopened = DiskCache(tmp_path, 1 << 20)
+
+    assert reopened.get('kept') == {'n': 1}
+    assert reopened.stats()['size_bytes'] > 0
+
+
+def test_failed_write_leaves_the_previous_entry_intact(tmp_path, monkeypatch):
+    cache = DiskCache(tmp_path, 1 << 20)
+    cache.set('key', 'old')
+
+    def crash(*args):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(cache_module.os, 'replace', crash)
+    with pytest.raises(OSError):
+        cache.set('key', 'new' * 1000)
+    monkeypatch.undo()
+
+    assert cache.get('key') == 'old'
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_partial_files_are_never_read_as_entries(tmp_path):
+    cache = DiskCache(tmp_path, 1 << 20)
+    cache.set('key', 'value')
+    entry = cache._path('key')
+    # What a crashed non-atomic writer would leave behind
+    (tmp_path / 'crashed.tmp').write_bytes(entry.read_bytes()[:10])
+    entry.write_bytes(entry.read_bytes()[:10])
+
+    assert cache.get('key') is None
+    assert not entry.exists()
+    cache.clear()
+    assert not os.listdir(tmp_path)
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,55 @@
+"""
+Report retention: cleanup keeps the most recent runs plus explicitly kept ones.
+
+Run with: python -m pytest test_catalog.py
+"""
+import os
+
+import pytest
+
+from src import utils
+from src.catalog import ReportCatalog, parse_artifact_name
+
+RUNS = ['20260101_090000', '20260102_090000', '20260103_090000']
+
+
+@pytest.fixture
+def reports(monkeypatch, tmp_path):
+    monkeypatch.setattr(utils, 'REPORTS_DIR', tmp_path / 'reports')
+    monkeypatch.setattr(utils, 'report_catalog', ReportCatalog(tmp_path / 'catalog.sqlite3'))
+    company_dir = utils.get_company_dir('ZZCAT')
+    for i, run_id in enumerate(RUNS):
+        for name in (f"ZZCAT_summary_{run_id}.json", f"ZZCAT_ZZCAT_analysis_{run_id}.png"):
+            path = company_dir / name
+            path.write_text('{}')
+            os.utime(path, (1000 + i, 1000 + i))
+            utils.record_artifact(path, 'ZZCAT')
+    return company_dir
+
+
+def runs_left(company_dir):
+    return sorted({parse_artifact_name(p, 'ZZCAT')[1] for p in company_dir.iterdir()})
+
+
+def test_keeps_the_most_recent_runs(reports):
+    utils.cleanup_company_reports('ZZCAT', keep_runs=1)
+
+    assert runs_left(reports) == RUNS[-1:]
+
+
+def test_keeps_a_reused_run_that_is_not_the_newest(reports):
+    # A run reused from the run cache, while a newer run exists on disk
+    utils.cleanup_company_reports('ZZCAT', keep_runs=1, keep_run_ids=[RUNS[1], None])
+
+    assert runs_left(reports) == RUNS[1:]
+    assert utils.run_reports('ZZCAT', RUNS[1], ('png',))
+
+
+def test_keep_run_ids_alone_keeps_only_those_runs(reports):
+    utils.cleanup_company_reports('ZZCAT', keep_run_ids=[RUNS[0]])
+
+    assert runs_left(reports) == RUNS[:1]
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
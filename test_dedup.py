@@ -0,0 +1,79 @@
+"""
+Article de-duplication: canonical links and near-duplicate text collapse into
+one story whose cluster size weights the sentiment metrics.
+
+Run with: python -m pytest test_dedup.py
+"""
+import pytest
+
+from src.aggregator import calculate_sentiment_metrics
+from src.dedup import dedup_articles
+
+BODY = ("Apple reported quarterly revenue above analyst estimates on Thursday, driven by record "
+        "services sales and a rebound in iPhone demand in China, and raised its dividend. ")
+
+
+def article(title, link, source='Reuters', content='', **fields):
+    return {'title': title, 'link': link, 'source': source, 'content': content, **fields}
+
+
+def test_canonical_links_collapse():
+    articles = [
+        article('Apple beats estimates', 'https://www.reuters.com/apple-beats?utm_source=feed'),
+        article('Apple tops forecasts, shares rise', 'HTTPS://reuters.com/apple-beats#comments', content=BODY),
+    ]
+
+    kept = dedup_articles(articles)
+
+    assert len(kept) == 1
+    assert kept[0]['content'] == BODY  # the copy with the longest body represents the story
+    assert kept[0]['cluster_size'] == 2
+
+
+def test_near_duplicate_from_another_outlet_clusters():
+    articles = [
+        article('Apple tops quarterly estimates on services growth - Reuters', 'https://reuters.com/a1',
+                content=BODY),
+        article('Apple tops quarterly estimates on services growth - Bloomberg', 'https://bloomberg.com/b7',
+                source='Bloomberg', content=BODY + 'Shares rose in late trading.'),
+    ]
+
+    kept = dedup_articles(articles)
+
+    assert len(kept) == 1
+    assert kept[0]['cluster_size'] == 2
+    assert kept[0]['duplicate_sources'] == ['Reuters']
+
+
+def test_distinct_stories_stay_apart():
+    articles = [
+        article('Apple tops quarterly estimates on services growth', 'https://reuters.com/a1', content=BODY),
+        article('Microsoft expands cloud capacity in Europe', 'https://reuters.com/m1',
+                content='Microsoft will open three new data centers in Germany and Sweden next year.'),
+        article('Chip stocks slide as guidance weighs on tech', 'https://reuters.com/c1'),
+    ]
+
+    kept = dedup_articles(articles)
+
+    assert [a['link'] for a in kept] == ['https://reuters.com/a1', 'https://reuters.com/m1', 'https://reuters.com/c1']
+    assert all(a['cluster_size'] == 1 for a in kept)
+
+
+def test_cluster_size_weights_the_metrics():
+    articles = [article('Apple soars after earnings - Reuters', f'https://reuters.com/x?id={i}&utm_medium=rss',
+                        sentiment=0.6, sentiment_confidence=1.0) for i in [1, 1, 1]]
+    articles.append(article('Chip stocks slide on weak guidance', 'https://reuters.com/y',
+                            sentiment=-0.2, sentiment_confidence=1.0))
+
+    metrics = calculate_sentiment_metrics(dedup_articles(articles))
+
+    assert metrics['count'] == 2 and metrics['article_count'] == 4
+    assert metrics['average'] == pytest.approx(0.2)
+    assert metrics['weighted_average'] == pytest.approx(0.4)
+    assert metrics['strongly_positive'] == 3 and metrics['strongly_negative'] == 1
+    assert metrics['median'] == pytest.approx(0.6)
+    assert metrics['std'] == pytest.approx(0.2 * 3 ** 0.5)
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,34 @@
+"""
+Bounded article reads: the byte cap, truncation and paywall markers.
+
+Run with: python -m pytest test_extract.py
+"""
+import pytest
+
+from src.extract import read_stream
+
+
+def test_body_filling_the_cap_exactly_is_not_truncated():
+    streamed = read_stream([b'a' * 4, b'b' * 4], max_bytes=8, markers=())
+
+    assert streamed.content == b'aaaabbbb'
+    assert not streamed.truncated
+
+
+def test_data_past_the_cap_is_truncated():
+    exact_then_more = read_stream([b'a' * 4, b'b' * 4, b'c'], max_bytes=8, markers=())
+    cut_mid_chunk = read_stream([b'a' * 6, b'b' * 6], max_bytes=8, markers=())
+
+    assert exact_then_more.content == b'aaaabbbb' and exact_then_more.truncated
+    assert cut_mid_chunk.content == b'aaaaaabb' and cut_mid_chunk.truncated
+
+
+def test_marker_spanning_chunks_stops_the_read():
+    streamed = read_stream([b'please SUBS', b'CRIBE now', b'rest'], max_bytes=1024)
+
+    assert streamed.paywalled and not streamed.truncated
+    assert streamed.content == b'please SUBSCRIBE now'
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,112 @@
+"""
+Aligned price/sentiment features: session mapping of articles, rolling
+indicators and incremental updates matching a full recompute.
+
+Run with: python -m pytest test_features.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config import FEATURE_CORRELATION_LAG, FEATURE_CORRELATION_WINDOW, FEATURE_VOLATILITY_WINDOW
+from src.features import TRADING_DAYS_PER_YEAR, compute_features, daily_sentiment, update_features
+
+DAYS = pd.bdate_range('2025-01-01', periods=300)
+
+
+@pytest.fixture
+def history():
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(DAYS))))
+    return pd.DataFrame({'Close': close, 'Volume': rng.integers(1e5, 1e6, len(DAYS))}, index=DAYS)
+
+
+@pytest.fixture
+def sentiment():
+    rng = np.random.default_rng(11)
+    # A few articles a day at varying hours, some after the session cutoff
+    times = pd.DatetimeIndex(sorted(DAYS[0] + pd.to_timedelta(rng.uniform(0, 430, 900), unit='D')))
+    return pd.DataFrame({'sentiment': rng.uniform(-1, 1, len(times)),
+                         'weight': rng.integers(1, 4, len(times)).astype(float)}, index=times)
+
+
+def articles(*stamps_and_scores):
+    stamps, scores = zip(*stamps_and_scores)
+    return pd.DataFrame({'sentiment': scores}, index=pd.DatetimeIndex(stamps))
+
+
+def test_articles_after_the_cutoff_count_towards_the_next_session():
+    days = pd.bdate_range('2026-03-02', periods=10)  # Monday
+    daily = daily_sentiment(articles(('2026-03-02 20:59', 0.2), ('2026-03-02 21:00', 0.4),
+                                     ('2026-03-06 22:00', 0.6), ('2026-03-07 12:00', -0.2),
+                                     ('2026-03-08 23:30', 0.8)), days)
+
+    assert daily.loc['2026-03-02', 'sentiment'] == pytest.approx(0.2)
+    assert daily.loc['2026-03-03', 'sentiment'] == pytest.approx(0.4)
+    # Friday evening and the weekend all belong to Monday's session
+    assert daily.loc['2026-03-09', 'article_count'] == 3
+    assert daily.loc['2026-03-09', 'sentiment'] == pytest.approx(0.4)
+    assert daily['article_count'].sum() == 5
+    assert np.isnan(daily.loc['2026-03-04', 'sentiment'])
+
+
+def test_weighted_sentiment_uses_cluster_weights():
+    days = pd.bdate_range('2026-03-02', periods=2)
+    frame = articles(('2026-03-02 10:00', 1.0), ('2026-03-02 11:00', -1.0)).assign(weight=[3.0, 1.0])
+
+    daily = daily_sentiment(frame, days)
+
+    assert daily.loc['2026-03-02', 'sentiment'] == pytest.approx(0.0)
+    assert daily.loc['2026-03-02', 'sentiment_weighted'] == pytest.approx(0.5)
+
+
+def test_moving_averages_and_volatility(history):
+    features = compute_features(history)
+    close = history['Close'].to_numpy()
+
+    assert features['MA20'].iloc[-1] == pytest.approx(close[-20:].mean())
+    assert features['MA50'].iloc[-1] == pytest.approx(close[-50:].mean())
+    assert features['MA200'].iloc[-1] == pytest.approx(close[-200:].mean())
+    assert features['MA200'].iloc[:199].isna().all()
+    log_returns = np.diff(np.log(close))[-FEATURE_VOLATILITY_WINDOW:]
+    assert features['volatility'].iloc[-1] == pytest.approx(log_returns.std(ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR))
+
+
+def test_correlation_uses_the_previous_days_sentiment(history, sentiment):
+    features = compute_features(history, sentiment)
+
+    window = features.iloc[-FEATURE_CORRELATION_WINDOW:]
+    lagged = features['sentiment'].shift(FEATURE_CORRELATION_LAG).iloc[-FEATURE_CORRELATION_WINDOW:]
+    pairs = pd.DataFrame({'s': lagged, 'r': window['return']}).dropna()
+    assert features['sentiment_return_corr'].iloc[-1] == pytest.approx(np.corrcoef(pairs['s'], pairs['r'])[0, 1])
+
+
+@pytest.mark.parametrize('k', [1, 5, 60])
+def test_update_with_new_bars_matches_a_full_recompute(history, sentiment, k):
+    previous = compute_features(history.iloc[:-k], sentiment)
+
+    updated = update_features(previous, history, sentiment)
+
+    pd.testing.assert_frame_equal(updated, compute_features(history, sentiment))
+
+
+def test_update_with_late_articles_recomputes_from_since(history, sentiment):
+    early = sentiment[sentiment.index < DAYS[250]]
+    previous = compute_features(history, early)
+
+    updated = update_features(previous, history, sentiment, since=DAYS[250])
+
+    pd.testing.assert_frame_equal(updated, compute_features(history, sentiment))
+
+
+def test_readjusted_history_is_recomputed_in_full(history, sentiment):
+    previous = compute_features(history.iloc[:-3], sentiment)
+    split = history.assign(Close=history['Close'] / 2)
+
+    updated = update_features(previous, split, sentiment)
+
+    pd.testing.assert_frame_equal(updated, compute_features(split, sentiment))
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
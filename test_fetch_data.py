@@ -0,0 +1,89 @@
+"""
+Bulk price download: request counts against a fake yfinance, and price store locking.
+
+Run with: python -m pytest test_fetch_data.py
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import fetch_data
+from src.price_store import PriceStore
+
+TICKERS = ['AAA', 'BBB', 'CCC', 'DDD', 'EEE']
+
+
+def make_history(days: pd.DatetimeIndex, seed: int) -> pd.DataFrame:
+    close = 100 + np.cumsum(np.random.default_rng(seed).normal(0, 1, len(days)))
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                         'Volume': 1000, 'Dividends': 0.0, 'Stock Splits': 0.0}, index=days)
+
+
+class FakeDownload:
+    """Stands in for yf.download, recording (tickers, window) per request."""
+
+    def __init__(self):
+        days = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=400)
+        self.histories = {t: make_history(days, i) for i, t in enumerate(TICKERS)}
+        self.calls = []
+
+    def __call__(self, tickers, group_by=None, start=None, period=None, **kwargs):
+        self.calls.append((list(tickers), 'start' if start else 'period'))
+        frames = {t: self.histories[t] if start is None else self.histories[t][start:] for t in tickers}
+        return pd.concat(frames, axis=1)
+
+
+@pytest.fixture
+def fake(monkeypatch, tmp_path):
+    download = FakeDownload()
+    monkeypatch.setattr(fetch_data.yf, 'download', download)
+    monkeypatch.setattr(fetch_data, 'price_store', PriceStore(tmp_path, max_age_minutes=30))
+    return download
+
+
+def test_cold_fetch_downloads_one_request_per_chunk(fake):
+    frames = fetch_data.fetch_stock_history_bulk(TICKERS, '1y', chunk_size=2)
+
+    assert fake.calls == [(['AAA', 'BBB'], 'period'), (['CCC', 'DDD'], 'period'), (['EEE'], 'period')]
+    assert set(frames) == set(TICKERS)
+    assert all(not f.empty for f in frames.values())
+
+
+def test_fresh_store_skips_the_network(fake):
+    fetch_data.fetch_stock_history_bulk(TICKERS, '1y', chunk_size=2)
+    fake.calls.clear()
+
+    frames = fetch_data.fetch_stock_history_bulk(TICKERS, '1y', chunk_size=2)
+
+    assert fake.calls == []
+    assert all(not f.empty for f in frames.values())
+
+
+def test_stale_store_downloads_only_the_tail(fake, monkeypatch):
+    fetch_data.fetch_stock_history_bulk(TICKERS, '1y', chunk_size=10)
+    fake.calls.clear()
+    monkeypatch.setattr(fetch_data.price_store, 'max_age_sec', 0)
+
+    frames = fetch_data.fetch_stock_history_bulk(TICKERS, '1y', chunk_size=10)
+
+    # Every ticker has the same last stored bar, so they share one tail request
+    assert fake.calls == [(TICKERS, 'start')]
+    assert all(not f.empty for f in frames.values())
+
+
+def test_bulk_fetch_waits_for_the_ticker_lock(fake):
+    done = threading.Event()
+    lock = fetch_data.price_store.lock('CCC')
+    with lock:
+        worker = threading.Thread(target=lambda: (fetch_data.fetch_stock_history_bulk(TICKERS, '1y'), done.set()))
+        worker.start()
+        assert not done.wait(0.3), "bulk fetch ran while a single-ticker fetch held the CCC lock"
+    worker.join(10)
+    assert done.is_set()
+    assert fake.calls
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,156 @@
+"""
+News ingestion against a local server replaying the recorded feeds in
+fixtures/feeds: cross-source de-duplication, per-ticker grouping, conditional
+GET revalidation, in-process reuse of shared feeds and per-ticker futures.
+Runs offline.
+
+Run with: python -m pytest test_ingest.py
+"""
+import hashlib
+import threading
+import time
+from collections import Counter
+from concurrent.futures import wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from src import ingest, utils
+from src.cache import DiskCache
+from src.ingest import ingest_news, ingest_ticker_news, start_ticker_news, mentions
+
+FEEDS = Path(__file__).parent / 'fixtures' / 'feeds'
+
+
+class RecordedFeeds(BaseHTTPRequestHandler):
+    """Serves fixtures/feeds/<name>.xml with an ETag, answering 304 when it matches."""
+
+    def do_GET(self):
+        server = self.server
+        path = FEEDS / self.path.lstrip('/')
+        time.sleep(server.delays.get(self.path, 0))
+        if not path.is_file():
+            status, body = 404, b''
+        else:
+            body = path.read_bytes()
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            status = 304 if self.headers.get('If-None-Match') == etag else 200
+        with server.lock:
+            server.statuses[status] += 1
+        self.send_response(status)
+        if status != 404:
+            self.send_header('ETag', etag)
+        if status == 200:
+            self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('Content-Length', str(len(body) if status == 200 else 0))
+        self.end_headers()
+        if status == 200:
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    # Keep conditional GET state out of the shared cache, and request every
+    # feed each time unless a test turns in-process reuse back on
+    monkeypatch.setattr(utils, '_cache', DiskCache(tmp_path / 'cache', 16 * 2**20))
+    monkeypatch.setattr(ingest, '_shared_feeds', {})
+    monkeypatch.setattr(ingest, 'INGEST_SHARED_FEED_TTL_SEC', 0)
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), RecordedFeeds)
+    httpd.lock = threading.Lock()
+    httpd.statuses = Counter()
+    httpd.delays = {}
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def feeds(server):
+    """Feed URL overrides pointing at the local server."""
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    return {'sources': [f"{base}/markets.xml"], 'ticker_url': lambda t: f"{base}/{t.lower()}.xml"}
+
+
+def titles(articles):
+    return [a['title'] for a in articles]
+
+
+def test_stream_news_yields_each_story_once(server):
+    articles = ingest_news(['AAPL', 'MSFT'], **feeds(server))
+
+    # 4 + 3 + 2 recorded entries; the iPhone story runs in all three feeds
+    assert len(articles) == 7
+    assert sum('iPhone sales climb' in t for t in titles(articles)) == 1
+    by_ticker = Counter(a['ticker'] for a in articles)
+    assert by_ticker[None] >= 3 and by_ticker['AAPL'] >= 2 and by_ticker['MSFT'] >= 1
+    assert all(a['feed'].startswith('http://127.0.0.1') for a in articles)
+
+
+def test_ticker_news_adds_headlines_citing_the_symbol(server):
+    news = ingest_ticker_news(['AAPL', 'MSFT'], num_articles=20, **feeds(server))
+
+    assert titles(news['AAPL']) == [
+        'Apple (AAPL) tops quarterly estimates on services growth',
+        'iPhone sales climb in China - Reuters',
+        'Apple shares edge higher ahead of earnings - Bloomberg',
+        'Analysts lift Apple price targets - MarketWatch'
+    ]
+    assert titles(news['MSFT']) == [
+        'Chip stocks slide as NASDAQ: MSFT guidance weighs on tech',
+        'Microsoft expands cloud capacity in Europe - Reuters',
+        'iPhone sales climb in China - Reuters'
+    ]
+    assert all(a['ticker'] == t for t, articles in news.items() for a in articles)
+    assert len(ingest_ticker_news(['AAPL'], num_articles=2, **feeds(server))['AAPL']) == 2
+
+
+def test_unchanged_feeds_are_revalidated_not_downloaded(server):
+    first = ingest_ticker_news(['AAPL', 'MSFT'], **feeds(server))
+    assert server.statuses == {200: 3}
+
+    second = ingest_ticker_news(['AAPL', 'MSFT'], **feeds(server))
+
+    assert server.statuses == {200: 3, 304: 3}
+    assert {t: titles(a) for t, a in second.items()} == {t: titles(a) for t, a in first.items()}
+
+
+def test_shared_feeds_are_reused_across_ticker_runs(server, monkeypatch):
+    monkeypatch.setattr(ingest, 'INGEST_SHARED_FEED_TTL_SEC', 60)
+    first = ingest_ticker_news(['AAPL'], **feeds(server))
+    assert server.statuses == {200: 2}
+
+    second = ingest_ticker_news(['AAPL'], **feeds(server))
+    ingest_ticker_news(['MSFT'], **feeds(server))
+
+    # Only the ticker query feeds are requested again
+    assert server.statuses == {200: 3, 304: 1}
+    assert titles(second['AAPL']) == titles(first['AAPL'])
+
+
+def test_ticker_futures_resolve_as_their_feeds_arrive(server):
+    server.delays['/msft.xml'] = 1.0
+    futures = start_ticker_news(['AAPL', 'MSFT', 'ZZNONE'], postprocess=titles, **feeds(server))
+
+    assert futures['AAPL'].result(timeout=10)
+    assert not futures['MSFT'].done()
+
+    wait(futures.values(), timeout=10)
+    assert futures['MSFT'].result()[0].startswith('Chip stocks slide')
+    assert futures['ZZNONE'].result() == []  # its query feed is missing (404)
+
+
+def test_mentions_needs_a_cited_symbol():
+    assert mentions('Apple (AAPL) tops estimates', 'AAPL')
+    assert mentions('Why $TSLA fell today', 'TSLA')
+    assert mentions('NYSE: BRK.B hits a record', 'BRK.B')
+    assert not mentions('IT spending slows', 'IT')
+    assert not mentions('Apple (AAPLX) fund update', 'AAPL')
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
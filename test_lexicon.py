@@ -0,0 +1,72 @@
+"""
+Financial phrase lexicon: whole-word matching, inflections, multi-word
+phrases and custom lexicons cleaned like the scored text.
+
+Run with: python -m pytest test_lexicon.py
+"""
+import json
+
+import pytest
+
+from src.lexicon import PhraseMatcher, load_lexicon
+from src.sentiment_analyzer import SentimentAnalyzer
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return SentimentAnalyzer(lexicon_path=None, backends=('keywords',))
+
+
+def keywords(analyzer, text):
+    return analyzer.analyze_sentiment(text)['keywords_found']
+
+
+def test_phrases_match_whole_words_only(analyzer):
+    assert keywords(analyzer, 'Shares moved against the market today') == []
+    assert keywords(analyzer, 'Company added to the analyst shortlist today') == []
+    assert keywords(analyzer, 'Another solid gain for the shares') == ['gain']
+    assert keywords(analyzer, 'Hedge funds short the stock again') == ['short']
+
+
+def test_longest_phrase_wins(analyzer):
+    assert keywords(analyzer, 'Analysts reiterate a strong buy rating') == ['strong buy']
+    assert keywords(analyzer, 'Analysts see strong demand and buy more') == ['strong', 'buy']
+
+
+def test_inflections_count_as_the_phrase():
+    matcher = PhraseMatcher({'surge': 1.5, 'gain': 1.2})
+
+    assert matcher.match('stock surged as gains widened')[0] == ['surge', 'gain']
+    assert matcher.match('a surgeon gained')[0] == ['gain']
+
+
+def test_phrases_are_cleaned_like_the_text(tmp_path):
+    lexicon = tmp_path / 'lexicon.json'
+    lexicon.write_text(json.dumps({'cost-cutting': 1.1, 'write-down': -1.5, 'beats the estimates': 2.0, 'it': 1.0}))
+    analyzer = SentimentAnalyzer(lexicon_path=str(lexicon), backends=('keywords',))
+
+    assert 'it' not in analyzer.matcher.weights  # a stopword alone cleans to nothing
+    assert keywords(analyzer, 'Airline unveils cost-cutting plan') == ['cost cutting']
+    assert keywords(analyzer, 'Retailer beats the estimates again') == ['beats estimates']
+    # 'down' is a stopword, in the phrase as in the text
+    assert keywords(analyzer, 'Bank takes a large write-down on loans') == ['write']
+
+
+@pytest.mark.parametrize('name, content', [
+    ('lexicon.json', json.dumps({'gain': 3.0, 'guidance raise': 1.7})),
+    ('lexicon.csv', 'phrase,weight\n# overrides\ngain,3.0\nguidance raise,1.7\n')
+])
+def test_custom_lexicon_overrides_built_in_weights(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content)
+    assert load_lexicon(path) == {'gain': 3.0, 'guidance raise': 1.7}
+
+    analyzer = SentimentAnalyzer(lexicon_path=str(path), backends=('keywords',))
+
+    assert analyzer.matcher.weights['gain'] == 3.0
+    assert analyzer.matcher.weights['guidance raise'] == 1.7
+    assert analyzer.matcher.weights['rally'] == 1.5
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,137 @@
+"""
+Scraping against a local HTTP stand-in server: pooled keep-alive session,
+retries on 429/5xx, per-host spacing with parallelism across hosts, and the
+shared byte budget.
+
+Run with: python -m pytest test_net.py
+"""
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src import news_processor
+from src.net import HostRateLimiter, get_session
+
+ARTICLE = ("<html><body><article><p>"
+           + "Shares rose after the company reported stronger quarterly results than analysts expected. " * 10
+           + "</p></article></body></html>").encode()
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Serves /ok, /status/<code>/<failures> (fails N times, then 200) and /article/<n>."""
+    protocol_version = 'HTTP/1.1'  # keep-alive, so connection reuse is observable
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.hits[self.path] += 1
+            server.times[self.headers['Host']].append(time.monotonic())
+            hits = server.hits[self.path]
+        status = 200
+        if self.path.startswith('/status/'):
+            _, _, code, failures = self.path.split('/')
+            status = int(code) if hits <= int(failures) else 200
+        body = ARTICLE if status == 200 else b'busy'
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+    httpd.lock = threading.Lock()
+    httpd.connections = set()
+    httpd.hits = defaultdict(int)
+    httpd.times = defaultdict(list)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def url(server, path, host='127.0.0.1'):
+    return f"http://{host}:{server.server_address[1]}{path}"
+
+
+def test_session_reuses_pooled_connections(server):
+    for _ in range(5):
+        assert get_session().get(url(server, '/ok'), timeout=5).status_code == 200
+
+    assert server.hits['/ok'] == 5
+    assert len(server.connections) == 1
+
+
+@pytest.mark.parametrize('code', [429, 500, 503])
+def test_transient_statuses_are_retried(server, code):
+    path = f"/status/{code}/2"
+    resp = get_session().get(url(server, path), timeout=5)
+
+    assert resp.status_code == 200
+    assert server.hits[path] == 3
+
+
+def test_persistent_errors_give_up_after_retries(server):
+    path = '/status/503/99'
+    start = time.monotonic()
+    resp = get_session().get(url(server, path), timeout=5)
+
+    assert resp.status_code == 503
+    assert server.hits[path] == 3  # first attempt plus HTTP_RETRIES
+    assert time.monotonic() - start >= 0.5  # backed off between attempts
+
+
+@pytest.fixture
+def scraper(monkeypatch):
+    """news_processor with robots.txt and the article cache out of the way."""
+    monkeypatch.setattr(news_processor, 'RESPECT_ROBOTS', False)
+    monkeypatch.setattr(news_processor, '_load_cached_article', lambda canonical: None)
+    monkeypatch.setattr(news_processor, '_cache_article', lambda *args: None)
+    return news_processor
+
+
+def test_hosts_are_spaced_but_scraped_in_parallel(server, scraper, monkeypatch):
+    interval = 0.3
+    monkeypatch.setattr(news_processor, 'host_limiter', HostRateLimiter(interval))
+    # 127.0.0.1 and localhost are different hosts to the limiter
+    links = [url(server, f"/article/{i}", host) for host in ('127.0.0.1', 'localhost') for i in range(3)]
+
+    start = time.monotonic()
+    bodies = news_processor.scrape_articles(links)
+    elapsed = time.monotonic() - start
+
+    assert all('quarterly results' in body for body in bodies.values()) and len(bodies) == 6
+    for host, times in server.times.items():
+        gaps = [b - a for a, b in zip(times, times[1:])]
+        assert len(times) == 3 and min(gaps) >= interval * 0.9, f"{host} requests not spaced: {gaps}"
+    # Two queues of three run side by side: about two intervals, not five
+    assert elapsed < interval * 4
+
+
+def test_byte_budget_counts_bytes_read(server, scraper, monkeypatch):
+    monkeypatch.setattr(news_processor, 'host_limiter', HostRateLimiter(0))
+    links = [url(server, f"/article/{i}", host) for host in ('127.0.0.1', 'localhost') for i in range(4)]
+
+    # Far below SCRAPE_MAX_BYTES per page, but enough for every article actually read
+    roomy = news_processor.ScrapeBudget(30, 10 * len(ARTICLE))
+    bodies = news_processor.scrape_articles(links, budget=roomy)
+    assert all(bodies.values()) and len(bodies) == 8
+    assert roomy.bytes_used == 8 * len(ARTICLE)
+
+    tight = news_processor.ScrapeBudget(30, int(2.5 * len(ARTICLE)))
+    news_processor.scrape_articles(links, budget=tight)
+    assert tight.bytes_used == int(2.5 * len(ARTICLE)) and tight.exhausted()
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,80 @@
+"""
+Local price store: per-listing files and period windows.
+
+Run with: python -m pytest test_price_store.py
+"""
+import pandas as pd
+import pytest
+
+from src import fetch_data
+from src.price_store import PriceStore, period_bars
+
+
+# The newest session strictly before today (Friday when run on a weekend)
+LAST_SESSION = pd.Timestamp.today().normalize() - pd.offsets.BDay(1)
+
+
+def bars(close: float, days: int = 3) -> pd.DataFrame:
+    index = pd.bdate_range(end=LAST_SESSION, periods=days)
+    return pd.DataFrame({'Close': [close] * days}, index=index)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(tmp_path, max_age_minutes=30)
+
+
+def test_dotted_listings_get_their_own_files(store, tmp_path):
+    listings = {'SHOP.TO': 1.0, 'SHOP': 2.0, 'BRK.A': 3.0, 'BRK.B': 4.0}
+    for ticker, close in listings.items():
+        store.save(ticker, bars(close), None)
+
+    assert {t: store.load(t)[0]['Close'].iloc[0] for t in listings} == listings
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+class FakeTicker:
+    """Stands in for yf.Ticker, with no session today yet (as on a weekend or a Monday morning)."""
+
+    def __init__(self):
+        self.history_frame = bars(1.0, days=300)
+        self.calls = []
+
+    def history(self, period=None, start=None):
+        self.calls.append(period or f"start={start}")
+        if start is not None:
+            return self.history_frame[start:]
+        n = period_bars(period)
+        return self.history_frame.tail(n) if n else self.history_frame
+
+
+@pytest.fixture
+def ticker(monkeypatch, store):
+    monkeypatch.setattr(fetch_data, 'price_store', store)
+    return FakeTicker()
+
+
+def test_day_periods_count_trading_sessions(ticker):
+    # A stored year of bars serves '1d' and '5d' as the newest sessions, even
+    # though the calendar days back from a Saturday hold no (or fewer) bars
+    assert len(fetch_data.fetch_stock_history('ZZP', '1y', ticker_obj=ticker)) > 200
+    one_day = fetch_data.fetch_stock_history('ZZP', '1d', ticker_obj=ticker)
+    five_days = fetch_data.fetch_stock_history('ZZP', '5d', ticker_obj=ticker)
+
+    assert list(one_day.index) == [LAST_SESSION]
+    assert len(five_days) == 5
+    assert ticker.calls == ['1y']
+
+
+def test_day_period_download_covers_only_its_bars(ticker):
+    assert len(fetch_data.fetch_stock_history('ZZP', '5d', ticker_obj=ticker)) == 5
+    assert len(fetch_data.fetch_stock_history('ZZP', '3d', ticker_obj=ticker)) == 3
+    assert ticker.calls == ['5d']
+
+    # Five stored bars do not cover ten sessions
+    assert len(fetch_data.fetch_stock_history('ZZP', '10d', ticker_obj=ticker)) == 10
+    assert ticker.calls == ['5d', '10d']
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
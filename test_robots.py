@@ -0,0 +1,148 @@
+"""
+robots.txt policies against a local HTTP server: one fetch per host under
+concurrency, Cache-Control max-age and error TTLs, and reuse across runs
+through the disk cache.
+
+Run with: python -m pytest test_robots.py
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from src import robots, utils
+from src.cache import DiskCache
+from src.net import HostRateLimiter
+from src.robots import RobotsPolicyCache
+
+ROBOTS_TXT = b"User-agent: *\nDisallow: /private\n"
+DEFAULT_TTL, ERROR_TTL = 3600, 30
+
+
+class RobotsServer(BaseHTTPRequestHandler):
+    """Serves /robots.txt with the status, headers and delay set on the server."""
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.delay)
+        with server.lock:
+            server.hits += 1
+        body = ROBOTS_TXT if server.status == 200 else b'error'
+        self.send_response(server.status)
+        for name, value in server.headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    monkeypatch.setattr(utils, '_cache', DiskCache(tmp_path / 'cache', 16 * 2**20))
+    monkeypatch.setattr(robots, 'host_limiter', HostRateLimiter(0))
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), RobotsServer)
+    httpd.lock = threading.Lock()
+    httpd.hits, httpd.status, httpd.headers, httpd.delay = 0, 200, {}, 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=time.time())
+    monkeypatch.setattr(robots, 'time', SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def url(server, path):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def new_cache():
+    return RobotsPolicyCache(DEFAULT_TTL, ERROR_TTL)
+
+
+def test_concurrent_lookups_share_one_fetch(server):
+    server.delay = 0.3
+    cache = new_cache()
+
+    with ThreadPoolExecutor(8) as pool:
+        answers = list(pool.map(cache.allows, [url(server, f"/page/{i}") for i in range(8)]))
+
+    assert answers == [True] * 8
+    assert server.hits == 1
+    stats = cache.stats()
+    assert stats['fetches'] == 1 and stats['coalesced'] + stats['memory_hits'] == 7
+
+
+def test_policy_is_applied(server):
+    cache = new_cache()
+
+    assert cache.allows(url(server, '/news/story'))
+    assert not cache.allows(url(server, '/private/story'))
+    assert server.hits == 1
+
+
+def test_max_age_overrides_the_default_ttl(server, clock):
+    server.headers = {'Cache-Control': 'public, max-age=60'}
+    cache = new_cache()
+    cache.allows(url(server, '/'))
+
+    clock.value += 59
+    cache.allows(url(server, '/'))
+    assert server.hits == 1
+
+    clock.value += 2
+    cache.allows(url(server, '/'))
+    assert server.hits == 2
+
+
+def test_default_ttl_without_cache_control(server, clock):
+    cache = new_cache()
+    cache.allows(url(server, '/'))
+
+    clock.value += DEFAULT_TTL - 1
+    cache.allows(url(server, '/'))
+    assert server.hits == 1
+
+    clock.value += 2
+    cache.allows(url(server, '/'))
+    assert server.hits == 2
+
+
+def test_server_errors_disallow_until_the_error_ttl(server, clock):
+    server.status = 500
+    server.headers = {'Cache-Control': 'max-age=86400'}
+    cache = new_cache()
+
+    assert not cache.allows(url(server, '/news/story'))
+    server.status, server.headers = 200, {}
+    clock.value += ERROR_TTL - 1
+    assert not cache.allows(url(server, '/news/story'))
+
+    clock.value += 2
+    assert cache.allows(url(server, '/news/story'))
+    assert cache.stats()['fetches'] == 2
+
+
+def test_policies_survive_in_the_disk_cache(server):
+    new_cache().allows(url(server, '/'))
+
+    later_run = new_cache()
+
+    assert not later_run.allows(url(server, '/private/x'))
+    assert server.hits == 1
+    assert later_run.stats()['disk_hits'] == 1 and later_run.stats()['fetches'] == 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
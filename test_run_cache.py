@@ -0,0 +1,120 @@
+"""
+Run cache: an unchanged re-run reuses the previous run without fetching
+article bodies, scoring or rendering, and a changed article is the only one
+redone. Prices and feeds are replaced with generated data.
+
+Run with: python -m pytest test_run_cache.py
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import aggregator, ui, utils
+from src.cache import DiskCache
+from src.catalog import ReportCatalog
+from src.storage import result_store
+
+TITLES = ['Apple tops quarterly estimates on services growth',
+          'Microsoft expands cloud capacity in Europe',
+          'Chip stocks slide as guidance weighs on tech',
+          'Retailer plunges after profit warning and downgrade']
+
+
+def make_history() -> pd.DataFrame:
+    days = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=60)
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(3).normal(0, 0.01, len(days))))
+    return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 1000}, index=days)
+
+
+class Calls:
+    """The generated feed, articles passed to enrichment and scoring, and charts submitted."""
+
+    def __init__(self, feed):
+        self.feed = feed
+        self.enriched, self.scored, self.rendered = [], [], 0
+
+
+@pytest.fixture
+def pipeline(monkeypatch, tmp_path):
+    history = make_history()
+    feed = [{'title': t, 'link': f"https://example.com/story/{i}?utm_source=rss", 'source': 'Example',
+             'date': pd.Timestamp.now().floor('s') - pd.Timedelta(days=i)} for i, t in enumerate(TITLES)]
+    calls = Calls(feed)
+
+    def enrich(articles):
+        calls.enriched.append([a['title'] for a in articles])
+        # New dicts, as enrichment may return copies
+        return [dict(a, content=f"{a['title']}. Full story text follows here.", full_text=True) for a in articles]
+
+    def score(articles):
+        calls.scored.append([a['title'] for a in articles])
+        return real_score(articles)
+
+    def render(*args, **kwargs):
+        calls.rendered += 1
+        return real_render(*args, **kwargs)
+
+    real_score, real_render = aggregator.batch_analyze, ui.renderer.submit
+    monkeypatch.setattr(aggregator, 'fetch_stock_data', lambda ticker, period: {'history': history})
+    monkeypatch.setattr(aggregator, 'fetch_news_rss', lambda ticker, num_articles: [dict(a) for a in feed])
+    monkeypatch.setattr(aggregator, 'enrich_articles', enrich)
+    monkeypatch.setattr(aggregator, 'batch_analyze', score)
+    monkeypatch.setattr(ui.renderer, 'submit', render)
+    monkeypatch.setattr(aggregator, 'NEWS_INGEST_ENABLED', False)
+    monkeypatch.setattr(aggregator, 'RUN_CACHE_ENABLED', True)
+    monkeypatch.setattr(utils, '_cache', DiskCache(tmp_path / 'cache', 16 * 2**20))
+    monkeypatch.setattr(utils, 'REPORTS_DIR', tmp_path / 'reports')
+    monkeypatch.setattr(ui, 'REPORTS_DIR', tmp_path / 'reports')
+    monkeypatch.setattr(result_store, 'root', tmp_path / 'dataset')
+    monkeypatch.setattr(utils, 'report_catalog', ReportCatalog(tmp_path / 'catalog.sqlite3'))
+    return calls
+
+
+def run():
+    result = aggregator.aggregate_analysis('ZZRUN', num_articles=len(TITLES), full_text=True)
+    assert not result.get('error'), result.get('error')
+    ui.finish_report(*ui.submit_report('ZZRUN', result))
+    return result
+
+
+def test_unchanged_rerun_skips_fetching_scoring_and_rendering(pipeline):
+    first = run()
+    assert pipeline.enriched == pipeline.scored == [TITLES] and pipeline.rendered == 2
+
+    second = run()
+
+    assert second['reused'] and second['run_id'] == first['run_id']
+    assert second['saved_files'] == first['saved_files']
+    assert pipeline.enriched == pipeline.scored == [TITLES] and pipeline.rendered == 2
+    assert [a['sentiment'] for a in second['news']] == [a['sentiment'] for a in first['news']]
+    assert not second['features'].empty
+
+
+def test_changed_article_is_the_only_one_recomputed(pipeline):
+    run()
+    pipeline.feed[2]['title'] = 'Chip stocks rally as guidance lifts tech'
+
+    second = run()
+
+    assert not second.get('reused')
+    assert pipeline.enriched[1:] == pipeline.scored[1:] == [['Chip stocks rally as guidance lifts tech']]
+    assert {a['title'] for a in second['news']} == set(TITLES[:2] + TITLES[3:]) | {pipeline.feed[2]['title']}
+    assert all(Path(p).exists() for p in second['saved_files'])
+
+
+def test_run_with_pruned_reports_is_recomputed(pipeline):
+    first = run()
+    Path(first['saved_files'][0]).unlink()
+
+    second = run()
+
+    assert not second.get('reused')
+    assert all(Path(p).exists() for p in second['saved_files'])
+    # The scores were still valid, so only the reports are redone
+    assert pipeline.scored == [TITLES]
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
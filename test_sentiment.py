@@ -0,0 +1,95 @@
+"""
+Batch sentiment scoring: analyze_batch gives exactly the per-article
+analyze_sentiment results on headlines and full article text, and every
+path labels scores with the same thresholds.
+
+Run with: python -m pytest test_sentiment.py
+"""
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+from src import sentiment_analyzer
+from src.aggregator import sentiment_metrics_from_arrays
+from src.sentiment_analyzer import SENTIMENT_LABELS, SentimentAnalyzer, get_analyzer
+
+FULL_TEXT = (
+    "<p>Shares of the company <b>surged</b> after it beat estimates.</p> "
+    "Analysts at https://example.com/research lifted targets, citing strong demand, "
+    "although some warned of volatility and a possible correction later in the year. "
+    "The board also raised the dividend and announced a buyback. " * 3
+)
+
+CORPUS = [
+    'Apple (AAPL) tops quarterly estimates on services growth - Reuters',
+    'Chip stocks slide as guidance weighs on tech',
+    'Analysts reiterate a strong buy rating on the shares',
+    'Shares moved against the market; shortlist of bidders emerges',
+    'Retailer plunges after profit warning, downgrade follows',
+    FULL_TEXT,
+    'Stock ends the session strong',
+    'buy-side desks see recession risk',  # must not join with the text above
+    'Apple (AAPL) tops quarterly estimates on services growth - Reuters',
+    'too short',
+    '',
+    None,
+    'Markets were quiet today with little news to report at all',
+]
+
+
+def test_batch_matches_per_article_scores():
+    analyzer = get_analyzer()
+
+    batch = analyzer.analyze_batch(CORPUS)
+
+    assert len(batch) == len(CORPUS)
+    for text, result in zip(CORPUS, batch):
+        expected = analyzer.analyze_sentiment(text)
+        for field in ('compound', 'confidence', 'sentiment', 'keywords_found',
+                      'vader_score', 'textblob_score', 'word_count'):
+            assert result.get(field) == expected.get(field), (text, field)
+    assert batch[2]['keywords_found'] == ['strong buy']
+    assert batch[6]['keywords_found'] == ['strong'] and 'buy' in batch[7]['keywords_found']
+
+
+def test_document_term_matrix_rows_follow_first_occurrence():
+    matcher = get_analyzer().matcher
+
+    matrix, hits = matcher.document_term_matrix(['rally rally risk gain', '', 'gain'])
+
+    assert [[matcher.phrases[j] for j in row] for row in hits] == [['rally', 'risk', 'gain'], [], ['gain']]
+    assert matrix.shape == (3, len(matcher.phrases))
+    assert matrix.sum(axis=1).A1.tolist() == [3.0, 0.0, 1.0]
+
+
+@pytest.mark.parametrize('weak, strong', [(0.05, 0.15), (0.1, 0.3)])
+def test_thresholds_label_alike_in_every_path(monkeypatch, weak, strong):
+    monkeypatch.setattr(sentiment_analyzer, 'WEAK_THRESHOLD', weak)
+    monkeypatch.setattr(sentiment_analyzer, 'STRONG_THRESHOLD', strong)
+    eps = 1e-6
+    expected = {
+        -1.0: 'strongly_negative', -strong: 'strongly_negative', -strong + eps: 'negative',
+        -weak: 'negative', -weak + eps: 'neutral', 0.0: 'neutral', weak - eps: 'neutral',
+        weak: 'positive', strong - eps: 'positive', strong: 'strongly_positive', 1.0: 'strongly_positive'
+    }
+    # VADER alone, answering with the score under test, so compound == score exactly
+    analyzer = SentimentAnalyzer(lexicon_path=None, backends=('vader',))
+    words = ['alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf', 'hotel', 'india', 'juliet', 'kilo']
+    texts = [f"Headline {word} for the threshold test" for word in words]
+    scores = {analyzer._preprocess_text(t.lower()): score for t, score in zip(texts, expected)}
+    analyzer.sid = SimpleNamespace(polarity_scores=lambda cleaned: {'compound': scores[cleaned]})
+
+    scalar = [analyzer.analyze_sentiment(t) for t in texts]
+    batch = analyzer.analyze_batch(texts)
+    metrics = sentiment_metrics_from_arrays(list(expected))
+
+    assert [r['compound'] for r in scalar] == list(expected)
+    assert [r['sentiment'] for r in scalar] == list(expected.values())
+    assert [r['sentiment'] for r in batch] == list(expected.values())
+    counts = Counter(expected.values())
+    assert {label: metrics[label] for label in SENTIMENT_LABELS} == {label: counts[label] for label in SENTIMENT_LABELS}
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
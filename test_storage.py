@@ -0,0 +1,99 @@
+"""
+Result dataset: runs round-trip through the partitioned Parquet store,
+ticker/date filters select partitions, and compaction keeps every row.
+
+Run with: python -m pytest test_storage.py
+"""
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+import pytest
+
+from src.storage import ResultStore, run_row
+
+RUN_DAYS = ['2025-12-30 09:00:00', '2026-01-05 09:00:00', '2026-01-06 09:00:00', '2026-01-07 09:00:00']
+
+
+def make_result(ticker: str, timestamp: str, seed: int) -> dict:
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range(end=timestamp[:10], periods=20)
+    scores = rng.uniform(-1, 1, 3)
+    return {
+        'ticker': ticker,
+        'timestamp': timestamp,
+        'price_history': pd.DataFrame({'Close': rng.uniform(90, 110, len(days))}, index=days),
+        'sentiment': {'average': float(scores.mean()), 'count': 3, 'article_count': 3, 'keywords': ['gain']},
+        'news': [{'title': f"{ticker} story {i}", 'link': f"https://example.com/{ticker}/{seed}/{i}",
+                  'date': datetime(2026, 1, 1, 12, i), 'sentiment': float(s), 'sentiment_label': 'positive',
+                  'sentiment_confidence': 0.5, 'cluster_size': 1} for i, s in enumerate(scores)]
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(tmp_path / 'dataset', max_partition_files=10)
+    for seed, (ticker, timestamp) in enumerate((t, ts) for t in ('ZZA', 'ZZB') for ts in RUN_DAYS):
+        store.append_run(make_result(ticker, timestamp, seed), pd.Timestamp(timestamp).strftime('%Y%m%d_%H%M%S'))
+    return store
+
+
+def test_runs_round_trip(store):
+    runs = store.load('runs')
+
+    assert len(runs) == 8 and sorted(runs['ticker'].unique()) == ['ZZA', 'ZZB']
+    row = runs[(runs['ticker'] == 'ZZA') & (runs['run_id'] == '20260105_090000')].iloc[0]
+    assert row['price_data_points'] == 20 and row['story_count'] == 3 and list(row['keywords']) == ['gain']
+    assert len(store.load('articles')) == 24
+
+
+def test_ticker_and_date_filters_select_partitions(store):
+    zza = store.load('runs', tickers=['zza'])
+    assert set(zza['ticker']) == {'ZZA'} and len(zza) == 4
+
+    january = store.load('runs', tickers=['ZZB'], start='2026-01-01', end='2026-01-06')
+    assert sorted(january['run_id']) == ['20260105_090000', '20260106_090000']
+
+    negative = store.load('articles', tickers=['ZZA'], where=ds.field('sentiment') < 0)
+    assert (negative['sentiment'] < 0).all()
+
+
+def test_compaction_keeps_every_row(store, tmp_path):
+    before = store.load('articles').sort_values(['ticker', 'run_id', 'title']).reset_index(drop=True)
+    # The 2025 partitions were already merged when 2026 runs arrived
+    assert len(list((tmp_path / 'dataset' / 'runs' / 'ticker=ZZA' / 'year=2026').glob('*.parquet'))) == 3
+
+    removed = store.compact('articles') + store.compact('runs')
+
+    assert removed == 2 * 2 * 2
+    after = store.load('articles').sort_values(['ticker', 'run_id', 'title']).reset_index(drop=True)
+    pd.testing.assert_frame_equal(after, before)
+    assert len(store.load('runs')) == 8
+    partitions = list((tmp_path / 'dataset').glob('*/ticker=*/year=*'))
+    assert all(len(list(p.iterdir())) == 1 for p in partitions)
+    assert not list((tmp_path / 'dataset').glob('*/ticker=*/_*'))
+
+
+@pytest.fixture
+def new_york(monkeypatch):
+    monkeypatch.setenv('TZ', 'America/New_York')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_local_run_timestamps_are_stored_as_utc(new_york):
+    winter = run_row({'ticker': 'ZZA', 'timestamp': '2026-01-05T09:00:00'}, 'r1')
+    summer = run_row({'ticker': 'ZZA', 'timestamp': '2026-07-06T09:00:00'}, 'r2')
+    aware = run_row({'ticker': 'ZZA', 'timestamp': '2026-01-05T09:00:00+01:00'}, 'r3')
+
+    assert winter['timestamp'].iloc[0] == pd.Timestamp('2026-01-05 14:00')
+    assert summer['timestamp'].iloc[0] == pd.Timestamp('2026-07-06 13:00')
+    assert aware['timestamp'].iloc[0] == pd.Timestamp('2026-01-05 08:00')
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
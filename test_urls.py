@@ -0,0 +1,70 @@
+"""
+Article URL canonicalization and Google News link resolution; cache keys and
+de-duplication depend on equivalent links comparing equal.
+
+Run with: python -m pytest test_urls.py
+"""
+import base64
+
+import pytest
+
+from src.utils import canonicalize_url, resolve_news_link, url_digest
+
+PUBLISHER = 'https://www.reuters.com/markets/apple-tops-estimates-2026-01-05/'
+
+
+def google_news_id(url: str) -> str:
+    """Article id as Google News encodes it: a protobuf-style wrapper around the URL."""
+    raw = b'\x08\x13\x22' + bytes([len(url)]) + url.encode('ascii') + b'\xd2\x01\x00'
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+@pytest.mark.parametrize('url', [
+    'https://www.reuters.com/markets/apple?utm_source=rss&utm_medium=feed&id=7',
+    'https://reuters.com/markets/apple?id=7&fbclid=abc&mc_cid=1',
+    'https://reuters.com/markets/apple?id=7&mkt_tok=xyz&guccounter=2',
+])
+def test_tracking_parameters_are_dropped(url):
+    assert canonicalize_url(url) == 'https://reuters.com/markets/apple?id=7'
+
+
+def test_scheme_host_and_port_are_normalized():
+    assert canonicalize_url('HTTP://WWW.Reuters.COM:80/Markets/Apple') == 'https://reuters.com/Markets/Apple'
+    assert canonicalize_url('https://reuters.com:8443/a') == 'https://reuters.com:8443/a'
+
+
+def test_fragment_and_trailing_slash_are_removed():
+    assert canonicalize_url('https://reuters.com/markets/apple/#comments') == 'https://reuters.com/markets/apple'
+    assert canonicalize_url('https://reuters.com/') == 'https://reuters.com/'
+
+
+def test_query_parameters_are_sorted():
+    assert (canonicalize_url('https://example.com/story?b=2&a=1&c=')
+            == canonicalize_url('https://example.com/story?c=&a=1&b=2')
+            == 'https://example.com/story?a=1&b=2&c=')
+
+
+@pytest.mark.parametrize('path', ['rss/articles', 'articles'])
+def test_google_news_article_ids_are_decoded(path):
+    link = f"https://news.google.com/{path}/{google_news_id(PUBLISHER)}?oc=5&hl=en-US"
+
+    assert resolve_news_link(link) == PUBLISHER
+    assert url_digest(link) == url_digest('https://reuters.com/markets/apple-tops-estimates-2026-01-05?utm_source=x')
+
+
+def test_google_redirects_are_unwrapped():
+    link = 'https://www.google.com/url?rct=j&url=https%3A%2F%2Fwww.reuters.com%2Fa%3Fid%3D1&ct=ga'
+
+    assert resolve_news_link(link) == 'https://www.reuters.com/a?id=1'
+    assert canonicalize_url(link) == 'https://reuters.com/a?id=1'
+
+
+def test_undecodable_google_ids_are_kept():
+    link = 'https://news.google.com/rss/articles/not-base64-!!?oc=5'
+
+    assert resolve_news_link(link) == link
+    assert resolve_news_link('  https://example.com/a  ') == 'https://example.com/a'
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))